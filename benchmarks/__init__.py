@@ -0,0 +1,6 @@
+"""
+Offline benchmark of the agent loop: scripted fake models drive browser_loop_agent
+against local HTML fixtures, so the numbers measure the framework itself.
+
+    python -m benchmarks --output results.json [--compare previous.json]
+"""
@@ -0,0 +1,57 @@
+"""Command line entry point: python -m benchmarks."""
+
+import argparse
+import asyncio
+
+from browser_use_agent.http_cache import HttpResponseCache
+from browser_use_agent.logging_config import configure_logging
+from browser_use_agent.pipeline import PipelineOptions
+from browser_use_agent.screenshot import LOW_RES_POLICY, ScreenshotPolicy
+
+from .bench import compare, format_results, load_results, run_benchmarks, write_results
+from .scenarios import SCENARIOS
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark of the browser agent loop with scripted models.")
+    parser.add_argument("--output", default="benchmark_results.json", help="Results file to write")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    parser.add_argument("--scenario", action="append", choices=[s.name for s in SCENARIOS],
+                        help="Scenario to run (repeatable; default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per scenario; the median run is reported")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="Simulated model latency per call")
+    parser.add_argument("--full-res", action="store_true",
+                        help="Send full-size captures instead of the default low-resolution frames (LOW_RES_POLICY)")
+    parser.add_argument("--screenshot-format", choices=["png", "jpeg", "webp"], default="png",
+                        help="Format of the full-size captures sent with --full-res")
+    parser.add_argument("--no-pipeline", action="store_true",
+                        help="Capture and encode the end-of-step frame serially instead of pipelining it")
+    parser.add_argument("--http-cache", help="Directory of a response cache the pages are loaded through")
+    parser.add_argument("--offline", action="store_true",
+                        help="Serve pages only from --http-cache and abort every other request")
+    parser.add_argument("--port", type=int, default=0,
+                        help="Fixture server port (fix it so cached URLs match between invocations)")
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args()
+    if args.offline and not args.http_cache:
+        parser.error("--offline needs --http-cache")
+
+    configure_logging(args.log_level)
+    results = asyncio.run(run_benchmarks(
+        scenario_names=args.scenario,
+        repeat=args.repeat,
+        llm_latency_ms=args.llm_latency_ms,
+        screenshot_policy=ScreenshotPolicy(format=args.screenshot_format) if args.full_res else LOW_RES_POLICY,
+        http_cache=HttpResponseCache(args.http_cache, offline=args.offline) if args.http_cache else None,
+        port=args.port,
+        pipeline_options=PipelineOptions(enabled=not args.no_pipeline),
+    ))
+    write_results(results, args.output)
+
+    print(format_results(results))
+    print(f"Results written to {args.output}")
+    if args.compare:
+        print()
+        print(compare(load_results(args.compare), results))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""Run the scripted scenarios and collect step latency, screenshot size and memory figures."""
+
+import json
+import platform
+import resource
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from browser_use_agent.http_cache import HttpResponseCache
+from browser_use_agent.pipeline import PipelineOptions
+from browser_use_agent.runner import run_browser_agent_async
+from browser_use_agent.screenshot import ScreenshotPolicy
+from browser_use_agent.settle import SettleOptions
+from browser_use_agent.tracing import Tracer
+
+from .fake_llm import ScriptedLlm, scripted_agents
+from .scenarios import SCENARIOS, Scenario
+from .server import FixtureServer
+
+# Metrics where a larger value is an improvement; for all others smaller is better
+HIGHER_IS_BETTER = {"steps_per_sec"}
+
+def _percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[int(fraction * (len(ordered) - 1))]
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process (the browser processes are not included)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+async def run_scenario(scenario: Scenario, server: FixtureServer, coordinator: ScriptedLlm, executor: ScriptedLlm,
+                       screenshot_policy: Optional[ScreenshotPolicy] = None,
+                       settle_options: Optional[SettleOptions] = None,
+                       http_cache: Optional[HttpResponseCache] = None,
+                       pipeline_options: Optional[PipelineOptions] = None) -> Dict[str, Any]:
+    """Run one scenario with fresh scripts and return its metrics."""
+    coordinator.reset(scenario.coordinator)
+    executor.reset(scenario.executor)
+    tracer = Tracer()
+
+    started = time.perf_counter()
+    result = await run_browser_agent_async(
+        user_goal=scenario.goal,
+        initial_url=server.url(scenario.fixture),
+        max_iterations=len(scenario.coordinator) + 1,
+        screenshot_policy=screenshot_policy,
+        settle_options=settle_options,
+        tracer=tracer,
+        launch_profile="headless",
+        http_cache=http_cache,
+        pipeline_options=pipeline_options,
+    )
+    wall_s = time.perf_counter() - started
+
+    step_ms = [span.duration_ms for span in tracer.spans if span.name == "loop.iteration"]
+    screenshot_bytes = [span.attributes.get("bytes", 0) for span in tracer.spans if span.name == "browser.screenshot"]
+    return {
+        "success": result["success"],
+        "error": result["error"],
+        "steps": len(step_ms),
+        "wall_s": wall_s,
+        "steps_per_sec": len(step_ms) / wall_s if wall_s else 0.0,
+        "p50_step_ms": _percentile(step_ms, 0.5),
+        "p95_step_ms": _percentile(step_ms, 0.95),
+        "screenshots": len(screenshot_bytes),
+        "screenshot_bytes_total": sum(screenshot_bytes),
+        "screenshot_bytes_mean": sum(screenshot_bytes) / len(screenshot_bytes) if screenshot_bytes else 0.0,
+        "serial_step_ms": result["metrics"].get("pipeline", {}).get("avg_serial_step_ms", 0.0),
+        "frame_wait_ms": result["metrics"].get("pipeline", {}).get("avg_blocked_ms", 0.0),
+        "spans": tracer.summary(),
+    }
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+async def run_benchmarks(scenario_names: Optional[List[str]] = None, repeat: int = 1, llm_latency_ms: float = 0.0,
+                         screenshot_policy: Optional[ScreenshotPolicy] = None,
+                         settle_options: Optional[SettleOptions] = None,
+                         http_cache: Optional[HttpResponseCache] = None, port: int = 0,
+                         pipeline_options: Optional[PipelineOptions] = None) -> Dict[str, Any]:
+    """
+    Run the selected scenarios (all by default) repeat times each.
+
+    Args:
+        scenario_names: Names from benchmarks.scenarios.SCENARIOS to run
+        repeat: Runs per scenario; the reported figures are from the median-wall-time run
+        llm_latency_ms: Simulated model latency per call (0 measures pure framework overhead)
+        screenshot_policy: Screenshot encoding used by the runs
+        settle_options: Post-action waiting used by the runs
+        http_cache: Optional response cache the runs load pages through; with offline=True
+            nothing reaches the fixture server (or any other host) that was not recorded before
+        port: Fixture server port; keep it fixed so cached URLs match between invocations
+        pipeline_options: Capture/encode pipelining of the runs (enabled by default)
+
+    Returns:
+        Dict with the commit, environment, per-scenario metrics and peak RSS
+    """
+    selected = [s for s in SCENARIOS if scenario_names is None or s.name in scenario_names]
+    coordinator = ScriptedLlm(latency_ms=llm_latency_ms)
+    executor = ScriptedLlm(latency_ms=llm_latency_ms)
+    results: Dict[str, Any] = {}
+
+    with FixtureServer(port=port) as server, scripted_agents(coordinator, executor):
+        for scenario in selected:
+            runs = [await run_scenario(scenario, server, coordinator, executor, screenshot_policy, settle_options,
+                                       http_cache, pipeline_options)
+                    for _ in range(repeat)]
+            runs.sort(key=lambda run: run["wall_s"])
+            results[scenario.name] = runs[len(runs) // 2]
+
+    return {
+        "commit": _git_commit(),
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "llm_latency_ms": llm_latency_ms,
+        "pipelined": pipeline_options is None or pipeline_options.enabled,
+        "http_cache": http_cache.stats() if http_cache is not None else None,
+        "scenarios": results,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+def compare(previous: Dict[str, Any], current: Dict[str, Any]) -> str:
+    """Render the relative change of the headline metrics between two results files."""
+    metrics = ["steps_per_sec", "p50_step_ms", "p95_step_ms", "frame_wait_ms", "screenshot_bytes_mean"]
+    lines = [f"{'scenario':<14} {'metric':<22} {'previous':>12} {'current':>12} {'change':>8}"]
+    for name, run in current["scenarios"].items():
+        before = previous.get("scenarios", {}).get(name)
+        if before is None:
+            continue
+        for metric in metrics:
+            old, new = before.get(metric, 0.0), run.get(metric, 0.0)
+            change = (new - old) / old * 100 if old else 0.0
+            better = change > 0 if metric in HIGHER_IS_BETTER else change < 0
+            marker = "+" if better and abs(change) >= 5 else ("-" if abs(change) >= 5 else " ")
+            lines.append(f"{name:<14} {metric:<22} {old:>12.1f} {new:>12.1f} {change:>7.1f}% {marker}")
+    old_rss, new_rss = previous.get("peak_rss_mb", 0.0), current.get("peak_rss_mb", 0.0)
+    lines.append(f"{'(process)':<14} {'peak_rss_mb':<22} {old_rss:>12.1f} {new_rss:>12.1f}")
+    return "\n".join(lines)
+
+def format_results(results: Dict[str, Any]) -> str:
+    """Render the headline metrics of a results dict as a table."""
+    lines = [f"{'scenario':<14} {'ok':<3} {'steps':>5} {'steps/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'serial':>8} "
+             f"{'wait ms':>8} {'shot KB':>8}"]
+    for name, run in results["scenarios"].items():
+        lines.append(
+            f"{name:<14} {'y' if run['success'] else 'n':<3} {run['steps']:>5} {run['steps_per_sec']:>8.2f} "
+            f"{run['p50_step_ms']:>8.1f} {run['p95_step_ms']:>8.1f} {run.get('serial_step_ms', 0.0):>8.1f} "
+            f"{run.get('frame_wait_ms', 0.0):>8.1f} {run['screenshot_bytes_mean'] / 1024:>8.1f}"
+        )
+    lines.append(f"peak RSS: {results['peak_rss_mb']:.1f} MB (Python process; browser processes excluded)")
+    return "\n".join(lines)
+
+def write_results(results: Dict[str, Any], path: str):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, default=str)
+
+def load_results(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
@@ -0,0 +1,105 @@
+"""Deterministic stand-in for Gemini that replays scripted tool calls."""
+
+import asyncio
+from contextlib import contextmanager
+from typing import Any, AsyncGenerator, Dict, List, Optional
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.genai import types
+from pydantic import PrivateAttr
+
+class ScriptedLlm(BaseLlm):
+    """
+    Answers every other request with the next scripted function call and the
+    requests in between (the ones carrying that call's result) with a short text,
+    which ends the agent's turn. Once the script is exhausted it only answers text.
+    """
+
+    model: str = "scripted"
+    script: List[Dict[str, Any]] = []
+    latency_ms: float = 0.0
+
+    _cursor: int = PrivateAttr(default=0)
+    _awaiting_result: bool = PrivateAttr(default=False)
+
+    @classmethod
+    def supported_models(cls) -> List[str]:
+        return [r"scripted.*"]
+
+    def reset(self, script: Optional[List[Dict[str, Any]]] = None):
+        """Rewind the script, optionally replacing it."""
+        if script is not None:
+            self.script = script
+        self._cursor = 0
+        self._awaiting_result = False
+
+    @property
+    def calls_made(self) -> int:
+        return self._cursor
+
+    async def generate_content_async(self, llm_request: LlmRequest, stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        if self._awaiting_result or self._cursor >= len(self.script):
+            self._awaiting_result = False
+            content = types.Content(role="model", parts=[types.Part(text="Done.")])
+        else:
+            call = self.script[self._cursor]
+            self._cursor += 1
+            self._awaiting_result = True
+            content = types.Content(role="model", parts=[
+                types.Part(function_call=types.FunctionCall(name=call["name"], args=call.get("args", {})))
+            ])
+        yield LlmResponse(content=content)
+
+class GoalScriptedLlm(BaseLlm):
+    """
+    ScriptedLlm for concurrent runs: a separate script and cursor per goal, found in the
+    "Goal: ..." line of the run's first message, so the interleaved requests of several
+    runs each follow their own script. Only for agents whose requests carry the session
+    history (the coordinator, not the executor).
+    """
+
+    model: str = "scripted-goals"
+    scripts: Dict[str, List[Dict[str, Any]]] = {}
+    latency_ms: float = 0.0
+
+    _players: Dict[Optional[str], ScriptedLlm] = PrivateAttr(default_factory=dict)
+
+    @classmethod
+    def supported_models(cls) -> List[str]:
+        return [r"scripted.*"]
+
+    def reset(self):
+        """Rewind every goal's script."""
+        self._players = {}
+
+    @staticmethod
+    def goal_of(llm_request: LlmRequest) -> Optional[str]:
+        for content in llm_request.contents:
+            for part in content.parts or []:
+                if part.text and part.text.startswith("Goal: "):
+                    return part.text[len("Goal: "):].split("\n", 1)[0]
+        return None
+
+    async def generate_content_async(self, llm_request: LlmRequest, stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        goal = self.goal_of(llm_request)
+        player = self._players.get(goal)
+        if player is None:
+            player = self._players[goal] = ScriptedLlm(script=self.scripts.get(goal, []), latency_ms=self.latency_ms)
+        async for response in player.generate_content_async(llm_request, stream):
+            yield response
+
+@contextmanager
+def scripted_agents(coordinator: ScriptedLlm, executor: ScriptedLlm):
+    """Swap the coordinator's and executor's models for scripted ones for the duration of the block."""
+    from browser_use_agent.agents.coordinator import browser_coordinator_agent
+    from browser_use_agent.agents.executor import browser_action_executor_agent
+
+    original = (browser_coordinator_agent.model, browser_action_executor_agent.model)
+    browser_coordinator_agent.model = coordinator
+    browser_action_executor_agent.model = executor
+    try:
+        yield
+    finally:
+        browser_coordinator_agent.model, browser_action_executor_agent.model = original
@@ -0,0 +1,99 @@
+"""Scripted benchmark scenarios: a fixture page plus the tool calls the fake models make on it."""
+
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+class Scenario(BaseModel):
+    """One benchmark task."""
+    name: str
+    fixture: str = Field(description="File in benchmarks/fixtures the run starts on")
+    goal: str
+    coordinator: List[Dict[str, Any]] = Field(description="Function calls of the coordinator, one per loop iteration")
+    executor: List[Dict[str, Any]] = Field(default_factory=list, description="Function calls of the executor, one per executor invocation")
+
+# --- Call builders ---
+
+def call(name: str, args: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    return {"name": name, "args": args or {}}
+
+def list_elements() -> Dict[str, Any]:
+    return call("list_elements_wrapper")
+
+def type_into(element_id: int, text: str) -> Dict[str, Any]:
+    return call("type_into_element_wrapper", {"args": {"element_id": element_id, "text": text}})
+
+def click_id(element_id: int) -> Dict[str, Any]:
+    return call("click_element_id_wrapper", {"args": {"element_id": element_id}})
+
+def delegate(action: str, description: str) -> Dict[str, Any]:
+    """Coordinator call of the executor agent."""
+    return call("BrowserActionExecutorAgent", {"action": action, "action_description": description})
+
+def complete(result: str) -> Dict[str, Any]:
+    return call("mark_task_complete", {"args": {"reason": "Scripted scenario finished", "result": result}})
+
+def click_at(x: float, y: float, label: str) -> Dict[str, Any]:
+    return call("click_element_wrapper", {"args": {"label": label, "points": {"x": x, "y": y}}})
+
+def scroll(direction: str, amount: int) -> Dict[str, Any]:
+    return call("scroll_page_wrapper", {"args": {"direction": direction, "amount": amount, "points": None}})
+
+def sequence(*actions: Dict[str, Any]) -> Dict[str, Any]:
+    return call("perform_actions_wrapper", {"args": {"actions": list(actions)}})
+
+# --- Scenarios ---
+
+SCENARIOS: List[Scenario] = [
+    Scenario(
+        name="form",
+        fixture="form.html",
+        goal="Sign up as Ada Lovelace with ada@example.com",
+        # Every action invalidates the element index, so ids are listed again before each use
+        coordinator=[
+            list_elements(), type_into(0, "Ada Lovelace"),
+            list_elements(), type_into(1, "ada@example.com"),
+            list_elements(), click_id(2),
+            list_elements(), click_id(3),
+            complete("Account created"),
+        ],
+    ),
+    Scenario(
+        name="scroll",
+        fixture="scroll.html",
+        goal="Scroll through the feed and come back to the top",
+        coordinator=[
+            delegate("scroll", "scroll down the feed"),
+            delegate("scroll", "scroll down the feed"),
+            delegate("scroll", "scroll down the feed"),
+            delegate("scroll", "scroll down the feed"),
+            delegate("sequence", "scroll back up twice"),
+            complete("Feed scrolled"),
+        ],
+        executor=[
+            scroll("down", 800),
+            scroll("down", 800),
+            scroll("down", 800),
+            scroll("down", 800),
+            sequence(
+                {"action": "scroll", "scroll": {"direction": "up", "amount": 1600, "points": None}},
+                {"action": "scroll", "scroll": {"direction": "up", "amount": 1600, "points": None}},
+            ),
+        ],
+    ),
+    Scenario(
+        name="slow_widgets",
+        fixture="slow.html",
+        goal="Load the widgets and open the first one",
+        coordinator=[
+            delegate("click", "click the 'Load widgets' button"),
+            list_elements(),
+            click_id(1),
+            complete("First widget opened"),
+        ],
+        # The button's center is at (200, 125) px of the 1024x768 viewport
+        executor=[
+            click_at(195, 163, "Load widgets"),
+        ],
+    ),
+]
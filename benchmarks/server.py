@@ -0,0 +1,65 @@
+"""Local HTTP server for the benchmark fixtures."""
+
+import json
+import os
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+class _FixtureHandler(SimpleHTTPRequestHandler):
+    """Serves the fixture files, plus /slow?ms=N which answers after N milliseconds."""
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/slow":
+            ms = int(parse_qs(url.query).get("ms", ["500"])[0])
+            time.sleep(ms / 1000)
+            body = json.dumps({"ms": ms}).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Cache-Control", "no-store")
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        super().do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+class FixtureServer:
+    """Serves benchmarks/fixtures on 127.0.0.1 from a background thread."""
+
+    def __init__(self, port: int = 0, directory: str = FIXTURES_DIR):
+        """
+        Args:
+            port: Port to listen on (0 picks a free one)
+            directory: Directory the fixture files are served from
+        """
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), partial(_FixtureHandler, directory=directory))
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fixture-server", daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def url(self, fixture: str) -> str:
+        return f"{self.base_url}/{fixture}"
+
+    def start(self) -> "FixtureServer":
+        self._thread.start()
+        return self
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FixtureServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
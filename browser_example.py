@@ -2,11 +2,15 @@
 
 import os
 import dotenv
+from browser_use_agent.logging_config import configure_logging
 from browser_use_agent.runner import run_browser_agent
 
 # Load environment variables from .env file
 dotenv.load_dotenv()
 
+# Show the agent's progress (ORBIT_LOG_LEVEL / ORBIT_LOG_JSON adjust it)
+configure_logging()
+
 def main():
     """Run an example browser automation task."""
     
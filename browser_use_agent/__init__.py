@@ -3,4 +3,13 @@
 import os
 
 # Default model to use (can be overridden with environment variable)
-GEMINI_MODEL = os.environ.get("GEMINI_MODEL", "gemini-1.5-flash")
\ No newline at end of file
+GEMINI_MODEL = os.environ.get("GEMINI_MODEL", "gemini-1.5-flash")
+
+# Per-agent models, each defaulting to GEMINI_MODEL: e.g. a stronger coordinator and
+# small fast models for the executor and the interaction agent
+GEMINI_COORDINATOR_MODEL = os.environ.get("GEMINI_COORDINATOR_MODEL", GEMINI_MODEL)
+GEMINI_EXECUTOR_MODEL = os.environ.get("GEMINI_EXECUTOR_MODEL", GEMINI_MODEL)
+GEMINI_INTERACTION_MODEL = os.environ.get("GEMINI_INTERACTION_MODEL", GEMINI_MODEL)
+
+# Model a step is escalated to after the cheap model failed (unset: no escalation)
+GEMINI_ESCALATION_MODEL = os.environ.get("GEMINI_ESCALATION_MODEL") or None
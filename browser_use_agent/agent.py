@@ -1,10 +1,18 @@
 """Defines the main LoopAgent for the browser interaction capability."""
 
-from google.adk.agents import LoopAgent
+import inspect
+import time
+
+from google.adk.agents import LoopAgent, SequentialAgent
 from google.adk.agents.callback_context import CallbackContext
+from google.genai import types
 
 # Import the coordinator agent
 from .agents.coordinator import browser_coordinator_agent
+from .events import ScreenshotTaken, StepStarted, emit_event
+from .logging_config import get_logger
+
+logger = get_logger("runner")
 
 def before_loop_iteration(callback_context: CallbackContext):
     """Callback executed before each loop iteration to track state."""
@@ -13,51 +21,125 @@ def before_loop_iteration(callback_context: CallbackContext):
     max_iterations = callback_context.state.get('max_iterations', 10)
     
     # Print the current iteration status
-    print(f"[INFO] Starting loop iteration {iteration_count + 1}/{max_iterations}")
+    logger.info("Starting loop iteration %s/%s", iteration_count + 1, max_iterations)
     
     # Increment the iteration count for the next iteration
     callback_context.state['iteration_count'] = iteration_count + 1
     
     # Check if we should exit early (e.g., goal achieved or error condition)
     if callback_context.state.get('task_completed', False):
-        print("[INFO] Task marked as completed. Exiting loop.")
+        logger.info("Task marked as completed. Exiting loop.")
         callback_context.state['exit_loop'] = True
     
     if callback_context.state.get('task_failed', False):
-        print("[WARNING] Task marked as failed. Exiting loop.")
+        logger.warning("Task marked as failed. Exiting loop.")
         callback_context.state['exit_loop'] = True
     
     # Check if we've hit the maximum iterations
     if iteration_count >= max_iterations:
-        print(f"[WARNING] Reached maximum iterations ({max_iterations}). Exiting loop.")
+        logger.warning("Reached maximum iterations (%s). Exiting loop.", max_iterations)
         callback_context.state['exit_loop'] = True
         callback_context.state['max_iterations_reached'] = True
+    
+    # Returning content skips the step and ends the invocation, and with it the loop
+    if callback_context.state.get('exit_loop', False):
+        return types.Content(role="model", parts=[types.Part(text="Browser task loop finished.")])
+    
+    emit_event(callback_context, StepStarted, iteration=iteration_count + 1, max_iterations=max_iterations)
+    
+    # Time the iteration up to the screenshot taken in after_loop_iteration
+    from .globals import get_browser_controller, get_session_resource, resolve_session_id
+    browser_controller = get_browser_controller(callback_context)
+    if browser_controller is not None:
+        browser_controller.pipeline_recorder.start_step()
+    # A failure in the last step, or a step that changed nothing, sends this one to the escalation model
+    router = get_session_resource(callback_context, "model_router")
+    if router is not None:
+        router.start_step(screen_unchanged=bool(callback_context.state.get('screen_unchanged')))
+    tracer = get_session_resource(callback_context, "tracer")
+    if tracer is not None:
+        tracer.start_span(("iteration", resolve_session_id(callback_context)), "loop.iteration", iteration=iteration_count + 1)
+    return None
 
-def after_loop_iteration(callback_context: CallbackContext):
+async def after_loop_iteration(callback_context: CallbackContext):
     """Callback executed after each loop iteration to update state with latest screenshot."""
     # Import here to avoid circular imports
-    from .globals import BROWSER_CONTROLLER
+    from .globals import get_browser_controller, get_session_resource, resolve_session_id
     
-    if BROWSER_CONTROLLER:
+    browser_controller = get_browser_controller(callback_context)
+    if browser_controller:
         try:
-            # Take a new screenshot for the next iteration, using the method directly
-            new_screenshot = BROWSER_CONTROLLER.screenshot()
-            # Update the state with the new screenshot
-            callback_context.state['current_screenshot'] = new_screenshot.inline_data
-            print("[INFO] Updated screenshot after iteration for next loop")
+            # Take a new screenshot for the next iteration, using the method directly; a pipelined
+            # controller usually has it ready from right after the last tool call settled
+            blocked_started = time.perf_counter()
+            new_screenshot = browser_controller.screenshot()
+            # AsyncBrowserController returns a coroutine
+            if inspect.isawaitable(new_screenshot):
+                new_screenshot = await new_screenshot
+            # Encode time and payload size of the capture
+            callback_context.state['last_screenshot_stats'] = browser_controller.last_capture_stats
+            
+            # The image itself lives in the session's bounded ScreenHistory; session state
+            # (and so every event's state delta) only carries its hash and similarity.
+            # Compare with the previous screen so an unchanged page is reported as a note
+            screen_history = get_session_resource(callback_context, "screen_history")
+            if screen_history is not None:
+                frame = screen_history.add(callback_context.state.get('iteration_count', 0), new_screenshot.inline_data,
+                                           signature=browser_controller.last_signature)
+                callback_context.state['screenshot_hash'] = frame.phash
+                callback_context.state['screen_similarity'] = frame.similarity
+                callback_context.state['screen_unchanged'] = frame.unchanged
+                if frame.unchanged:
+                    logger.info("No visible change on screen (similarity %.3f)", frame.similarity)
+                stats = browser_controller.last_capture_stats or {}
+                emit_event(callback_context, ScreenshotTaken, iteration=frame.iteration,
+                           bytes=stats.get('bytes', len(new_screenshot.inline_data.data)),
+                           format=stats.get('format', ''), capture_ms=stats.get('capture_ms', 0.0),
+                           similarity=frame.similarity, unchanged=frame.unchanged)
+                # Build the coordinator's next screen content now rather than in its model callback
+                screen_history.to_content()
+            browser_controller.pipeline_recorder.finish_step((time.perf_counter() - blocked_started) * 1000,
+                                                             browser_controller.last_capture_stats)
+            logger.info("Updated screenshot after iteration for next loop")
         except Exception as e:
-            print(f"[ERROR] Failed to update screenshot: {e}")
+            logger.error("Failed to update screenshot: %s", e)
             
-    else: print("[ERROR] Browser controller not available for screenshot update")
+    else: logger.error("Browser controller not available for screenshot update")
+
+    # Save the progress so far; the checkpoint store writes it out in the background
+    checkpointer = get_session_resource(callback_context, "checkpointer")
+    if checkpointer is not None and browser_controller is not None:
+        try:
+            storage_state = None
+            # Cookies are only captured for a store that encrypts them
+            if checkpointer.include_storage_state:
+                storage_state = browser_controller.storage_state()
+                if inspect.isawaitable(storage_state):
+                    storage_state = await storage_state
+            checkpointer.checkpoint(callback_context.state.to_dict(), browser_controller.page.url, storage_state)
+        except Exception as e:
+            logger.error("Failed to checkpoint iteration: %s", e)
+
+    tracer = get_session_resource(callback_context, "tracer")
+    if tracer is not None:
+        tracer.finish_pending(("iteration", resolve_session_id(callback_context)),
+                              screen_unchanged=callback_context.state.get('screen_unchanged'))
     
+# A LoopAgent's own callbacks run once per run, so the per-iteration bookkeeping sits on
+# a SequentialAgent that wraps the coordinator and runs once per loop iteration.
+browser_step_agent = SequentialAgent(
+    name="BrowserStep",
+    description="One iteration of the browser task: the coordinator acts on the current screen.",
+    sub_agents=[browser_coordinator_agent],
+    before_agent_callback=before_loop_iteration,
+    after_agent_callback=after_loop_iteration,
+)
+
 # Define the LoopAgent that orchestrates the browser task.
 browser_loop_agent = LoopAgent(
     name="BrowserTaskLoop",
     description="Manages the iterative process of browser interaction by coordinating actions based on screen state.",
-    sub_agents=[browser_coordinator_agent],
+    sub_agents=[browser_step_agent],
     max_iterations=10,  # Default limit - can be overridden by state['max_iterations']
-    before_agent_callback=before_loop_iteration,
-    after_agent_callback=after_loop_iteration,
-    # exit_condition is handled by setting state['exit_loop'] in the callback
+    # The loop ends when mark_task_complete / mark_task_failed escalate
 )
-
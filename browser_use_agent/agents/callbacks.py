@@ -0,0 +1,197 @@
+"""Model and tool callbacks of the coordinator and executor: screen, zoom and fan-out attachment, model routing, response caching, tracing, frame prefetching, progress events and checkpoints."""
+
+from typing import Any, Callable, Dict, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+
+from ..events import ActionExecuted, emit_event
+from ..globals import get_session_resource, resolve_session_id
+from ..logging_config import USER_INPUT_TOOLS, redact, redact_args, redacted_values
+from ..model_routing import is_failed_tool_response
+
+def chain_model_callbacks(*callbacks: Callable) -> Callable:
+    """
+    Combine model callbacks into one, since an agent takes a single callable. They run
+    in order and the first one returning a response short-circuits the rest.
+    """
+    # ADK passes llm_request / llm_response by keyword
+    def chained(callback_context: CallbackContext, **kwargs):
+        for callback in callbacks:
+            response = callback(callback_context=callback_context, **kwargs)
+            if response is not None:
+                return response
+        return None
+    return chained
+
+def chain_tool_callbacks(*callbacks: Callable) -> Callable:
+    """Same as chain_model_callbacks for before/after tool callbacks."""
+    # ADK passes tool, args, tool_context (and tool_response) by keyword
+    def chained(**kwargs):
+        for callback in callbacks:
+            response = callback(**kwargs)
+            if response is not None:
+                return response
+        return None
+    return chained
+
+def attach_screen_history(callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+    """Append the screens captured after each loop iteration to the coordinator request."""
+    history = get_session_resource(callback_context, "screen_history")
+    if history is not None:
+        content = history.to_content()
+        if content is not None:
+            llm_request.contents.append(content)
+        history.record_prompt(llm_request.contents)
+    return None
+
+def attach_current_screenshot(callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+    """Append the latest screenshot to the executor request so it can locate elements."""
+    history = get_session_resource(callback_context, "screen_history")
+    if history is not None and history.current is not None:
+        llm_request.contents.append(types.Content(
+            role="user",
+            parts=[types.Part(text="Current screen:"), types.Part(inline_data=history.current)]
+        ))
+        history.record_prompt(llm_request.contents)
+    return None
+
+def attach_zoom_crop(callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+    """Append the crop of the last zoom tool call, while it is current, to the executor request."""
+    controller = get_session_resource(callback_context, "browser_controller")
+    if controller is not None and controller.zoom_crop is not None:
+        llm_request.contents.append(types.Content(
+            role="user",
+            parts=[types.Part(text="Zoom crop (click inside it with in_zoom=true, 0-1000 scale of the crop):"),
+                   types.Part(inline_data=controller.zoom_crop)]
+        ))
+    return None
+
+def attach_fan_out_frames(callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+    """Append the tab screenshots of the last fan-out, while they are current, to the coordinator request."""
+    controller = get_session_resource(callback_context, "browser_controller")
+    if controller is not None and controller.fan_out_recorder.frames:
+        parts = [types.Part(text="Fan-out tab screenshots:")]
+        for label, image in controller.fan_out_recorder.frames:
+            parts.extend([types.Part(text=label), types.Part(inline_data=image)])
+        llm_request.contents.append(types.Content(role="user", parts=parts))
+    return None
+
+def route_model(callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+    """Send the call to the escalation model while the session's ModelRouter has the step escalated."""
+    router = get_session_resource(callback_context, "model_router")
+    if router is not None:
+        llm_request.model = router.model_for(callback_context.agent_name, llm_request.model)
+    return None
+
+def start_model_call(callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+    """Start timing the model call for the ModelRouter's per-model metrics (cache hits are counted on lookup)."""
+    router = get_session_resource(callback_context, "model_router")
+    if router is not None:
+        router.start_call((callback_context.invocation_id, callback_context.agent_name), llm_request.model)
+    return None
+
+def finish_model_call(callback_context: CallbackContext, llm_response: LlmResponse) -> Optional[LlmResponse]:
+    """Record the model call's latency and tokens; a malformed function call escalates the step."""
+    router = get_session_resource(callback_context, "model_router")
+    if router is not None:
+        router.finish_call((callback_context.invocation_id, callback_context.agent_name),
+                           callback_context.agent_name, llm_response)
+    return None
+
+def lookup_llm_cache(callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+    """Answer the request from the session's LlmResponseCache, if one is registered and has it."""
+    cache = get_session_resource(callback_context, "llm_cache")
+    if cache is None:
+        return None
+    call_id = (callback_context.invocation_id, callback_context.agent_name)
+    response = cache.lookup(resolve_session_id(callback_context), call_id, llm_request)
+    # A hit ends the callback chain before start_model_call, so count it here
+    router = get_session_resource(callback_context, "model_router")
+    if response is not None and router is not None:
+        router.record_cache_hit(callback_context.agent_name, llm_request.model)
+    return response
+
+def store_llm_cache(callback_context: CallbackContext, llm_response: LlmResponse) -> Optional[LlmResponse]:
+    """Save a fresh model response in the session's LlmResponseCache."""
+    cache = get_session_resource(callback_context, "llm_cache")
+    if cache is not None:
+        cache.store((callback_context.invocation_id, callback_context.agent_name), llm_response)
+    return None
+
+def start_model_span(callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+    """Open a span for the model call about to be made (cache hits never get here)."""
+    tracer = get_session_resource(callback_context, "tracer")
+    if tracer is not None and tracer.enabled:
+        images = sum(1 for content in llm_request.contents for part in content.parts or [] if part.inline_data is not None)
+        tracer.start_span(("llm", callback_context.invocation_id, callback_context.agent_name),
+                          f"llm.{callback_context.agent_name}", model=llm_request.model, images=images)
+    return None
+
+def finish_model_span(callback_context: CallbackContext, llm_response: LlmResponse) -> Optional[LlmResponse]:
+    """Close the model call span with the token counts of the response."""
+    tracer = get_session_resource(callback_context, "tracer")
+    if tracer is not None and tracer.enabled:
+        usage = llm_response.usage_metadata
+        tracer.finish_pending(
+            ("llm", callback_context.invocation_id, callback_context.agent_name),
+            prompt_tokens=usage.prompt_token_count if usage else None,
+            output_tokens=usage.candidates_token_count if usage else None,
+        )
+    return None
+
+def start_tool_span(tool, args: Dict[str, Any], tool_context) -> Optional[Dict[str, Any]]:
+    """Open a span for a tool call, including calls of the executor through its AgentTool."""
+    tracer = get_session_resource(tool_context, "tracer")
+    if tracer is not None and tracer.enabled:
+        inner = args.get("args") if isinstance(args.get("args"), dict) else args
+        tracer.start_span(("tool", tool_context.function_call_id), f"tool.{tool.name}",
+                          action_type=inner.get("action_type") or inner.get("action"))
+    return None
+
+def finish_tool_span(tool, args: Dict[str, Any], tool_context, tool_response) -> Optional[Dict[str, Any]]:
+    """Close the tool call span with the size of its response."""
+    tracer = get_session_resource(tool_context, "tracer")
+    if tracer is not None and tracer.enabled:
+        tracer.finish_pending(("tool", tool_context.function_call_id), response_chars=len(str(tool_response)))
+    return None
+
+def prefetch_frame(tool, args: Dict[str, Any], tool_context, tool_response) -> Optional[Dict[str, Any]]:
+    """Start capturing the end-of-step frame once a tool call is done, on pipelined controllers."""
+    controller = get_session_resource(tool_context, "browser_controller")
+    if controller is not None and hasattr(controller, "prefetch_frame"):
+        controller.prefetch_frame()
+    return None
+
+def emit_action_event(tool, args: Dict[str, Any], tool_context, tool_response) -> Optional[Dict[str, Any]]:
+    """Report a finished tool call, typed text redacted, to the run's event stream."""
+    args, result = _redacted_call(tool, args, tool_response)
+    emit_event(tool_context, ActionExecuted, agent=tool_context.agent_name, tool=tool.name,
+               args=args, result=result)
+    return None
+
+def _redacted_call(tool, args: Dict[str, Any], tool_response):
+    """Arguments and truncated response of a tool call with typed text and human answers redacted."""
+    result = str(tool_response)
+    if tool.name in USER_INPUT_TOOLS:
+        return redact_args(args), str(redact(result[:500]))
+    # The typing tools echo the text they typed
+    for text in redacted_values(args):
+        result = result.replace(text, str(redact(text)))
+    return redact_args(args), result[:500]
+
+def record_checkpoint_action(tool, args: Dict[str, Any], tool_context, tool_response) -> Optional[Dict[str, Any]]:
+    """Add a finished tool call, typed text redacted, to the actions of the run's next checkpoint."""
+    checkpointer = get_session_resource(tool_context, "checkpointer")
+    if checkpointer is not None:
+        args, result = _redacted_call(tool, args, tool_response)
+        checkpointer.record_action(tool_context.agent_name, tool.name, args, result)
+    return None
+
+def note_tool_failure(tool, args: Dict[str, Any], tool_context, tool_response) -> Optional[Dict[str, Any]]:
+    """Tell the session's ModelRouter about a failed tool call so the step is escalated."""
+    router = get_session_resource(tool_context, "model_router")
+    if router is not None and is_failed_tool_response(tool_response):
+        router.note_failure(f"tool_error:{tool.name}")
+    return None
@@ -7,10 +7,19 @@ from google.adk.agents.callback_context import CallbackContext
 from pydantic import BaseModel, Field
 
 # Import necessary components from the package
-from .. import GEMINI_MODEL
+from .. import GEMINI_COORDINATOR_MODEL
 from .executor import browser_action_executor_agent
 from .interaction import human_interaction_agent
+from .callbacks import (attach_screen_history, attach_fan_out_frames, chain_model_callbacks, lookup_llm_cache, store_llm_cache,
+                        start_model_span, finish_model_span, start_tool_span, finish_tool_span,
+                        chain_tool_callbacks, emit_action_event, prefetch_frame, record_checkpoint_action, route_model,
+                        start_model_call, finish_model_call, note_tool_failure)
 from ..schema import TaskCompletionArgs, TaskFailureArgs
+from ..tools import (list_elements_tool, click_element_id_tool, type_into_element_tool, list_tabs_tool, open_tab_tool,
+                     switch_tab_tool, close_tab_tool, fan_out_tool)
+from ..logging_config import get_logger
+
+logger = get_logger("tools")
 
 # --- Task Management Tools ---
 
@@ -20,7 +29,7 @@ def mark_task_complete(args: TaskCompletionArgs, tool_context=None) -> str:
     Marks the current browser task as successfully completed.
     This will exit the loop with a success status.
     """
-    print(f"[SUCCESS] Task marked as complete: {args.reason}")
+    logger.info("Task marked as complete: %s", args.reason)
     # This will be handled by accessing state in the tool context
     if tool_context:
         tool_context.state['task_completed'] = True
@@ -28,6 +37,8 @@ def mark_task_complete(args: TaskCompletionArgs, tool_context=None) -> str:
         tool_context.state['task_completion_reason'] = args.reason
         # Signal to the LoopAgent that it should exit
         tool_context.state['exit_loop'] = True
+        # LoopAgent only stops on an escalating event
+        tool_context.actions.escalate = True
     return f"Task marked as complete. Reason: {args.reason}"
 
 
@@ -61,8 +72,8 @@ def mark_task_failed(args: TaskFailureArgs, tool_context=None) -> str:
             reason = "Unknown failure reason"
             details = "No details available"
     
-    print(f"[FAILURE] Task marked as failed: {reason}")
-    print(f"[DETAILS] {details}")
+    logger.warning("Task marked as failed: %s", reason)
+    logger.warning("Failure details: %s", details)
     
     # This will be handled by accessing state in the tool context
     if tool_context:
@@ -71,6 +82,8 @@ def mark_task_failed(args: TaskFailureArgs, tool_context=None) -> str:
         tool_context.state['task_failure_details'] = details
         # Signal to the LoopAgent that it should exit
         tool_context.state['exit_loop'] = True
+        # LoopAgent only stops on an escalating event
+        tool_context.actions.escalate = True
     
     return f"Task marked as failed. Reason: {reason}"
 
@@ -88,7 +101,7 @@ interaction_tool = AgentTool(agent=human_interaction_agent)
 browser_coordinator_agent = LlmAgent(
     name="BrowserCoordinatorAgent",
     description="Coordinates browser actions to achieve a user goal based on visual context.",
-    model=GEMINI_MODEL, # Ensure this model supports multimodal input (image + text)
+    model=GEMINI_COORDINATOR_MODEL, # Ensure this model supports multimodal input (image + text)
     instruction=(
         "You are a browser automation coordinator. Your goal is to achieve the user's objective by interacting with a web page. "
         "You will receive the user's overall goal and the current visual state of the browser page as an image in the history. "
@@ -112,6 +125,22 @@ browser_coordinator_agent = LlmAgent(
         "\n- For scrolling: Which direction to scroll and why"
         "\n- For key presses: Which keys need to be pressed (like Enter)"
         "\n\n"
+        "For well-labelled pages you can skip the executor: call list_elements_wrapper to get the interactive elements "
+        "with ids, roles and names, then use click_element_id_wrapper / type_into_element_wrapper with the id of the element "
+        "directly. Use the BrowserActionExecutorAgent when the target is not in the list or needs visual judgement."
+        "\n\n"
+        "When several actions obviously follow one another on the current screen (for example: click the search bar, "
+        "type 'movie tickets', press Enter), send them in ONE call to the BrowserActionExecutorAgent using 'steps', "
+        "with action set to 'sequence'. Only batch actions whose targets are visible now; if a step depends on what "
+        "an earlier step reveals, stop the batch there."
+        "\n\n"
+        "To look at several sites or pages (for example to compare prices), call fan_out_wrapper with all their URLs: "
+        "they load at the same time in parallel tabs and you get each page's text (or, with extract='screenshot', a "
+        "screenshot of each) in one step instead of visiting them one after another. Use keep_open=true when you will "
+        "need to act on those pages. list_tabs_wrapper, open_tab_wrapper, switch_tab_wrapper and close_tab_wrapper "
+        "manage tabs; the screen you see and all actions apply to the active tab. Links that open a new tab show up "
+        "in list_tabs_wrapper."
+        "\n\n"
         "If you are unsure how to proceed, cannot find the necessary element, or require information like login credentials or CAPTCHA input, use the 'HumanInteractionAgent' tool to ask the user for help. When using this tool, you MUST ALWAYS include BOTH:"
         "\n- 'reason': A clear explanation of why you need human assistance"
         "\n- 'required_info': A list of the specific information you need from the user"
@@ -124,6 +153,7 @@ browser_coordinator_agent = LlmAgent(
         "\n\n"
         "Additional guidelines:"
         "\n- Always confirm that actions had the expected result by analyzing the screenshot"
+        "\n- If a screen is reported as having no visible change, your last action had no effect - try a different approach instead of repeating it"
         "\n- If text needs to be entered, ensure the correct field is focused or click it first"
         "\n- If an element is not visible, try scrolling to reveal it"
         "\n- Keep track of your progress and make sure you're advancing toward the goal"
@@ -132,6 +162,21 @@ browser_coordinator_agent = LlmAgent(
         executor_tool,
         interaction_tool,
         task_complete_tool,
-        task_failed_tool
+        task_failed_tool,
+        list_elements_tool,
+        click_element_id_tool,
+        type_into_element_tool,
+        list_tabs_tool,
+        open_tab_tool,
+        switch_tab_tool,
+        close_tab_tool,
+        fan_out_tool,
     ],
+    # The cache key includes the attached screens, so look up after attaching them
+    before_model_callback=chain_model_callbacks(attach_screen_history, attach_fan_out_frames, route_model,
+                                                lookup_llm_cache, start_model_span, start_model_call),
+    after_model_callback=chain_model_callbacks(store_llm_cache, finish_model_span, finish_model_call),
+    before_tool_callback=start_tool_span,
+    after_tool_callback=chain_tool_callbacks(prefetch_frame, finish_tool_span, emit_action_event,
+                                             record_checkpoint_action, note_tool_failure),
 )
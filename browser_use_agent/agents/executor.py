@@ -3,16 +3,21 @@
 from google.adk.agents import LlmAgent
 from pydantic import BaseModel, Field
 from typing import Optional
-from .. import GEMINI_MODEL  # Changed import to get from parent package
-from ..tools import click_tool, type_tool, scroll_tool, keypress_tool
+from .. import GEMINI_EXECUTOR_MODEL
+from ..tools import (click_tool, type_tool, scroll_tool, keypress_tool, action_sequence_tool,
+                     list_elements_tool, click_element_id_tool, type_into_element_tool, zoom_tool)
 from ..schema import BrowserActionInput, BrowserActionOutput
+from .callbacks import (attach_current_screenshot, attach_zoom_crop, chain_model_callbacks, lookup_llm_cache, store_llm_cache,
+                        start_model_span, finish_model_span, start_tool_span, finish_tool_span,
+                        chain_tool_callbacks, emit_action_event, prefetch_frame, record_checkpoint_action, route_model,
+                        start_model_call, finish_model_call, note_tool_failure)
 
 # --- Agent Definition --- #
 
 browser_action_executor_agent = LlmAgent(
     name="BrowserActionExecutorAgent",
     description="Analyzes a screenshot and a semantic action description to determine precise parameters (like coordinates) and executes low-level browser actions.",
-    model=GEMINI_MODEL, # MUST be a multimodal model capable of vision
+    model=GEMINI_EXECUTOR_MODEL, # MUST be a multimodal model capable of vision
     instruction=(
         "You are a browser interaction specialist. You receive a structured action request with a specific action_type "
         "('click', 'type_text', 'scroll', or 'keypress') and a detailed target element description. "
@@ -21,10 +26,23 @@ browser_action_executor_agent = LlmAgent(
         "\n\n"
         "Based on the action_type, perform the following:\n"
         "- For 'click': Find the exact (x,y) coordinates of the target element and call click_element tool.\n"
-        "- For 'type_text': Locate the input field and call type_text tool with the provided text_to_type.\n"
+        "- For 'type_text': Locate the input field and call type_text tool with the provided text_to_type. "
+        "Leave 'mode' unset unless the field reacts to individual keys (autocomplete, search-as-you-type, "
+        "keyboard shortcuts): then pass mode='type'.\n"
         "- For 'scroll': Determine the appropriate direction and amount to scroll, then call scroll_page tool.\n"
         "- For 'keypress': Call press_keys tool with the specified keys_to_press.\n"
         "\n"
+        "For clicks and typing you can also call list_elements_wrapper to get the page's interactive elements with ids, "
+        "roles and names. When the target is clearly in that list, use click_element_id_wrapper / type_into_element_wrapper "
+        "with its id instead of estimating coordinates from the screenshot.\n"
+        "\n"
+        "The screenshot may be low resolution. When the target is small or crowded, call zoom_region_wrapper with a "
+        "region around it first, then click with in_zoom=true using coordinates on a 0-1000 scale of the crop.\n"
+        "\n"
+        "If the request contains a list of 'steps', locate every target on the current screenshot and call "
+        "perform_actions_wrapper ONCE with all steps in order instead of calling the single-action tools one by one. "
+        "The steps run back to back and stop at the first failure; report which steps completed.\n"
+        "\n"
         "Be very precise in identifying the correct elements based on the visual information. "
         "Your job is purely execution-focused - you don't need to decide what action to take, just how to perform it accurately."
     ),
@@ -34,10 +52,22 @@ browser_action_executor_agent = LlmAgent(
         type_tool,
         scroll_tool,
         keypress_tool,
+        action_sequence_tool,
+        list_elements_tool,
+        click_element_id_tool,
+        type_into_element_tool,
+        zoom_tool,
         # Add other browser action tools here as needed
     ],
     
     # This agent should only execute the requested action, so disable transfers
     disallow_transfer_to_parent=True,
     disallow_transfer_to_peers=True,
+    # The AgentTool session only carries the request text, so add the screen here
+    before_model_callback=chain_model_callbacks(attach_current_screenshot, attach_zoom_crop, route_model,
+                                                lookup_llm_cache, start_model_span, start_model_call),
+    after_model_callback=chain_model_callbacks(store_llm_cache, finish_model_span, finish_model_call),
+    before_tool_callback=start_tool_span,
+    after_tool_callback=chain_tool_callbacks(prefetch_frame, finish_tool_span, emit_action_event,
+                                             record_checkpoint_action, note_tool_failure),
 )
@@ -3,17 +3,18 @@
 from google.adk.agents import LlmAgent
 from pydantic import BaseModel, Field
 from typing import List, Optional
-from .. import GEMINI_MODEL  # Changed import to get from parent package
+from .. import GEMINI_INTERACTION_MODEL
 # Import the user input tool (will be defined later)
 from ..tools import get_user_input_tool
 from ..schema import HumanInteractionInput
+from .callbacks import chain_model_callbacks, route_model, start_model_call, finish_model_call
 
 # --- Agent Definition --- #
 
 human_interaction_agent = LlmAgent(
     name="HumanInteractionAgent",
     description="Interacts with the human user to gather necessary information when the browser agent is stuck.",
-    model=GEMINI_MODEL, # Can be a simpler model
+    model=GEMINI_INTERACTION_MODEL, # Can be a simpler model
     instruction=(
         "You are an assistant helping a browser automation agent. The agent needs input from the human user. "
         "You will receive the reason and the specific information required. "
@@ -28,4 +29,7 @@ human_interaction_agent = LlmAgent(
     # This agent's job is just to get input and finish, update state via tool/callback if needed
     disallow_transfer_to_parent=True,
     disallow_transfer_to_peers=True,
+    # Recorded in the run's model metrics; ModelRouter.agents never escalates this agent
+    before_model_callback=chain_model_callbacks(route_model, start_model_call),
+    after_model_callback=finish_model_call,
 )
@@ -0,0 +1,703 @@
+"""Asyncio counterpart of BrowserController built on playwright.async_api."""
+
+from playwright.async_api import async_playwright, Page, Browser, Playwright
+from google.genai import types
+from typing import Any, Dict, List, Union
+import asyncio
+import time
+
+from .utils import correct_coordinates, zoom_rectangle
+from .screenshot import LOW_RES_POLICY, ScreenshotPolicy, encode_screenshot
+from .pipeline import PipelineOptions, PipelineRecorder, encode_frame, encode_pool
+from .elements import ElementIndex, InteractiveElement, EXTRACT_ELEMENTS_SCRIPT, PAGE_STATE_SCRIPT, FOCUS_ELEMENT_SCRIPT
+from .settle import SettleOptions, NetworkTracker, SettleRecorder, wait_for_settle_async
+from .tracing import (NULL_TRACER, traced, action_attributes, capture_attributes, fan_out_attributes, settle_attributes,
+                      typing_attributes)
+from .launch import LaunchProfile, get_launch_profile
+from .blocking import BlockingOptions, RequestBlocker
+from .http_cache import HarOptions, HttpResponseCache
+from .text_entry import TypingOptions, TypingRecorder, enter_text_async
+from .identity import IdentityStore
+from .tabs import MAX_FAN_OUT_TABS, PAGE_TEXT_SCRIPT, FanOutRecorder, tab_result
+from .logging_config import get_logger, redact
+
+logger = get_logger("browser")
+
+class AsyncBrowserController:
+    """
+    Async browser controller exposing the same surface as BrowserController.
+
+    Playwright's async objects can only be created inside a running event loop,
+    so build instances with ``await AsyncBrowserController.create()`` rather than
+    calling the constructor directly.
+    """
+
+    def __init__(self, viewport_width=1024, viewport_height=768, screenshot_policy: ScreenshotPolicy = None,
+                 settle_options: SettleOptions = None, launch_profile: Union[str, LaunchProfile] = None,
+                 blocking: BlockingOptions = None, http_cache: HttpResponseCache = None, har: HarOptions = None,
+                 typing_options: TypingOptions = None, pipeline_options: PipelineOptions = None,
+                 storage_state: Dict[str, Any] = None, identity_store: IdentityStore = None,
+                 identity: str = None, browser: Browser = None):
+        self.viewport_width = viewport_width
+        self.viewport_height = viewport_height
+        self.launch_profile = get_launch_profile(launch_profile)
+        self.request_blocker = RequestBlocker(blocking) if blocking is not None else None
+        self.http_cache = http_cache
+        self.har = har
+        self.initial_storage_state = storage_state
+        self.identity_store = identity_store if identity else None
+        self.identity = identity
+        self.screenshot_policy = screenshot_policy or LOW_RES_POLICY
+        self.last_capture_stats = None
+        self.settle_options = settle_options or SettleOptions()
+        self.settle_recorder = SettleRecorder()
+        self.typing_options = typing_options or TypingOptions()
+        self.typing_recorder = TypingRecorder()
+        # Last zoom crop and its (left, top, width, height) CSS rectangle, dropped after any action
+        self.zoom_region = None
+        self.zoom_crop: types.Blob = None
+        # Signature of the last capture for ScreenHistory; steps are timed for the pipeline metrics
+        self.last_signature = None
+        self.pipeline_options = pipeline_options or PipelineOptions()
+        self.pipeline_recorder = PipelineRecorder()
+        # Frame captured once the last tool call settled: (task, action generation, start time)
+        self._action_generation = 0
+        self._captured_generation = None
+        self._prefetch = None
+        self.network_tracker: NetworkTracker = None
+        # One tracker per tab; network_tracker is the active tab's
+        self._network_trackers = {}
+        self.fan_out_recorder = FanOutRecorder()
+        self.element_index = ElementIndex()
+        # Replaced by the runner's Tracer when tracing is enabled
+        self.tracer = NULL_TRACER
+        self.playwright: Playwright = None
+        self.browser: Browser = browser
+        self.owns_browser = browser is None
+        self.context = None
+        self.page: Page = None
+
+    @classmethod
+    async def create(cls, viewport_width=1024, viewport_height=768, screenshot_policy: ScreenshotPolicy = None,
+                     settle_options: SettleOptions = None, launch_profile: Union[str, LaunchProfile] = None,
+                     blocking: BlockingOptions = None, http_cache: HttpResponseCache = None,
+                     har: HarOptions = None, typing_options: TypingOptions = None,
+                     pipeline_options: PipelineOptions = None,
+                     storage_state: Dict[str, Any] = None, identity_store: IdentityStore = None,
+                     identity: str = None, browser: Browser = None) -> "AsyncBrowserController":
+        """
+        Create and start a controller.
+
+        Args:
+            viewport_width: Width of the browser viewport in pixels
+            viewport_height: Height of the browser viewport in pixels
+            screenshot_policy: How screenshots are encoded (defaults to LOW_RES_POLICY, with zoom
+                crops at full resolution)
+            settle_options: How to wait for the page after actions (defaults to settle detection)
+            launch_profile: Name of a LAUNCH_PROFILES entry or a LaunchProfile (defaults to "default")
+            blocking: Optional request blocking by resource type and domain for this task
+            http_cache: Optional persistent response cache serving repeated GETs from disk
+            har: Optional HAR recording or replay of this task's network
+            typing_options: How text is entered (defaults to 'auto': insertion with a keystroke fallback)
+            pipeline_options: Whether end-of-step frames are captured early and encoded off the event loop
+            storage_state: Optional cookies and local storage (as returned by storage_state()) to
+                start the context with
+            identity_store: Optional encrypted store of storage states by identity
+            identity: Identity whose stored state the context starts with (unless storage_state
+                is given) and is saved back to on close()
+            browser: Optional already-launched browser (e.g. from an AsyncBrowserPool). When
+                given, the controller only owns a fresh BrowserContext on it and close()
+                leaves the browser running.
+
+        Returns:
+            AsyncBrowserController: A started controller with an open page.
+        """
+        controller = cls(viewport_width=viewport_width, viewport_height=viewport_height,
+                         screenshot_policy=screenshot_policy, settle_options=settle_options,
+                         launch_profile=launch_profile, blocking=blocking,
+                         http_cache=http_cache, har=har, typing_options=typing_options,
+                         pipeline_options=pipeline_options, storage_state=storage_state,
+                         identity_store=identity_store, identity=identity, browser=browser)
+        await controller.start()
+        return controller
+
+    async def start(self):
+        try:
+            if self.owns_browser:
+                self.playwright = await async_playwright().start()
+                self.browser = await self.playwright.chromium.launch(**self.launch_profile.launch_options())
+            if self.initial_storage_state is None and self.identity_store is not None:
+                # File lock and decryption stay off the event loop
+                self.initial_storage_state = await asyncio.to_thread(self.identity_store.load, self.identity)
+            self.context = await self.browser.new_context(
+                **self.launch_profile.context_options(self.viewport_width, self.viewport_height),
+                storage_state=self.initial_storage_state)
+            # Routes run most recently registered first: blocker, then HAR, then the cache
+            if self.http_cache is not None:
+                await self.context.route("**/*", self.http_cache.handle_async)
+            if self.har is not None:
+                await self.context.route_from_har(**self.har.route_options())
+            if self.request_blocker is not None:
+                await self.context.route("**/*", self.request_blocker.handle_async)
+                self.context.on("requestfinished", self.request_blocker.observe_finished)
+            self.page = await self.context.new_page()
+            self.network_tracker = NetworkTracker(self.page, long_request_ms=self.settle_options.long_request_ms)
+            self._network_trackers[self.page] = self.network_tracker
+            logger.info("Browser initialized.")
+
+        except Exception as e:
+            logger.error("Error during browser initialization: %s", e)
+            # Attempt cleanup if partial initialization occurred
+            if self.context:
+                await self.context.close()
+            if self.owns_browser and self.browser:
+                await self.browser.close()
+            if self.playwright:
+                await self.playwright.stop()
+            raise # Re-raise the exception
+
+    @traced("browser.navigate")
+    async def navigate(self, url: str):
+        try:
+            await self.page.goto(url, wait_until='load', timeout=60000)
+            logger.info("Navigation successful.")
+        except Exception as e:
+            logger.error("Error navigating to %s: %s", url, e)
+
+    async def close(self):
+        logger.debug("Closing browser controller...")
+        self._cancel_prefetch()
+        try:
+            if self.context:
+                await self.save_identity()
+                await self.context.close()
+                self.context = None
+            if self.owns_browser and self.browser:
+                await self.browser.close()
+                logger.debug("Browser closed.")
+            if self.playwright:
+                await self.playwright.stop()
+                logger.debug("Playwright stopped.")
+        except Exception as e:
+            logger.error("Error during closing: %s", e)
+
+    @traced("browser.screenshot", capture_attributes)
+    async def screenshot(self) -> types.Part:
+        """
+        Take a screenshot of the current browser page and return it as a Part object
+        compatible with Google's Gemini model, encoded according to screenshot_policy.
+
+        Size and timing of the capture are kept in last_capture_stats. With pipelining, the
+        frame captured once the last tool call's actions settled is returned when
+        no action happened since and it is recent enough (see prefetch_frame).
+
+        Returns:
+            types.Part: A Part object containing the screenshot as inline data.
+        """
+        try:
+            frame = await self._take_prefetched()
+            if frame is None:
+                frame = await self._capture_frame()
+            part, stats, self.last_signature = frame
+            self.last_capture_stats = stats
+            self._captured_generation = self._action_generation
+
+            logger.debug("Screenshot captured: %s, %d bytes, capture %.1f ms, encode %.1f ms.",
+                         stats['format'], stats['bytes'], stats['capture_ms'], stats['encode_ms'])
+            return part
+
+        except Exception as e:
+            logger.error("Error taking screenshot: %s", e)
+            raise
+
+    async def _capture_frame(self):
+        """Capture the viewport and encode it, in the encoding pool when pipelining is enabled."""
+        started = time.perf_counter()
+        raw = await self.page.screenshot(
+            **self.screenshot_policy.capture_options(self.viewport_width, self.viewport_height)
+        )
+        capture_ms = (time.perf_counter() - started) * 1000
+        args = (raw, self.screenshot_policy, self.viewport_width, self.viewport_height, capture_ms)
+        if not self.pipeline_options.enabled:
+            return encode_frame(*args)
+        pool = encode_pool(self.pipeline_options.encode_workers)
+        return await asyncio.get_running_loop().run_in_executor(pool, encode_frame, *args)
+
+    def prefetch_frame(self):
+        """
+        Start capturing the end-of-step frame of the settled page while the models carry on.
+
+        Called once a tool call (or a whole action sequence) has finished rather than after
+        every action, since a capture started between two actions of the same call is
+        always discarded. Does nothing without pipelining, when no action happened since
+        the last frame or when a capture of the current page is already under way.
+        """
+        if not self.pipeline_options.enabled or self.page is None or self._prefetch is not None:
+            return
+        if self._captured_generation == self._action_generation:
+            return
+        task = asyncio.ensure_future(self._capture_frame())
+        # A superseded prefetch is never awaited: retrieve its error so it is not reported as lost
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self._prefetch = (task, self._action_generation, time.perf_counter())
+
+    def _cancel_prefetch(self):
+        # Cancelling stops a capture still waiting on the page, but not an encode already
+        # running in the pool, so the capture counts as discarded either way
+        if self._prefetch is not None:
+            self._prefetch[0].cancel()
+            self._prefetch = None
+            self.pipeline_recorder.discard_prefetch()
+
+    async def _take_prefetched(self):
+        """Return the prefetched (part, stats, signature) if it still shows the current page, else None."""
+        prefetch, self._prefetch = self._prefetch, None
+        if prefetch is None:
+            return None
+        task, generation, started = prefetch
+        age_ms = (time.perf_counter() - started) * 1000
+        if generation != self._action_generation or age_ms > self.pipeline_options.max_prefetch_age_ms:
+            task.cancel()
+            self.pipeline_recorder.discard_prefetch()
+            return None
+        try:
+            part, stats, signature = await task
+        except Exception as e:
+            logger.debug("Prefetched capture failed, capturing again: %s", e)
+            return None
+        return part, dict(stats, prefetched=True), signature
+
+    @traced("browser.zoom", capture_attributes)
+    async def zoom(self, x1: float, y1: float, x2: float, y2: float) -> types.Part:
+        """
+        Capture a region of the page at full (device pixel) resolution.
+
+        The crop is kept in zoom_crop for the executor's next request, and clicks with
+        in_zoom=True take coordinates relative to it until the next action.
+
+        Args:
+            x1: Left edge of the region in model scale (0-1000)
+            y1: Top edge of the region in model scale (0-1000)
+            x2: Right edge of the region in model scale (0-1000)
+            y2: Bottom edge of the region in model scale (0-1000)
+
+        Returns:
+            types.Part: The crop as inline data
+        """
+        width, height = self.viewport_size()
+        region = zoom_rectangle(x1, y1, x2, y2, width, height)
+        scale = self.launch_profile.device_scale_factor
+        started = time.perf_counter()
+        raw = await self.page.screenshot(**self.screenshot_policy.zoom_capture_options(region))
+        capture_ms = (time.perf_counter() - started) * 1000
+        part, stats = encode_screenshot(raw, self.screenshot_policy.zoom_policy(), int(region[2] * scale),
+                                        int(region[3] * scale), capture_ms=capture_ms)
+        self.last_capture_stats = dict(stats, zoom=True)
+        self.zoom_region = region
+        self.zoom_crop = part.inline_data
+        logger.info("Zoomed into (%.0f,%.0f) %.0fx%.0f CSS px, %d bytes", *region, stats['bytes'])
+        return part
+
+    def viewport_size(self):
+        """Return the page's viewport (width, height) in CSS pixels."""
+        size = self.page.viewport_size if self.page is not None else None
+        if size:
+            return size["width"], size["height"]
+        return self.viewport_width, self.viewport_height
+
+    @traced("browser.settle", settle_attributes)
+    async def _wait_after_action(self, action: str, delay_after: int):
+        """
+        Wait until the page settles after an action (capped by settle_options.max_ms),
+        or sleep delay_after ms when settle detection is disabled.
+        """
+        # Any action may change the page, so element ids, zoom crops, fan-out captures and prefetched frames are stale
+        self.element_index.invalidate()
+        self.zoom_region = self.zoom_crop = None
+        self.fan_out_recorder.frames = []
+        self._action_generation += 1
+        self._cancel_prefetch()
+        if not self.settle_options.enabled:
+            await self.page.wait_for_timeout(delay_after)
+        else:
+            outcome = await wait_for_settle_async(self.page, self.network_tracker, self.settle_options)
+            self.settle_recorder.record(action, **outcome)
+            logger.debug("Page settled after %s in %.0f ms%s", action, outcome['elapsed_ms'],
+                         " (cap reached)" if outcome['timed_out'] else "")
+
+    async def storage_state(self) -> Dict[str, Any]:
+        """Return the context's cookies and local storage, to start a later context with."""
+        return await self.context.storage_state()
+
+    async def save_identity(self):
+        """Merge the context's cookies and local storage into the identity's stored state."""
+        if self.identity_store is None or self.context is None:
+            return
+        try:
+            state = await self.context.storage_state()
+            await asyncio.to_thread(self.identity_store.save, self.identity, state)
+        except Exception as e:
+            logger.error("Error saving state of identity %s: %s", self.identity, e)
+
+    def settle_metrics(self):
+        """Return count, average/max duration and cap hits of the settle waits so far."""
+        return self.settle_recorder.metrics()
+
+    def pipeline_metrics(self):
+        """Return per-step wall time, time spent waiting for frames, the serial estimate and discarded prefetches."""
+        return self.pipeline_recorder.metrics()
+
+    def typing_metrics(self):
+        """Return entry counts per strategy, keystroke fallbacks and average entry time."""
+        return self.typing_recorder.metrics()
+
+    def blocking_metrics(self):
+        """Return the request blocker's counts and estimated savings (None without blocking)."""
+        return self.request_blocker.metrics() if self.request_blocker is not None else None
+
+    @traced("browser.click", action_attributes)
+    async def click(self, x: float, y: float, label: str = None, button: str = "left", timeout: int = 5000, delay_after: int = 500,
+                    in_zoom: bool = False):
+        """
+        Click at the specified coordinates.
+
+        Args:
+            x: X-coordinate in model scale (0-1000)
+            y: Y-coordinate in model scale (0-1000)
+            label: Optional label for logging/debugging
+            button: Mouse button to click ("left", "middle", "right")
+            timeout: Timeout for the click operation in ms
+            delay_after: Fixed wait after click in ms, used only when settle detection is disabled
+            in_zoom: Coordinates are relative to the last zoom crop instead of the whole page
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        label = label or '[no label provided]'
+        logger.info("Clicking at model coords (%s,%s), label: '%s'", x, y, label)
+
+        if in_zoom and self.zoom_region is None:
+            logger.warning("Click relative to a zoom crop requested, but there is no current crop")
+            return False
+
+        try:
+            width, height = self.viewport_size()
+            x_orig, y_orig = correct_coordinates(x, y, width, height, region=self.zoom_region if in_zoom else None)
+            await self.page.mouse.click(x_orig, y_orig, button=button)
+            await self._wait_after_action("click", delay_after)
+            return True
+        except Exception as e:
+            logger.error("Error clicking: %s", e)
+            return False
+
+    @traced("browser.scroll", action_attributes)
+    async def scroll(self, direction: str = "down", amount: int = 500, x: float = None, y: float = None, delay_after: int = 500):
+        """
+        Scroll the page in the specified direction.
+
+        Args:
+            direction: Direction to scroll ("up" or "down")
+            amount: Amount to scroll in pixels
+            x: Optional X-coordinate to position mouse before scrolling (model scale 0-1000)
+            y: Optional Y-coordinate to position mouse before scrolling (model scale 0-1000)
+            delay_after: Fixed wait after scroll in ms, used only when settle detection is disabled
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            if x is not None and y is not None:
+                x_orig, y_orig = correct_coordinates(x, y, *self.viewport_size())
+                await self.page.mouse.move(x_orig, y_orig)
+
+            scroll_delta_y = amount if direction == "down" else -amount
+            logger.info("Scrolling %s by approx %s pixels", direction, amount)
+
+            await self.page.mouse.wheel(0, scroll_delta_y)
+            await self._wait_after_action("scroll", delay_after)
+            return True
+        except Exception as e:
+            logger.error("Error scrolling: %s", e)
+            return False
+
+    @traced("browser.type_text", typing_attributes)
+    async def type_text(self, text: str, label: str = None, delay: int = None, timeout: int = 10000, delay_after: int = 200,
+                  mode: str = None):
+        """
+        Enter the specified text into the focused field.
+
+        Args:
+            text: The text to type
+            label: Optional label for logging/debugging
+            delay: Delay between keystrokes in ms (defaults to the typing options)
+            timeout: Timeout for the typing operation in ms
+            delay_after: Fixed wait after typing in ms, used only when settle detection is disabled
+            mode: 'auto', 'insert', 'fill' or 'type', overriding typing_options.mode
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        label = label or '[no field label provided]'
+        logger.info("Typing text %s (intended field: '%s')", redact(text), label)
+
+        try:
+            started = time.perf_counter()
+            used = await enter_text_async(self.page, text, self.typing_options, mode=mode, delay=delay, timeout=timeout)
+            self.typing_recorder.record(mode or self.typing_options.mode, used, len(text),
+                                        (time.perf_counter() - started) * 1000)
+            await self._wait_after_action("type_text", delay_after)
+            return True
+        except Exception as e:
+            logger.error("Error typing: %s", e)
+            return False
+
+    @traced("browser.press_keys", action_attributes)
+    async def press_keys(self, keys, delay_after: int = 200):
+        """
+        Press keyboard keys.
+
+        Args:
+            keys: Single key or list of keys to press
+            delay_after: Fixed wait after key press in ms, used only when settle detection is disabled
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        if not isinstance(keys, list):
+            keys = [keys]
+
+        try:
+            for key in keys:
+                pw_key = key
+                if key.lower() == "enter":
+                    pw_key = "Enter"
+                elif key.lower() == "tab":
+                    pw_key = "Tab"
+                elif key.lower() == "escape" or key.lower() == "esc":
+                    pw_key = "Escape"
+
+                logger.info("Pressing key: '%s'", pw_key)
+                await self.page.keyboard.press(pw_key)
+
+                # Enter usually submits a form, so allow the longer fixed wait when settle detection is off
+                await self._wait_after_action("press_keys", 1500 if pw_key == "Enter" else delay_after)
+            return True
+        except Exception as e:
+            logger.error("Error pressing keys: %s", e)
+            return False
+
+    @traced("browser.list_elements", lambda controller, result: {"elements": len(result)})
+    async def list_elements(self, refresh: bool = False) -> List[InteractiveElement]:
+        """
+        List the interactive elements visible in the viewport with role, name and bounding box.
+
+        The list is cached until the URL, DOM or scroll position changes, or an action runs.
+
+        Args:
+            refresh: Re-extract even if the cached list is still valid
+
+        Returns:
+            List[InteractiveElement]: Elements indexed by id in document order
+        """
+        page_state = await self.page.evaluate(PAGE_STATE_SCRIPT)
+        if not refresh and self.element_index.is_fresh(page_state):
+            return self.element_index.elements
+        extracted = await self.page.evaluate(EXTRACT_ELEMENTS_SCRIPT, self.element_index.max_elements)
+        elements = self.element_index.update(extracted, page_state)
+        logger.debug("Indexed %d interactive elements.", len(elements))
+        return elements
+
+    @traced("browser.click_element", action_attributes)
+    async def click_element(self, element_id: int, button: str = "left", delay_after: int = 500):
+        """
+        Click an element from the latest list_elements() result.
+
+        Args:
+            element_id: Id of the element in the element list
+            button: Mouse button to click ("left", "middle", "right")
+            delay_after: Fixed wait after click in ms, used only when settle detection is disabled
+
+        Returns:
+            bool: True if successful, False otherwise (including an unknown or stale id)
+        """
+        element = self.element_index.get(element_id)
+        if element is None:
+            logger.warning("Element [%s] is unknown or the element list is stale", element_id)
+            return False
+        logger.info("Clicking element [%s] %s '%s'", element_id, element.role, element.name)
+
+        try:
+            x, y = element.center
+            await self.page.mouse.click(x, y, button=button)
+            await self._wait_after_action("click_element", delay_after)
+            return True
+        except Exception as e:
+            logger.error("Error clicking element: %s", e)
+            return False
+
+    @traced("browser.type_into", action_attributes)
+    async def type_into(self, element_id: int, text: str, delay: int = None, delay_after: int = 200, mode: str = None):
+        """
+        Focus an element from the latest list_elements() result and type into it.
+
+        Args:
+            element_id: Id of the element in the element list
+            text: The text to type
+            delay: Delay between keystrokes in ms (defaults to the typing options)
+            delay_after: Fixed wait after typing in ms, used only when settle detection is disabled
+            mode: 'auto', 'insert', 'fill' or 'type', overriding typing_options.mode
+
+        Returns:
+            bool: True if successful, False otherwise (including an unknown or stale id)
+        """
+        element = self.element_index.get(element_id)
+        if element is None:
+            logger.warning("Element [%s] is unknown or the element list is stale", element_id)
+            return False
+
+        try:
+            focused = await self.page.evaluate(FOCUS_ELEMENT_SCRIPT, element_id)
+            if not focused:
+                # Some widgets only take focus from a real click
+                x, y = element.center
+                await self.page.mouse.click(x, y)
+        except Exception as e:
+            logger.error("Error focusing element: %s", e)
+            return False
+        return await self.type_text(text, label=element.name, delay=delay, delay_after=delay_after, mode=mode)
+
+    # --- Tabs ---
+
+    async def _use_page(self, page: Page):
+        """Make page the tab that actions, captures and settle detection apply to."""
+        self.page = page
+        if page not in self._network_trackers:
+            self._network_trackers[page] = NetworkTracker(page, long_request_ms=self.settle_options.long_request_ms)
+        self.network_tracker = self._network_trackers[page]
+        self.element_index.invalidate()
+        self.zoom_region = self.zoom_crop = None
+        # A frame prefetched from the previous tab must not be taken for this one
+        self._action_generation += 1
+        self._cancel_prefetch()
+        await page.bring_to_front()
+
+    async def list_tabs(self) -> List[Dict[str, Any]]:
+        """
+        Describe the open tabs, including ones the page opened itself (target=_blank links, popups).
+
+        Returns:
+            List of dicts with the tab's index, url, title and whether it is the active tab
+        """
+        pages = self.context.pages
+        titles = await asyncio.gather(*(page.title() for page in pages))
+        return [{"index": index, "url": page.url, "title": title, "active": page is self.page}
+                for index, (page, title) in enumerate(zip(pages, titles))]
+
+    @traced("browser.open_tab", action_attributes)
+    async def open_tab(self, url: str = None) -> int:
+        """
+        Open a new tab, optionally load a URL in it, and make it the active tab.
+
+        Returns:
+            int: Index of the new tab
+        """
+        page = await self.context.new_page()
+        await self._use_page(page)
+        if url:
+            await self.navigate(url)
+        return self.context.pages.index(page)
+
+    @traced("browser.switch_tab", action_attributes)
+    async def switch_tab(self, index: int) -> bool:
+        """Make the tab at index (from list_tabs) the active tab."""
+        pages = self.context.pages
+        if not 0 <= index < len(pages):
+            logger.error("No tab with index %s (%d open)", index, len(pages))
+            return False
+        await self._use_page(pages[index])
+        return True
+
+    @traced("browser.close_tab", action_attributes)
+    async def close_tab(self, index: int = None) -> bool:
+        """
+        Close the tab at index (the active tab when None). The last open tab is never closed;
+        closing the active tab activates the most recently opened remaining one.
+        """
+        pages = self.context.pages
+        if len(pages) <= 1:
+            logger.error("Refusing to close the last tab")
+            return False
+        page = self.page if index is None else (pages[index] if 0 <= index < len(pages) else None)
+        if page is None:
+            logger.error("No tab with index %s (%d open)", index, len(pages))
+            return False
+        await page.close()
+        self._network_trackers.pop(page, None)
+        if page is self.page:
+            await self._use_page(self.context.pages[-1])
+        return True
+
+    @traced("browser.fan_out", fan_out_attributes)
+    async def fan_out(self, urls: List[str], extract: str = "text", keep_open: bool = False, max_chars: int = 3000,
+                      timeout: int = 30000) -> List[Dict[str, Any]]:
+        """
+        Load several URLs concurrently in new tabs of this context and take the visible text
+        or a screenshot of each, without changing the active tab. See BrowserController.fan_out.
+
+        Returns:
+            List of tab_result dicts in the order of urls
+        """
+        started = time.perf_counter()
+        results = await asyncio.gather(*(
+            self._load_tab(str(position), url, extract, keep_open, max_chars, timeout)
+            for position, url in enumerate(urls[:MAX_FAN_OUT_TABS], start=1)
+        ))
+        # New tabs come to the front in headed mode; the active tab stays the one actions apply to
+        await self.page.bring_to_front()
+
+        self.fan_out_recorder.record(results, (time.perf_counter() - started) * 1000)
+        self.fan_out_recorder.keep_frames(results)
+        logger.info("Fanned out to %d tabs in %.0f ms", len(results), self.fan_out_recorder.history[-1]["wall_ms"])
+        return list(results)
+
+    async def _load_tab(self, label: str, url: str, extract: str, keep_open: bool, max_chars: int,
+                        timeout: int) -> Dict[str, Any]:
+        """Load one fan-out tab and extract from it; errors are returned in the result."""
+        page = await self.context.new_page()
+        started = time.perf_counter()
+        try:
+            await page.goto(url, wait_until="load", timeout=timeout)
+            load_ms = (time.perf_counter() - started) * 1000
+            text = image = None
+            if extract == "text":
+                text = await page.evaluate(PAGE_TEXT_SCRIPT, max_chars)
+            else:
+                raw = await page.screenshot(**self.screenshot_policy.capture_options(self.viewport_width,
+                                                                                     self.viewport_height))
+                args = (raw, self.screenshot_policy, self.viewport_width, self.viewport_height)
+                part, _ = await asyncio.get_running_loop().run_in_executor(
+                    encode_pool(self.pipeline_options.encode_workers), encode_screenshot, *args)
+                image = part.inline_data
+            index = self.context.pages.index(page) if keep_open else None
+            return tab_result(label, url, index=index, title=await page.title(), text=text, image=image,
+                              load_ms=load_ms)
+        except Exception as e:
+            return tab_result(label, url, load_ms=(time.perf_counter() - started) * 1000, error=str(e))
+        finally:
+            if not keep_open:
+                await page.close()
+
+    def tabs_metrics(self):
+        """Return fan-out counts and their wall time against loading the tabs one by one."""
+        return self.fan_out_recorder.metrics()
+
+    async def fingerprint(self) -> Dict[str, Any]:
+        """
+        Cheap description of the current page used to check that a replayed step runs on
+        the same page it was recorded on.
+
+        Returns:
+            Dict with the page url and the 'role:name' of its visible interactive elements
+        """
+        elements = await self.list_elements()
+        return {"url": self.page.url, "elements": [f"{e.role}:{e.name}" for e in elements]}
@@ -1,102 +1,267 @@
-from playwright.sync_api import sync_playwright, Page, Browser, Playwright
+from playwright.sync_api import sync_playwright, Page, Browser, BrowserContext, Playwright
 from google.genai import types
-import io
-from PIL import Image
+from typing import Any, Dict, List, Union
 import time # Added for handle_action
 
 # Assuming correct_coordinates remains in the global utils
-from .utils import correct_coordinates
+from .utils import correct_coordinates, zoom_rectangle
+from .screenshot import LOW_RES_POLICY, ScreenshotPolicy, encode_screenshot
+from .pipeline import PipelineRecorder, encode_frame
+from .elements import ElementIndex, InteractiveElement, EXTRACT_ELEMENTS_SCRIPT, PAGE_STATE_SCRIPT, FOCUS_ELEMENT_SCRIPT
+from .settle import SettleOptions, NetworkTracker, SettleRecorder, wait_for_settle
+from .tracing import (NULL_TRACER, traced, action_attributes, capture_attributes, fan_out_attributes, settle_attributes,
+                      typing_attributes)
+from .launch import LaunchProfile, get_launch_profile
+from .blocking import BlockingOptions, RequestBlocker
+from .http_cache import HarOptions, HttpResponseCache
+from .text_entry import TypingOptions, TypingRecorder, enter_text
+from .identity import IdentityStore
+from .tabs import MAX_FAN_OUT_TABS, PAGE_TEXT_SCRIPT, FanOutRecorder, tab_result
+from .logging_config import get_logger, redact
+
+logger = get_logger("browser")
 
 class BrowserController:
-    def __init__(self, viewport_width=1024, viewport_height=768):
+    def __init__(self, viewport_width=1024, viewport_height=768, browser: Browser = None,
+                 screenshot_policy: ScreenshotPolicy = None, settle_options: SettleOptions = None,
+                 launch_profile: Union[str, LaunchProfile] = None, blocking: BlockingOptions = None,
+                 http_cache: HttpResponseCache = None, har: HarOptions = None,
+                 typing_options: TypingOptions = None, storage_state: Dict[str, Any] = None,
+                 identity_store: IdentityStore = None, identity: str = None):
+        """
+        Start a browser page.
+
+        Args:
+            viewport_width: Width of the browser viewport in pixels
+            viewport_height: Height of the browser viewport in pixels
+            browser: Optional already-launched browser (e.g. from a BrowserPool). When
+                given, the controller only owns a fresh BrowserContext on it and close()
+                leaves the browser running.
+            screenshot_policy: How screenshots are encoded (defaults to LOW_RES_POLICY, with zoom
+                crops at full resolution)
+            settle_options: How to wait for the page after actions (defaults to settle detection)
+            launch_profile: Name of a LAUNCH_PROFILES entry or a LaunchProfile (defaults to
+                "default", a visible window). Pooled controllers only use its context options.
+            blocking: Optional request blocking by resource type and domain for this task
+            http_cache: Optional persistent response cache serving repeated GETs from disk
+            har: Optional HAR recording or replay of this task's network
+            typing_options: How text is entered (defaults to 'auto': insertion with a keystroke fallback)
+            storage_state: Optional cookies and local storage (as returned by storage_state()) to
+                start the context with
+            identity_store: Optional encrypted store of storage states by identity
+            identity: Identity whose stored state the context starts with (unless storage_state
+                is given) and is saved back to on close()
+        """
+        self.playwright: Playwright = None
+        self.browser: Browser = None
+        self.context: BrowserContext = None
+        self.owns_browser = browser is None
+        self.screenshot_policy = screenshot_policy or LOW_RES_POLICY
+        self.last_capture_stats = None
+        self.settle_options = settle_options or SettleOptions()
+        self.settle_recorder = SettleRecorder()
+        self.typing_options = typing_options or TypingOptions()
+        self.typing_recorder = TypingRecorder()
+        # Last zoom crop and its (left, top, width, height) CSS rectangle, dropped after any action
+        self.zoom_region = None
+        self.zoom_crop: types.Blob = None
+        # Signature of the last capture for ScreenHistory; steps are timed for the pipeline metrics
+        self.last_signature = None
+        self.pipeline_recorder = PipelineRecorder()
+        self.network_tracker: NetworkTracker = None
+        # One tracker per tab; network_tracker is the active tab's
+        self._network_trackers = {}
+        self.fan_out_recorder = FanOutRecorder()
+        self.element_index = ElementIndex()
+        # Replaced by the runner's Tracer when tracing is enabled
+        self.tracer = NULL_TRACER
+        self.launch_profile = get_launch_profile(launch_profile)
+        self.request_blocker = RequestBlocker(blocking) if blocking is not None else None
+        self.http_cache = http_cache
+        self.har = har
+        self.identity_store = identity_store if identity else None
+        self.identity = identity
         try:
             self.viewport_width = viewport_width
             self.viewport_height = viewport_height
-            self.playwright: Playwright = sync_playwright().start()
-            self.browser: Browser = self.playwright.chromium.launch(
-                headless=False, # Keep False for debugging, True for headless
-                chromium_sandbox=True,
-                env={},
-                args=["--disable-extensions", "--disable-file-system"]
-            )
-            self.page: Page = self.browser.new_page()
-            self.page.set_viewport_size({"width": viewport_width, "height": viewport_height})
-            print("    BROWSER_CONTROLLER >> Browser initialized.") # Updated print prefix
+            if self.owns_browser:
+                self.playwright = sync_playwright().start()
+                self.browser = self.playwright.chromium.launch(**self.launch_profile.launch_options())
+            else:
+                self.browser = browser
+            if storage_state is None and self.identity_store is not None:
+                storage_state = self.identity_store.load(identity)
+            # A dedicated context keeps cookies and storage isolated per task
+            self.context = self.browser.new_context(**self.launch_profile.context_options(viewport_width, viewport_height),
+                                                    storage_state=storage_state)
+            # Routes run most recently registered first: blocker, then HAR, then the cache
+            if self.http_cache is not None:
+                self.context.route("**/*", self.http_cache.handle)
+            if self.har is not None:
+                self.context.route_from_har(**self.har.route_options())
+            if self.request_blocker is not None:
+                self.context.route("**/*", self.request_blocker.handle)
+                self.context.on("requestfinished", self.request_blocker.observe_finished)
+            self.page: Page = self.context.new_page()
+            self.network_tracker = NetworkTracker(self.page, long_request_ms=self.settle_options.long_request_ms)
+            self._network_trackers[self.page] = self.network_tracker
+            logger.info("Browser initialized.")
 
         except Exception as e:
-            print(f"    BROWSER_CONTROLLER >> Error during browser initialization: {e}") # Updated print prefix
+            logger.error("Error during browser initialization: %s", e)
             # Attempt cleanup if partial initialization occurred
-            if hasattr(self, 'browser') and self.browser:
+            if self.context:
+                self.context.close()
+            if self.owns_browser and self.browser:
                 self.browser.close()
-            if hasattr(self, 'playwright') and self.playwright:
+            if self.playwright:
                 self.playwright.stop()
             raise # Re-raise the exception
 
+    @traced("browser.navigate")
     def navigate(self, url: str):
         try:
             self.page.goto(url, wait_until='load', timeout=60000) # Wait for load, reasonable timeout
-            print("    BROWSER_CONTROLLER >> Navigation successful.") # Updated print prefix
+            logger.info("Navigation successful.")
         except Exception as e:
-            print(f"    BROWSER_CONTROLLER >> Error navigating to {url}: {e}") # Updated print prefix
+            logger.error("Error navigating to %s: %s", url, e)
             # Decide how to handle navigation errors (e.g., raise, return status)
 
     def close(self):
-        print("    BROWSER_CONTROLLER >> Closing browser controller...") # Updated print prefix
+        logger.debug("Closing browser controller...")
         try:
-            if hasattr(self, 'browser') and self.browser:
+            if self.context:
+                self.save_identity()
+                self.context.close()
+                self.context = None
+            if self.owns_browser and self.browser:
                 self.browser.close()
-                print("    BROWSER_CONTROLLER >> Browser closed.") # Updated print prefix
-            if hasattr(self, 'playwright') and self.playwright:
+                logger.debug("Browser closed.")
+            if self.playwright:
                 self.playwright.stop()
-                print("    BROWSER_CONTROLLER >> Playwright stopped.") # Updated print prefix
+                logger.debug("Playwright stopped.")
         except Exception as e:
-            print(f"    BROWSER_CONTROLLER >> Error during closing: {e}") # Updated print prefix
+            logger.error("Error during closing: %s", e)
 
+    @traced("browser.screenshot", capture_attributes)
     def screenshot(self) -> types.Part:
         """
         Take a screenshot of the current browser page and return it as a Part object
-        compatible with Google's Gemini model.
+        compatible with Google's Gemini model, encoded according to screenshot_policy.
+        
+        Size and timing of the capture are kept in last_capture_stats.
         
         Returns:
             types.Part: A Part object containing the screenshot as inline data.
         """
-        print("    BROWSER_CONTROLLER >> Taking screenshot.")
-        
         try:
-            # Use the actual viewport dimensions from the class
-            width = self.viewport_width
-            height = self.viewport_height
-            
-            image_stream = io.BytesIO(self.page.screenshot())
-            img = Image.open(image_stream)
-            # img = img.convert('L') # Keep color for better model interpretation
-            
-            # Optional resizing (consider if needed for performance vs. model accuracy)
-            # scale_factor = min(640 / width, 640 / height)
-            # new_width = int(width * scale_factor)
-            # new_height = int(height * scale_factor)
-            # img = img.resize((new_width, new_height))
-            
-            output_stream = io.BytesIO()
-            # Use PNG for lossless quality, JPEG if size is critical
-            img.save(output_stream, format="PNG")
-            output_bytes = output_stream.getvalue()
+            started = time.perf_counter()
+            raw = self.page.screenshot(
+                **self.screenshot_policy.capture_options(self.viewport_width, self.viewport_height)
+            )
+            capture_ms = (time.perf_counter() - started) * 1000
             
-            part = types.Part(
-                inline_data=types.Blob(
-                    mime_type="image/png",
-                    data=output_bytes
-                )
+            part, stats, self.last_signature = encode_frame(
+                raw, self.screenshot_policy, self.viewport_width, self.viewport_height, capture_ms=capture_ms
             )
+            self.last_capture_stats = stats
             
-            print("    BROWSER_CONTROLLER >> Screenshot captured successfully.")
+            logger.debug("Screenshot captured: %s, %d bytes, capture %.1f ms, encode %.1f ms.",
+                         stats['format'], stats['bytes'], stats['capture_ms'], stats['encode_ms'])
             return part
             
         except Exception as e:
-            print(f"    BROWSER_CONTROLLER >> Error taking screenshot: {e}")
+            logger.error("Error taking screenshot: %s", e)
             raise
 
-    def click(self, x: float, y: float, label: str = None, button: str = "left", timeout: int = 5000, delay_after: int = 500):
+    @traced("browser.zoom", capture_attributes)
+    def zoom(self, x1: float, y1: float, x2: float, y2: float) -> types.Part:
+        """
+        Capture a region of the page at full (device pixel) resolution.
+
+        The crop is kept in zoom_crop for the executor's next request, and clicks with
+        in_zoom=True take coordinates relative to it until the next action.
+
+        Args:
+            x1: Left edge of the region in model scale (0-1000)
+            y1: Top edge of the region in model scale (0-1000)
+            x2: Right edge of the region in model scale (0-1000)
+            y2: Bottom edge of the region in model scale (0-1000)
+
+        Returns:
+            types.Part: The crop as inline data
+        """
+        width, height = self.viewport_size()
+        region = zoom_rectangle(x1, y1, x2, y2, width, height)
+        scale = self.launch_profile.device_scale_factor
+        started = time.perf_counter()
+        raw = self.page.screenshot(**self.screenshot_policy.zoom_capture_options(region))
+        capture_ms = (time.perf_counter() - started) * 1000
+        part, stats = encode_screenshot(raw, self.screenshot_policy.zoom_policy(), int(region[2] * scale),
+                                        int(region[3] * scale), capture_ms=capture_ms)
+        self.last_capture_stats = dict(stats, zoom=True)
+        self.zoom_region = region
+        self.zoom_crop = part.inline_data
+        logger.info("Zoomed into (%.0f,%.0f) %.0fx%.0f CSS px, %d bytes", *region, stats['bytes'])
+        return part
+
+    def viewport_size(self):
+        """Return the page's viewport (width, height) in CSS pixels."""
+        size = self.page.viewport_size if self.page is not None else None
+        if size:
+            return size["width"], size["height"]
+        return self.viewport_width, self.viewport_height
+
+    @traced("browser.settle", settle_attributes)
+    def _wait_after_action(self, action: str, delay_after: int):
+        """
+        Wait until the page settles after an action (capped by settle_options.max_ms),
+        or sleep delay_after ms when settle detection is disabled.
+        """
+        # Any action may change the page, so element ids, zoom crops and fan-out captures handed out earlier are stale
+        self.element_index.invalidate()
+        self.zoom_region = self.zoom_crop = None
+        self.fan_out_recorder.frames = []
+        if not self.settle_options.enabled:
+            self.page.wait_for_timeout(delay_after)
+            return
+        outcome = wait_for_settle(self.page, self.network_tracker, self.settle_options)
+        self.settle_recorder.record(action, **outcome)
+        logger.debug("Page settled after %s in %.0f ms%s", action, outcome['elapsed_ms'],
+                     " (cap reached)" if outcome['timed_out'] else "")
+
+    def storage_state(self) -> Dict[str, Any]:
+        """Return the context's cookies and local storage, to start a later context with."""
+        return self.context.storage_state()
+
+    def save_identity(self):
+        """Merge the context's cookies and local storage into the identity's stored state."""
+        if self.identity_store is None or self.context is None:
+            return
+        try:
+            self.identity_store.save(self.identity, self.context.storage_state())
+        except Exception as e:
+            logger.error("Error saving state of identity %s: %s", self.identity, e)
+
+    def settle_metrics(self):
+        """Return count, average/max duration and cap hits of the settle waits so far."""
+        return self.settle_recorder.metrics()
+
+    def pipeline_metrics(self):
+        """Return per-step wall time and the time steps spent waiting for their frame."""
+        return self.pipeline_recorder.metrics()
+
+    def typing_metrics(self):
+        """Return entry counts per strategy, keystroke fallbacks and average entry time."""
+        return self.typing_recorder.metrics()
+
+    def blocking_metrics(self):
+        """Return the request blocker's counts and estimated savings (None without blocking)."""
+        return self.request_blocker.metrics() if self.request_blocker is not None else None
+
+    @traced("browser.click", action_attributes)
+    def click(self, x: float, y: float, label: str = None, button: str = "left", timeout: int = 5000, delay_after: int = 500,
+              in_zoom: bool = False):
         """
         Click at the specified coordinates.
         
@@ -106,27 +271,33 @@ class BrowserController:
             label: Optional label for logging/debugging
             button: Mouse button to click ("left", "middle", "right")
             timeout: Timeout for the click operation in ms
-            delay_after: Time to wait after click in ms
+            delay_after: Fixed wait after click in ms, used only when settle detection is disabled
+            in_zoom: Coordinates are relative to the last zoom crop instead of the whole page
             
         Returns:
             bool: True if successful, False otherwise
         """
         label = label or '[no label provided]'
-        print(f"    BROWSER_CONTROLLER >> Clicking at model coords ({x},{y}), label: '{label}'")
+        logger.info("Clicking at model coords (%s,%s), label: '%s'", x, y, label)
+        if in_zoom and self.zoom_region is None:
+            logger.warning("Click relative to a zoom crop requested, but there is no current crop")
+            return False
         
         try:
             # Convert from model coordinates (0-1000 scale) to actual page coordinates
-            x_orig, y_orig = correct_coordinates(x=x, y=y)
-            print(f"BROWSER_CONTROLLER >> Converted to page coords ({x_orig:.1f},{y_orig:.1f})")
+            width, height = self.viewport_size()
+            x_orig, y_orig = correct_coordinates(x, y, width, height, region=self.zoom_region if in_zoom else None)
+            logger.debug("Converted to page coords (%.1f,%.1f)", x_orig, y_orig)
             
             # Execute the click
-            self.page.mouse.click(x_orig, y_orig, button=button, timeout=timeout)
-            self.page.wait_for_timeout(delay_after)
+            self.page.mouse.click(x_orig, y_orig, button=button)
+            self._wait_after_action("click", delay_after)
             return True
         except Exception as e:
-            print(f"    BROWSER_CONTROLLER >> ERROR clicking: {e}")
+            logger.error("Error clicking: %s", e)
             return False
     
+    @traced("browser.scroll", action_attributes)
     def scroll(self, direction: str = "down", amount: int = 500, x: float = None, y: float = None, delay_after: int = 500):
         """
         Scroll the page in the specified direction.
@@ -136,7 +307,7 @@ class BrowserController:
             amount: Amount to scroll in pixels
             x: Optional X-coordinate to position mouse before scrolling (model scale 0-1000)
             y: Optional Y-coordinate to position mouse before scrolling (model scale 0-1000)
-            delay_after: Time to wait after scroll in ms
+            delay_after: Fixed wait after scroll in ms, used only when settle detection is disabled
             
         Returns:
             bool: True if successful, False otherwise
@@ -144,54 +315,61 @@ class BrowserController:
         try:
             # Position mouse if coordinates provided
             if x is not None and y is not None:
-                x_orig, y_orig = correct_coordinates(x=x, y=y)
-                print(f"    BROWSER_CONTROLLER >> Moving mouse to scroll target: ({x_orig:.1f},{y_orig:.1f})")
+                x_orig, y_orig = correct_coordinates(x, y, *self.viewport_size())
+                logger.debug("Moving mouse to scroll target: (%.1f,%.1f)", x_orig, y_orig)
                 self.page.mouse.move(x_orig, y_orig)
             
             # Calculate scroll delta based on direction
             scroll_delta_y = amount if direction == "down" else -amount
-            print(f"    BROWSER_CONTROLLER >> Scrolling {direction} by approx {amount} pixels")
+            logger.info("Scrolling %s by approx %s pixels", direction, amount)
             
             # Execute scroll
             self.page.mouse.wheel(0, scroll_delta_y)
-            self.page.wait_for_timeout(delay_after)
+            self._wait_after_action("scroll", delay_after)
             return True
         except Exception as e:
-            print(f"    BROWSER_CONTROLLER >> ERROR scrolling: {e}")
+            logger.error("Error scrolling: %s", e)
             return False
 
-    def type_text(self, text: str, label: str = None, delay: int = 50, timeout: int = 10000, delay_after: int = 200):
+    @traced("browser.type_text", typing_attributes)
+    def type_text(self, text: str, label: str = None, delay: int = None, timeout: int = 10000, delay_after: int = 200,
+                  mode: str = None):
         """
-        Type the specified text.
+        Enter the specified text into the focused field.
         
         Args:
             text: The text to type
             label: Optional label for logging/debugging
-            delay: Delay between keystrokes in ms
+            delay: Delay between keystrokes in ms (defaults to the typing options)
             timeout: Timeout for the typing operation in ms
-            delay_after: Time to wait after typing in ms
+            delay_after: Fixed wait after typing in ms, used only when settle detection is disabled
+            mode: 'auto', 'insert', 'fill' or 'type', overriding typing_options.mode
             
         Returns:
             bool: True if successful, False otherwise
         """
         label = label or '[no field label provided]'
-        print(f"    BROWSER_CONTROLLER >> Typing text: '{text}' (intended field: '{label}')")
+        logger.info("Typing text %s (intended field: '%s')", redact(text), label)
         
         try:
-            self.page.keyboard.type(text, delay=delay, timeout=timeout)
-            self.page.wait_for_timeout(delay_after)
+            started = time.perf_counter()
+            used = enter_text(self.page, text, self.typing_options, mode=mode, delay=delay, timeout=timeout)
+            self.typing_recorder.record(mode or self.typing_options.mode, used, len(text),
+                                        (time.perf_counter() - started) * 1000)
+            self._wait_after_action("type_text", delay_after)
             return True
         except Exception as e:
-            print(f"    BROWSER_CONTROLLER >> ERROR typing: {e}")
+            logger.error("Error typing: %s", e)
             return False
             
+    @traced("browser.press_keys", action_attributes)
     def press_keys(self, keys, delay_after: int = 200):
         """
         Press keyboard keys.
         
         Args:
             keys: Single key or list of keys to press
-            delay_after: Time to wait after key press in ms
+            delay_after: Fixed wait after key press in ms, used only when settle detection is disabled
             
         Returns:
             bool: True if successful, False otherwise
@@ -211,18 +389,248 @@ class BrowserController:
                 elif key.lower() == "escape" or key.lower() == "esc":
                     pw_key = "Escape"
                 
-                print(f"    BROWSER_CONTROLLER >> Pressing key: '{pw_key}'")
-                self.page.keyboard.press(pw_key, timeout=5000)
+                logger.info("Pressing key: '%s'", pw_key)
+                self.page.keyboard.press(pw_key)
                 
-                # Add delay based on key? e.g., longer after Enter
-                if pw_key == "Enter":
-                    self.page.wait_for_timeout(1500)
-                else:
-                    self.page.wait_for_timeout(delay_after)
+                # Enter usually submits a form, so allow the longer fixed wait when settle detection is off
+                self._wait_after_action("press_keys", 1500 if pw_key == "Enter" else delay_after)
+            return True
+        except Exception as e:
+            logger.error("Error pressing keys: %s", e)
+            return False
+
+    @traced("browser.list_elements", lambda controller, result: {"elements": len(result)})
+    def list_elements(self, refresh: bool = False) -> List[InteractiveElement]:
+        """
+        List the interactive elements visible in the viewport with role, name and bounding box.
+        
+        The list is cached until the URL, DOM or scroll position changes, or an action runs.
+        
+        Args:
+            refresh: Re-extract even if the cached list is still valid
+            
+        Returns:
+            List[InteractiveElement]: Elements indexed by id in document order
+        """
+        page_state = self.page.evaluate(PAGE_STATE_SCRIPT)
+        if not refresh and self.element_index.is_fresh(page_state):
+            return self.element_index.elements
+        extracted = self.page.evaluate(EXTRACT_ELEMENTS_SCRIPT, self.element_index.max_elements)
+        elements = self.element_index.update(extracted, page_state)
+        logger.debug("Indexed %d interactive elements.", len(elements))
+        return elements
+    
+    @traced("browser.click_element", action_attributes)
+    def click_element(self, element_id: int, button: str = "left", delay_after: int = 500):
+        """
+        Click an element from the latest list_elements() result.
+        
+        Args:
+            element_id: Id of the element in the element list
+            button: Mouse button to click ("left", "middle", "right")
+            delay_after: Fixed wait after click in ms, used only when settle detection is disabled
+            
+        Returns:
+            bool: True if successful, False otherwise (including an unknown or stale id)
+        """
+        element = self.element_index.get(element_id)
+        if element is None:
+            logger.warning("Element [%s] is unknown or the element list is stale", element_id)
+            return False
+        logger.info("Clicking element [%s] %s '%s'", element_id, element.role, element.name)
+        
+        try:
+            x, y = element.center
+            self.page.mouse.click(x, y, button=button)
+            self._wait_after_action("click_element", delay_after)
             return True
         except Exception as e:
-            print(f"    BROWSER_CONTROLLER >> ERROR pressing keys: {e}")
+            logger.error("Error clicking element: %s", e)
+            return False
+    
+    @traced("browser.type_into", action_attributes)
+    def type_into(self, element_id: int, text: str, delay: int = None, delay_after: int = 200, mode: str = None):
+        """
+        Focus an element from the latest list_elements() result and type into it.
+        
+        Args:
+            element_id: Id of the element in the element list
+            text: The text to type
+            delay: Delay between keystrokes in ms (defaults to the typing options)
+            delay_after: Fixed wait after typing in ms, used only when settle detection is disabled
+            mode: 'auto', 'insert', 'fill' or 'type', overriding typing_options.mode
+            
+        Returns:
+            bool: True if successful, False otherwise (including an unknown or stale id)
+        """
+        element = self.element_index.get(element_id)
+        if element is None:
+            logger.warning("Element [%s] is unknown or the element list is stale", element_id)
+            return False
+        
+        try:
+            focused = self.page.evaluate(FOCUS_ELEMENT_SCRIPT, element_id)
+            if not focused:
+                # Some widgets only take focus from a real click
+                x, y = element.center
+                self.page.mouse.click(x, y)
+        except Exception as e:
+            logger.error("Error focusing element: %s", e)
             return False
+        return self.type_text(text, label=element.name, delay=delay, delay_after=delay_after, mode=mode)
+    
+    # --- Tabs ---
+
+    def _use_page(self, page: Page):
+        """Make page the tab that actions, captures and settle detection apply to."""
+        self.page = page
+        if page not in self._network_trackers:
+            self._network_trackers[page] = NetworkTracker(page, long_request_ms=self.settle_options.long_request_ms)
+        self.network_tracker = self._network_trackers[page]
+        self.element_index.invalidate()
+        self.zoom_region = self.zoom_crop = None
+        page.bring_to_front()
+
+    def list_tabs(self) -> List[Dict[str, Any]]:
+        """
+        Describe the open tabs, including ones the page opened itself (target=_blank links, popups).
+
+        Returns:
+            List of dicts with the tab's index, url, title and whether it is the active tab
+        """
+        return [{"index": index, "url": page.url, "title": page.title(), "active": page is self.page}
+                for index, page in enumerate(self.context.pages)]
+
+    @traced("browser.open_tab", action_attributes)
+    def open_tab(self, url: str = None) -> int:
+        """
+        Open a new tab, optionally load a URL in it, and make it the active tab.
+
+        Returns:
+            int: Index of the new tab
+        """
+        page = self.context.new_page()
+        self._use_page(page)
+        if url:
+            self.navigate(url)
+        return self.context.pages.index(page)
+
+    @traced("browser.switch_tab", action_attributes)
+    def switch_tab(self, index: int) -> bool:
+        """Make the tab at index (from list_tabs) the active tab."""
+        pages = self.context.pages
+        if not 0 <= index < len(pages):
+            logger.error("No tab with index %s (%d open)", index, len(pages))
+            return False
+        self._use_page(pages[index])
+        return True
+
+    @traced("browser.close_tab", action_attributes)
+    def close_tab(self, index: int = None) -> bool:
+        """
+        Close the tab at index (the active tab when None). The last open tab is never closed;
+        closing the active tab activates the most recently opened remaining one.
+        """
+        pages = self.context.pages
+        if len(pages) <= 1:
+            logger.error("Refusing to close the last tab")
+            return False
+        page = self.page if index is None else (pages[index] if 0 <= index < len(pages) else None)
+        if page is None:
+            logger.error("No tab with index %s (%d open)", index, len(pages))
+            return False
+        page.close()
+        self._network_trackers.pop(page, None)
+        if page is self.page:
+            self._use_page(self.context.pages[-1])
+        return True
+
+    @traced("browser.fan_out", fan_out_attributes)
+    def fan_out(self, urls: List[str], extract: str = "text", keep_open: bool = False, max_chars: int = 3000,
+                timeout: int = 30000) -> List[Dict[str, Any]]:
+        """
+        Load several URLs at once in new tabs of this context and take the visible text or a
+        screenshot of each, without changing the active tab.
+
+        The sync API drives one call at a time, so every navigation is started first (up to
+        the response) and the loads are waited for afterwards; the pages still load
+        concurrently in the browser.
+
+        Args:
+            urls: Pages to load (at most MAX_FAN_OUT_TABS are opened)
+            extract: 'text' for each page's visible text, 'screenshot' for a viewport capture
+                (kept in fan_out_recorder.frames for the coordinator's next request)
+            keep_open: Leave the tabs open to switch to them later; otherwise they are closed
+            max_chars: Visible text kept per page in 'text' mode
+            timeout: Load timeout per tab in ms
+
+        Returns:
+            List of tab_result dicts in the order of urls
+        """
+        started = time.perf_counter()
+        tabs = []
+        loaded_at = {}
+        for url in urls[:MAX_FAN_OUT_TABS]:
+            page = self.context.new_page()
+            page.once("load", lambda p: loaded_at.setdefault(p, time.perf_counter()))
+            tab_started = time.perf_counter()
+            error = None
+            try:
+                page.goto(url, wait_until="commit", timeout=timeout)
+            except Exception as e:
+                error = str(e)
+            tabs.append((page, url, tab_started, error))
+
+        results = []
+        for position, (page, url, tab_started, error) in enumerate(tabs, start=1):
+            label = str(position)
+            try:
+                if error is None:
+                    page.wait_for_load_state("load", timeout=timeout)
+                load_ms = (loaded_at.get(page, time.perf_counter()) - tab_started) * 1000
+                if error is not None:
+                    results.append(tab_result(label, url, load_ms=load_ms, error=error))
+                    continue
+                text = image = None
+                if extract == "text":
+                    text = page.evaluate(PAGE_TEXT_SCRIPT, max_chars)
+                else:
+                    raw = page.screenshot(**self.screenshot_policy.capture_options(self.viewport_width,
+                                                                                   self.viewport_height))
+                    image = encode_screenshot(raw, self.screenshot_policy, self.viewport_width,
+                                              self.viewport_height)[0].inline_data
+                index = self.context.pages.index(page) if keep_open else None
+                results.append(tab_result(label, url, index=index, title=page.title(), text=text, image=image,
+                                          load_ms=load_ms))
+            except Exception as e:
+                results.append(tab_result(label, url, load_ms=(time.perf_counter() - tab_started) * 1000,
+                                          error=str(e)))
+            finally:
+                if not keep_open:
+                    page.close()
+        # New tabs come to the front in headed mode; the active tab stays the one actions apply to
+        self.page.bring_to_front()
+
+        self.fan_out_recorder.record(results, (time.perf_counter() - started) * 1000)
+        self.fan_out_recorder.keep_frames(results)
+        logger.info("Fanned out to %d tabs in %.0f ms", len(results), self.fan_out_recorder.history[-1]["wall_ms"])
+        return results
+
+    def tabs_metrics(self):
+        """Return fan-out counts and their wall time against loading the tabs one by one."""
+        return self.fan_out_recorder.metrics()
+
+    def fingerprint(self) -> Dict[str, Any]:
+        """
+        Cheap description of the current page used to check that a replayed step runs on
+        the same page it was recorded on.
+        
+        Returns:
+            Dict with the page url and the 'role:name' of its visible interactive elements
+        """
+        elements = self.list_elements()
+        return {"url": self.page.url, "elements": [f"{e.role}:{e.name}" for e in elements]}
+
 
 # Keep the standalone function for backward compatibility but make it use the class method
 def screenshot(browser_controller: BrowserController) -> types.Part:
@@ -252,7 +660,7 @@ def handle_action(function_call, browser_controller: BrowserController):
     action = function_call.name
     args = function_call.args
 
-    print(f"    ACTION_HANDLER >> Handling action: {action} with args: {args}")
+    logger.info("Handling action: %s with args: %s", action, sorted(args))
 
     if action == "click":
         x = args.get("points", {}).get("x")
@@ -260,7 +668,7 @@ def handle_action(function_call, browser_controller: BrowserController):
         label = args.get('label')
         
         if x is None or y is None:
-             print(f"    ACTION_HANDLER >> ERROR: Missing coordinates for click action.")
+             logger.error("Missing coordinates for click action.")
              return False
         
         # Use the BrowserController click method
@@ -271,7 +679,7 @@ def handle_action(function_call, browser_controller: BrowserController):
         field_label = args.get("label")
         
         if text is None:
-             print(f"    ACTION_HANDLER >> ERROR: Missing text for type action.")
+             logger.error("Missing text for type action.")
              return False
         
         # Use the BrowserController type_text method
@@ -290,12 +698,12 @@ def handle_action(function_call, browser_controller: BrowserController):
         keys = args.get("keys")
         
         if not keys:
-             print(f"    ACTION_HANDLER >> ERROR: Missing keys for keypress action.")
+             logger.error("Missing keys for keypress action.")
              return False
         
         # Use the BrowserController press_keys method
         return browser_controller.press_keys(keys)
         
     else:
-        print(f"    ACTION_HANDLER >> WARNING: Unknown action type '{action}'")
+        logger.warning("Unknown action type '%s'", action)
         return False
@@ -0,0 +1,263 @@
+"""Durable per-iteration checkpoints of browser runs in SQLite, for resuming after a crash."""
+
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+from .identity import _fernet_class
+from .logging_config import get_logger
+
+logger = get_logger("runner")
+
+# Session state carried over to a resumed run
+CHECKPOINT_STATE_KEYS = (
+    "iteration_count",
+    "max_iterations",
+    "task_completed",
+    "task_failed",
+    "exit_loop",
+    "max_iterations_reached",
+    "task_result",
+    "task_completion_reason",
+    "task_failure_reason",
+    "task_failure_details",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    session_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    iteration_count INTEGER NOT NULL,
+    updated_at REAL NOT NULL,
+    data TEXT NOT NULL,
+    storage_state BLOB
+)
+"""
+
+class Checkpoint(BaseModel):
+    """Everything needed to continue a run where it stopped."""
+    session_id: str
+    goal: str
+    initial_url: str
+    url: str = Field(description="Page URL when the checkpoint was taken")
+    status: str = Field(default="running", description="'running', 'completed' or 'failed'")
+    iteration_count: int = 0
+    state: Dict[str, Any] = Field(default_factory=dict, description="Values of CHECKPOINT_STATE_KEYS")
+    actions: List[Dict[str, Any]] = Field(default_factory=list, description="Tool calls made so far")
+    storage_state: Optional[Dict[str, Any]] = Field(default=None, description="Cookies and local storage of the context "
+                                                    "(only kept by a CheckpointStore with a key)")
+    updated_at: float = Field(default_factory=time.time)
+
+class CheckpointStore:
+    """
+    SQLite table of the latest checkpoint of every session.
+
+    save() only queues the checkpoint: a writer thread commits everything queued in
+    one transaction every flush_interval_s, and a session saved several times in
+    between is written once, so checkpointing stays off the step's critical path.
+    load() and flush() write out what is queued first.
+
+    Storage states hold session cookies, so they are only written Fernet-encrypted, in
+    their own column, by a store given a key (the IdentityStore's key will do); a store
+    without one drops them and resumed runs start with a fresh context.
+    """
+
+    def __init__(self, path: str, flush_interval_s: float = 1.0, key: Optional[str] = None):
+        """
+        Args:
+            path: SQLite database file (created if missing)
+            flush_interval_s: Longest time a saved checkpoint waits before it is written
+            key: Fernet key (see generate_identity_key) to encrypt storage states with;
+                without one they are not stored
+        """
+        self.path = path
+        self.flush_interval_s = flush_interval_s
+        self._fernet = _fernet_class()(key.encode("ascii") if isinstance(key, str) else key) if key else None
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(_SCHEMA)
+        self._connection.commit()
+        self._db_lock = threading.Lock()
+
+        self._pending: Dict[str, Checkpoint] = {}
+        self._pending_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._counts = {"saved": 0, "written": 0, "batches": 0, "write_ms": 0.0}
+        self._writer = threading.Thread(target=self._write_loop, name="orbit-checkpoints", daemon=True)
+        self._writer.start()
+
+    @property
+    def stores_storage_state(self) -> bool:
+        """Whether checkpoints keep their storage state (the store has an encryption key)."""
+        return self._fernet is not None
+
+    def save(self, checkpoint: Checkpoint):
+        """Queue a checkpoint; it replaces any queued one of the same session."""
+        with self._pending_lock:
+            self._pending[checkpoint.session_id] = checkpoint
+            self._counts["saved"] += 1
+
+    def flush(self):
+        """Write every queued checkpoint now."""
+        with self._pending_lock:
+            batch, self._pending = list(self._pending.values()), {}
+        if not batch:
+            return
+        started = time.perf_counter()
+        rows = [(c.session_id, c.status, c.iteration_count, c.updated_at,
+                 c.model_dump_json(exclude={"storage_state"}), self._encrypt_storage_state(c.storage_state))
+                for c in batch]
+        with self._db_lock:
+            with self._connection:
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO checkpoints (session_id, status, iteration_count, updated_at, data, "
+                    "storage_state) VALUES (?, ?, ?, ?, ?, ?)", rows)
+        with self._pending_lock:
+            self._counts["written"] += len(rows)
+            self._counts["batches"] += 1
+            self._counts["write_ms"] += (time.perf_counter() - started) * 1000
+
+    def load(self, session_id: str) -> Optional[Checkpoint]:
+        """Return the latest checkpoint of a session, or None."""
+        self.flush()
+        with self._db_lock:
+            row = self._connection.execute("SELECT data, storage_state FROM checkpoints WHERE session_id = ?",
+                                           (session_id,)).fetchone()
+        if row is None:
+            return None
+        checkpoint = Checkpoint.model_validate_json(row[0])
+        checkpoint.storage_state = self._decrypt_storage_state(row[1])
+        return checkpoint
+
+    def list_sessions(self, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Return session id, status, iteration count and update time of the stored sessions, newest first."""
+        self.flush()
+        query = "SELECT session_id, status, iteration_count, updated_at FROM checkpoints"
+        params = ()
+        if status is not None:
+            query += " WHERE status = ?"
+            params = (status,)
+        with self._db_lock:
+            rows = self._connection.execute(query + " ORDER BY updated_at DESC", params).fetchall()
+        return [dict(zip(("session_id", "status", "iteration_count", "updated_at"), row)) for row in rows]
+
+    def delete(self, session_id: str):
+        with self._pending_lock:
+            self._pending.pop(session_id, None)
+        with self._db_lock:
+            with self._connection:
+                self._connection.execute("DELETE FROM checkpoints WHERE session_id = ?", (session_id,))
+
+    def stats(self) -> Dict[str, Any]:
+        """Return checkpoints saved and written, write batches and average batch write time."""
+        with self._pending_lock:
+            counts = dict(self._counts)
+        counts["avg_batch_ms"] = counts.pop("write_ms") / counts["batches"] if counts["batches"] else 0.0
+        return counts
+
+    def close(self):
+        """Write what is queued, stop the writer thread and close the database."""
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        self._writer.join()
+        self.flush()
+        self._connection.close()
+
+    def _encrypt_storage_state(self, storage_state: Optional[Dict[str, Any]]) -> Optional[bytes]:
+        if storage_state is None or self._fernet is None:
+            return None
+        return self._fernet.encrypt(json.dumps(storage_state).encode("utf-8"))
+
+    def _decrypt_storage_state(self, token: Optional[bytes]) -> Optional[Dict[str, Any]]:
+        if token is None or self._fernet is None:
+            return None
+        from cryptography.fernet import InvalidToken
+        try:
+            return json.loads(self._fernet.decrypt(token))
+        except InvalidToken:
+            logger.warning("Checkpoint storage state is unreadable with this key, resuming without it")
+            return None
+
+    def _write_loop(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval_s)
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                logger.error("Error writing checkpoints: %s", e)
+
+class SessionCheckpointer:
+    """
+    Builds the checkpoints of one run: collects its tool calls and saves a checkpoint
+    after every loop iteration. Register it as the run's "checkpointer" session resource.
+    """
+
+    def __init__(self, store: CheckpointStore, session_id: str, goal: str, initial_url: str,
+                 actions: Optional[List[Dict[str, Any]]] = None, include_storage_state: Optional[bool] = None):
+        """
+        Args:
+            store: Where the checkpoints are saved
+            session_id: Session id of the run
+            goal: The run's goal
+            initial_url: The run's starting URL
+            actions: Tool calls already made (those of the checkpoint a run resumes from)
+            include_storage_state: Capture the context's cookies and local storage with each
+                checkpoint; defaults to whether the store encrypts them (has a key)
+        """
+        self.store = store
+        self.session_id = session_id
+        self.goal = goal
+        self.initial_url = initial_url
+        self.actions: List[Dict[str, Any]] = list(actions or [])
+        if include_storage_state is None:
+            include_storage_state = store.stores_storage_state
+        self.include_storage_state = include_storage_state and store.stores_storage_state
+        self._last: Optional[Checkpoint] = None
+        self._lock = threading.Lock()
+
+    def record_action(self, agent: str, tool: str, args: Dict[str, Any], result: str):
+        with self._lock:
+            self.actions.append({"agent": agent, "tool": tool, "args": args, "result": result})
+
+    def checkpoint(self, state: Dict[str, Any], url: str, storage_state: Optional[Dict[str, Any]] = None):
+        """Save the progress made up to the end of a loop iteration."""
+        with self._lock:
+            actions = list(self.actions)
+        self._last = Checkpoint(
+            session_id=self.session_id,
+            goal=self.goal,
+            initial_url=self.initial_url,
+            url=url,
+            iteration_count=int(state.get("iteration_count", 0)),
+            state={key: state[key] for key in CHECKPOINT_STATE_KEYS if key in state},
+            actions=actions,
+            storage_state=storage_state,
+        )
+        self.store.save(self._last)
+
+    def finish(self, success: bool, state: Optional[Dict[str, Any]] = None):
+        """Mark the session completed or failed and write it out."""
+        if self._last is None:
+            return
+        update = {"status": "completed" if success else "failed", "updated_at": time.time()}
+        if state:
+            update["state"] = {key: state[key] for key in CHECKPOINT_STATE_KEYS if key in state}
+        self.store.save(self._last.model_copy(update=update))
+        self.store.flush()
+
+def resume_note(checkpoint: Checkpoint, max_actions: int = 20) -> str:
+    """Describe the progress of a checkpoint for the first message of the resumed run."""
+    lines = [f"Note: this task was interrupted after {checkpoint.iteration_count} iterations and is being resumed "
+             f"on the page it had reached ({checkpoint.url}). Actions already taken:"]
+    for action in checkpoint.actions[-max_actions:]:
+        lines.append(f"- {action['tool']}({json.dumps(action['args'], default=str)[:200]}) -> {action['result'][:200]}")
+    if len(checkpoint.actions) > max_actions:
+        lines.insert(1, f"(last {max_actions} of {len(checkpoint.actions)})")
+    return "\n".join(lines)
@@ -0,0 +1,154 @@
+"""Indexed list of the interactive elements visible on the page."""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+# Collects visible interactive elements in document order with their ARIA role,
+# accessible name and bounding box. The element nodes are kept in
+# window.__orbitElements so ids stay valid until the next extraction, and a
+# MutationObserver bumps window.__orbitDomVersion so callers can tell when the
+# cached index is stale.
+EXTRACT_ELEMENTS_SCRIPT = """
+(maxElements) => {
+    if (!window.__orbitObserver) {
+        window.__orbitDomVersion = 0;
+        window.__orbitObserver = new MutationObserver(() => { window.__orbitDomVersion++; });
+        window.__orbitObserver.observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+    }
+    const selector = 'a[href], button, input:not([type=hidden]), select, textarea, summary, [role], [onclick], [contenteditable=""], [contenteditable=true], [tabindex]:not([tabindex="-1"])';
+    const interactiveRoles = new Set(['button', 'link', 'checkbox', 'radio', 'tab', 'menuitem', 'option', 'switch', 'textbox', 'searchbox', 'combobox', 'slider', 'spinbutton', 'listbox', 'treeitem']);
+    const implicitRole = (el) => {
+        const tag = el.tagName.toLowerCase();
+        if (tag === 'a') return 'link';
+        if (tag === 'button' || tag === 'summary') return 'button';
+        if (tag === 'select') return 'combobox';
+        if (tag === 'textarea') return 'textbox';
+        if (tag === 'input') {
+            const type = (el.getAttribute('type') || 'text').toLowerCase();
+            if (['button', 'submit', 'reset', 'image'].includes(type)) return 'button';
+            if (type === 'checkbox' || type === 'radio') return type;
+            if (type === 'search') return 'searchbox';
+            return 'textbox';
+        }
+        if (el.isContentEditable) return 'textbox';
+        return 'generic';
+    };
+    const accessibleName = (el) => {
+        const labelledBy = el.getAttribute('aria-labelledby');
+        if (labelledBy) {
+            const text = labelledBy.split(/\\s+/).map(id => document.getElementById(id)).filter(Boolean).map(n => n.innerText).join(' ');
+            if (text.trim()) return text;
+        }
+        const candidates = [
+            el.getAttribute('aria-label'),
+            el.labels && el.labels.length ? Array.from(el.labels).map(l => l.innerText).join(' ') : null,
+            el.getAttribute('placeholder'),
+            el.getAttribute('alt'),
+            el.getAttribute('title'),
+            el.innerText,
+            el.value,
+            el.getAttribute('name'),
+        ];
+        for (const candidate of candidates) {
+            if (candidate && String(candidate).trim()) return String(candidate).trim().replace(/\\s+/g, ' ').slice(0, 80);
+        }
+        return '';
+    };
+    const width = window.innerWidth, height = window.innerHeight;
+    const found = [];
+    for (const el of document.querySelectorAll(selector)) {
+        const explicitRole = el.getAttribute('role');
+        const role = explicitRole || implicitRole(el);
+        if (explicitRole && !interactiveRoles.has(explicitRole) && !el.matches('a[href], button, input, select, textarea, [onclick]')) continue;
+        if (el.disabled || el.getAttribute('aria-hidden') === 'true') continue;
+        const rect = el.getBoundingClientRect();
+        if (rect.width < 2 || rect.height < 2) continue;
+        if (rect.bottom < 0 || rect.right < 0 || rect.top > height || rect.left > width) continue;
+        const style = window.getComputedStyle(el);
+        if (style.visibility === 'hidden' || style.display === 'none' || parseFloat(style.opacity) === 0) continue;
+        // Skip elements covered by something else (e.g. a modal backdrop)
+        const cx = Math.min(Math.max(rect.left + rect.width / 2, 0), width - 1);
+        const cy = Math.min(Math.max(rect.top + rect.height / 2, 0), height - 1);
+        const top = document.elementFromPoint(cx, cy);
+        if (top && top !== el && !el.contains(top) && !top.contains(el)) continue;
+        found.push({el, role, name: accessibleName(el), tag: el.tagName.toLowerCase(),
+                    x: rect.left, y: rect.top, width: rect.width, height: rect.height});
+        if (found.length >= maxElements) break;
+    }
+    window.__orbitElements = found.map(f => f.el);
+    return {
+        version: window.__orbitDomVersion,
+        elements: found.map((f, i) => ({id: i, role: f.role, name: f.name, tag: f.tag,
+                                        x: f.x, y: f.y, width: f.width, height: f.height})),
+    };
+}
+"""
+
+# Cheap check of the page state the cached index was built for
+PAGE_STATE_SCRIPT = "() => [location.href, window.__orbitDomVersion === undefined ? -1 : window.__orbitDomVersion, window.scrollX, window.scrollY]"
+
+# Focuses an indexed element; returns whether focus landed on it
+FOCUS_ELEMENT_SCRIPT = """
+(id) => {
+    const el = window.__orbitElements && window.__orbitElements[id];
+    if (!el || !el.isConnected) return false;
+    el.focus();
+    return document.activeElement === el || el.contains(document.activeElement);
+}
+"""
+
+
+class InteractiveElement(BaseModel):
+    """An interactive element found on the page, addressed by its index id."""
+    id: int = Field(description="Index of the element in the current element list")
+    role: str = Field(description="ARIA role (explicit or implicit)")
+    name: str = Field(description="Accessible name (label, text, placeholder, ...)")
+    tag: str = Field(description="HTML tag name")
+    x: float = Field(description="Left edge in CSS pixels")
+    y: float = Field(description="Top edge in CSS pixels")
+    width: float = Field(description="Width in CSS pixels")
+    height: float = Field(description="Height in CSS pixels")
+
+    @property
+    def center(self) -> Tuple[float, float]:
+        return self.x + self.width / 2, self.y + self.height / 2
+
+class ElementIndex:
+    """Caches the element list of a page until its URL, DOM or scroll position changes."""
+
+    def __init__(self, max_elements: int = 200):
+        self.max_elements = max_elements
+        self.elements: List[InteractiveElement] = []
+        self._state: Optional[List[Any]] = None
+
+    def is_fresh(self, page_state: List[Any]) -> bool:
+        return self._state is not None and page_state == self._state
+
+    def update(self, extracted: Dict[str, Any], page_state: List[Any]) -> List[InteractiveElement]:
+        self.elements = [InteractiveElement(**element) for element in extracted["elements"]]
+        # The extraction itself ran after page_state was read; store the version it saw
+        self._state = [page_state[0], extracted["version"], page_state[2], page_state[3]]
+        return self.elements
+
+    def invalidate(self):
+        """Mark the list stale, e.g. after an action changed the page."""
+        self._state = None
+
+    def get(self, element_id: int) -> Optional[InteractiveElement]:
+        """Return an element of the current list, or None if the id is unknown or the list is stale."""
+        if self._state is None:
+            return None
+        if 0 <= element_id < len(self.elements) and self.elements[element_id].id == element_id:
+            return self.elements[element_id]
+        return None
+
+def format_elements(elements: List[InteractiveElement]) -> str:
+    """Render the element list as compact text for the model."""
+    if not elements:
+        return "No interactive elements found in the visible part of the page."
+    lines = [
+        f"[{element.id}] {element.role} '{element.name}' at ({element.center[0]:.0f},{element.center[1]:.0f})"
+        for element in elements
+    ]
+    return "\n".join(lines)
@@ -0,0 +1,102 @@
+"""Typed progress events of a run and the stream that delivers them while it happens."""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+class ProgressEvent(BaseModel):
+    """Base of all progress events."""
+    type: str
+    session_id: Optional[str] = None
+    timestamp: float = Field(default_factory=time.time)
+
+class StepStarted(ProgressEvent):
+    type: Literal["step_started"] = "step_started"
+    iteration: int
+    max_iterations: int
+
+class ActionExecuted(ProgressEvent):
+    type: Literal["action_executed"] = "action_executed"
+    agent: str = Field(description="Agent that called the tool")
+    tool: str
+    args: Dict[str, Any] = Field(description="Tool arguments, typed text redacted")
+    result: str = Field(description="Tool response, truncated (redacted for human answers)")
+
+class ScreenshotTaken(ProgressEvent):
+    type: Literal["screenshot_taken"] = "screenshot_taken"
+    iteration: int
+    bytes: int
+    format: str
+    capture_ms: float
+    similarity: Optional[float] = None
+    unchanged: bool = False
+
+class HumanInputRequested(ProgressEvent):
+    type: Literal["human_input_requested"] = "human_input_requested"
+    request_id: str = Field(description="Id to answer the request with on the run's HumanInputBroker")
+    prompt: str
+    timeout_s: float
+
+class TaskCompleted(ProgressEvent):
+    type: Literal["completed"] = "completed"
+    final_result: str
+    replayed: bool = False
+    metrics: Dict[str, Any] = {}
+
+class TaskFailed(ProgressEvent):
+    type: Literal["failed"] = "failed"
+    final_result: str
+    error: Optional[str] = None
+    metrics: Dict[str, Any] = {}
+
+TERMINAL_EVENTS = (TaskCompleted, TaskFailed)
+
+class EventStream:
+    """
+    Fans the progress events of one run out to listeners, optionally keeping the
+    last max_history events for late readers (0 keeps none).
+
+    Register it as the run's "event_stream" session resource; callbacks and the
+    runner emit into it from whichever thread they run on.
+    """
+
+    def __init__(self, max_history: int = 100):
+        self.history = deque(maxlen=max_history) if max_history else None
+        self._listeners: List[Callable[[ProgressEvent], None]] = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, listener: Callable[[ProgressEvent], None]):
+        with self._lock:
+            self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable[[ProgressEvent], None]):
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def emit(self, event: ProgressEvent):
+        with self._lock:
+            if self.history is not None:
+                self.history.append(event)
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener(event)
+
+def emit_event(context, event_cls, **fields):
+    """Emit an event into the event stream of the context's session, if the run has one."""
+    from .globals import get_session_resource, resolve_session_id
+
+    stream = get_session_resource(context, "event_stream")
+    if stream is not None:
+        stream.emit(event_cls(session_id=resolve_session_id(context), **fields))
+
+def finished_event(session_id: str, result: Dict[str, Any]) -> ProgressEvent:
+    """Build the terminal event for a runner result dict."""
+    if result["success"]:
+        return TaskCompleted(session_id=session_id, final_result=result["final_result"],
+                             replayed=result["replayed"], metrics=result["metrics"])
+    return TaskFailed(session_id=session_id, final_result=result["final_result"],
+                      error=result["error"], metrics=result["metrics"])
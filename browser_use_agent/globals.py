@@ -1,27 +1,84 @@
 """Global state shared between modules to avoid circular imports."""
 
+import logging
 import sys
 import threading
+from typing import Any, Dict, Optional
 
-# Global reference to the browser controller - will be set by runner.py
-# and used by tools.py without creating a circular dependency
-BROWSER_CONTROLLER = None
-
-def check_browser_controller():
-    """Diagnostic function to check the status of BROWSER_CONTROLLER variable."""
-    global BROWSER_CONTROLLER
-    
-    print(f"[GLOBALS] BROWSER_CONTROLLER exists: {BROWSER_CONTROLLER is not None}")
-    print(f"[GLOBALS] BROWSER_CONTROLLER type: {type(BROWSER_CONTROLLER)}")
-    print(f"[GLOBALS] Current thread: {threading.current_thread().name}")
-    print(f"[GLOBALS] Module name: {__name__}")
-    print(f"[GLOBALS] Module id: {id(sys.modules[__name__])}")
-    
-    return BROWSER_CONTROLLER is not None
-
-def get_browser_controller():
-    """Get the current browser controller instance.
+from .logging_config import get_logger
+
+logger = get_logger("tools")
+
+# Per-session resources (browser controller, ...) keyed by ADK session id - registered
+# by runner.py and resolved by tools.py / agent.py from the callback or tool context,
+# so concurrent runs in one process never touch each other's browser.
+SESSION_RESOURCES: Dict[str, Dict[str, Any]] = {}
+_SESSION_LOCK = threading.Lock()
+
+# State key carrying the id of the session that owns the browser. AgentTool runs
+# sub-agents in a child session whose state is copied from the parent, so tools in
+# the executor resolve the parent's resources through this key.
+SESSION_ID_STATE_KEY = "browser_session_id"
+
+def register_session_resource(session_id: str, name: str, value: Any):
+    """Register a resource (e.g. the browser controller) for an ADK session."""
+    with _SESSION_LOCK:
+        SESSION_RESOURCES.setdefault(session_id, {})[name] = value
+
+def unregister_session(session_id: str):
+    """Drop every resource registered for an ADK session."""
+    with _SESSION_LOCK:
+        SESSION_RESOURCES.pop(session_id, None)
+
+def resolve_session_id(context=None) -> Optional[str]:
+    """Find the owning session id from a ToolContext or CallbackContext."""
+    if context is None:
+        return None
+    try:
+        session_id = context.state.get(SESSION_ID_STATE_KEY)
+        if session_id:
+            return session_id
+    except Exception:
+        pass
+    try:
+        return context._invocation_context.session.id
+    except AttributeError:
+        return None
+
+def get_session_resource(context, name: str, default: Any = None) -> Any:
+    """
+    Get a resource registered for the session of the given context.
+
+    Without a context the resource is only returned when exactly one session is
+    registered, which keeps single-run scripts working.
+    """
+    session_id = resolve_session_id(context)
+    with _SESSION_LOCK:
+        if session_id is not None:
+            return SESSION_RESOURCES.get(session_id, {}).get(name, default)
+        if len(SESSION_RESOURCES) == 1:
+            return next(iter(SESSION_RESOURCES.values())).get(name, default)
+    return default
+
+def register_browser_controller(session_id: str, browser_controller):
+    """Register the browser controller (sync or async) used by a session."""
+    register_session_resource(session_id, "browser_controller", browser_controller)
+
+def check_browser_controller(context=None):
+    """Diagnostic function to check which browser controller a context resolves to."""
+    browser_controller = get_browser_controller(context)
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "Session id: %s, browser controller: %s, registered sessions: %d, thread: %s, module id: %d",
+            resolve_session_id(context), type(browser_controller).__name__ if browser_controller else None,
+            len(SESSION_RESOURCES), threading.current_thread().name, id(sys.modules[__name__]),
+        )
+
+    return browser_controller is not None
+
+def get_browser_controller(context=None):
+    """Get the browser controller registered for the session of a tool/callback context.
     This function should be used instead of direct importing to avoid module caching issues.
     """
-    global BROWSER_CONTROLLER
-    return BROWSER_CONTROLLER
\ No newline at end of file
+    return get_session_resource(context, "browser_controller")
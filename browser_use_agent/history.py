@@ -0,0 +1,193 @@
+"""Screens captured after each loop iteration, as shown to the coordinator."""
+
+import hashlib
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from google.genai import types
+
+from .screenshot import screen_signature, compare_signatures
+
+class ScreenFrame:
+    """One capture taken after a loop iteration."""
+
+    def __init__(self, iteration: int, blob: Optional[types.Blob], phash: str, similarity: float, unchanged: bool):
+        self.iteration = iteration
+        self.blob = blob
+        self.phash = phash
+        self.similarity = similarity
+        self.unchanged = unchanged
+        # Set once the image has been compacted out of the history
+        self.ref: Optional[str] = None
+
+class ScreenHistory:
+    """
+    Keeps the screens captured after each loop iteration and turns them into the
+    content sent to the coordinator.
+
+    A capture that is perceptually identical to the previous one is stored as a short
+    "no visible change" note instead of a second copy of the same image. Only the last
+    ``max_inline`` images are kept; older ones are replaced by a one-line summary and,
+    when ``blob_dir`` is set, written to disk so the summary can reference them. Only
+    the last ``max_frames`` frames are listed one by one; earlier ones are dropped and
+    summarised in a single line, so the prompt stays the same size however long the
+    run gets.
+    """
+
+    def __init__(self, max_pixel_diff: int = 12, max_inline: int = 3, blob_dir: Optional[str] = None,
+                 max_frames: int = 8):
+        """
+        Args:
+            max_pixel_diff: Largest per-cell difference (0-255) of the downsampled
+                grayscale thumbnails for two captures to count as unchanged
+            max_inline: Number of most recent images kept inline in the prompt
+            blob_dir: Optional directory where compacted images are written
+            max_frames: Number of most recent frames listed in the prompt (at least max_inline)
+        """
+        self.max_pixel_diff = max_pixel_diff
+        self.max_inline = max_inline
+        self.blob_dir = blob_dir
+        self.max_frames = max(max_frames, max_inline)
+        self.frames: List[ScreenFrame] = []
+        self.current: Optional[types.Blob] = None
+        self._last_thumbnail = None
+        # Coordinator content built ahead of the next prompt, dropped when a frame is added
+        self._content: Optional[types.Content] = None
+
+        self._added = 0
+        self._compacted = 0
+        # Frames dropped from the front of the list: first/last iteration and how many were unchanged
+        self._dropped = 0
+        self._dropped_first: Optional[int] = None
+        self._dropped_last: Optional[int] = None
+        self._dropped_unchanged = 0
+        self._prompts = 0
+        self._prompt_images = 0
+        self._prompt_image_bytes = 0
+        self._max_prompt_image_bytes = 0
+
+    def seed(self, blob: types.Blob):
+        """Remember the initial screenshot (already part of the first message) for comparison."""
+        _, self._last_thumbnail = screen_signature(blob.data)
+        self.current = blob
+
+    def add(self, iteration: int, blob: types.Blob, signature: Optional[Tuple[str, Any]] = None) -> ScreenFrame:
+        """
+        Record the capture taken after an iteration and compare it with the previous one.
+
+        Args:
+            iteration: Loop iteration the capture was taken after
+            blob: The encoded capture
+            signature: Its screen_signature() when already computed (e.g. by the pipelined controller)
+        """
+        phash, thumbnail = signature or screen_signature(blob.data)
+        similarity, max_diff = compare_signatures(self._last_thumbnail, thumbnail)
+        unchanged = self._last_thumbnail is not None and max_diff <= self.max_pixel_diff
+        self._last_thumbnail = thumbnail
+        self.current = blob
+
+        frame = ScreenFrame(
+            iteration=iteration,
+            blob=None if unchanged else blob,
+            phash=phash,
+            similarity=similarity,
+            unchanged=unchanged
+        )
+        self.frames.append(frame)
+        self._added += 1
+        self._compact()
+        self._drop()
+        self._content = None
+        return frame
+
+    def to_content(self) -> Optional[types.Content]:
+        """
+        Build the user content listing the screens since the initial one, earlier ones
+        summarised in one line (cached until the next add).
+        """
+        if not self.frames:
+            return None
+        if self._content is not None:
+            return self._content
+        parts = []
+        if self._dropped:
+            unchanged = f", {self._dropped_unchanged} with no visible change" if self._dropped_unchanged else ""
+            stored = f"; their images are stored in {self.blob_dir} by SHA-256" if self.blob_dir else ""
+            parts.append(types.Part(text=(
+                f"Screens after iterations {self._dropped_first}-{self._dropped_last} omitted to save context "
+                f"({self._dropped} screens{unchanged}{stored})."
+            )))
+        for frame in self.frames:
+            if frame.unchanged:
+                parts.append(types.Part(text=(
+                    f"Screen after iteration {frame.iteration}: no visible change since the previous screen "
+                    f"(similarity {frame.similarity:.3f}). The last action most likely had no effect."
+                )))
+            elif frame.blob is None:
+                reference = f", stored at {frame.ref}" if frame.ref else ""
+                parts.append(types.Part(text=(
+                    f"Screen after iteration {frame.iteration}: image omitted to save context "
+                    f"(perceptual hash {frame.phash}{reference})."
+                )))
+            else:
+                parts.append(types.Part(text=f"Screen after iteration {frame.iteration}:"))
+                parts.append(types.Part(inline_data=frame.blob))
+        self._content = types.Content(role="user", parts=parts)
+        return self._content
+
+    def record_prompt(self, contents: List[types.Content]):
+        """Count the images and image bytes of a request about to be sent to the model."""
+        images = 0
+        image_bytes = 0
+        for content in contents:
+            for part in content.parts or []:
+                if part.inline_data is not None and part.inline_data.data:
+                    images += 1
+                    image_bytes += len(part.inline_data.data)
+        self._prompts += 1
+        self._prompt_images += images
+        self._prompt_image_bytes += image_bytes
+        self._max_prompt_image_bytes = max(self._max_prompt_image_bytes, image_bytes)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return memory held by the history and image payload sent per prompt."""
+        inline = [frame for frame in self.frames if frame.blob is not None]
+        return {
+            "frames": self._added,
+            "listed_frames": len(self.frames),
+            "dropped_frames": self._dropped,
+            "inline_images": len(inline),
+            "retained_bytes": sum(len(frame.blob.data) for frame in inline),
+            "compacted_images": self._compacted,
+            "prompts": self._prompts,
+            "avg_prompt_images": self._prompt_images / self._prompts if self._prompts else 0.0,
+            "avg_prompt_image_bytes": self._prompt_image_bytes / self._prompts if self._prompts else 0.0,
+            "max_prompt_image_bytes": self._max_prompt_image_bytes,
+        }
+
+    def _compact(self):
+        inline = [frame for frame in self.frames if frame.blob is not None]
+        for frame in inline[:max(0, len(inline) - self.max_inline)]:
+            if self.blob_dir:
+                frame.ref = self._store(frame.blob)
+            frame.blob = None
+            self._compacted += 1
+
+    def _drop(self):
+        # Oldest first; compaction already took their images out
+        while len(self.frames) > self.max_frames:
+            frame = self.frames.pop(0)
+            if self._dropped_first is None:
+                self._dropped_first = frame.iteration
+            self._dropped_last = frame.iteration
+            self._dropped += 1
+            self._dropped_unchanged += frame.unchanged
+
+    def _store(self, blob: types.Blob) -> str:
+        os.makedirs(self.blob_dir, exist_ok=True)
+        extension = blob.mime_type.split("/")[-1]
+        path = os.path.join(self.blob_dir, f"{hashlib.sha256(blob.data).hexdigest()}.{extension}")
+        if not os.path.exists(path):
+            with open(path, "wb") as f:
+                f.write(blob.data)
+        return path
@@ -0,0 +1,358 @@
+"""Persistent HTTP response cache and HAR record/replay for browser contexts, built on Playwright routing."""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Literal, Optional, Tuple
+from urllib.parse import urldefrag
+
+from pydantic import BaseModel, Field
+
+# Resource types cached for default_ttl_s when the server sends no explicit lifetime
+STATIC_RESOURCE_TYPES = {"stylesheet", "script", "image", "font", "media"}
+
+# Headers not replayed: the stored body is already decoded, and cookies are never served from cache
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "keep-alive", "set-cookie"}
+
+# Request headers that identify the user; responses to them are only served back to the same credentials
+CREDENTIAL_HEADERS = ("authorization", "proxy-authorization", "cookie")
+
+class HarOptions(BaseModel):
+    """Record the network of a run into a HAR file, or replay a recorded one."""
+    path: str = Field(description="HAR file (a .zip path stores bodies as separate entries)")
+    mode: Literal["record", "replay"] = "replay"
+    url: Optional[str] = Field(default=None, description="Glob of the URLs recorded or replayed (default: all)")
+    not_found: Literal["abort", "fallback"] = Field(
+        default="abort", description="What replay does with requests missing from the HAR")
+
+    def route_options(self) -> Dict[str, Any]:
+        """Keyword arguments for context.route_from_har()."""
+        options = {"har": self.path, "update": self.mode == "record", "not_found": self.not_found}
+        if self.url:
+            options["url"] = self.url
+        if self.mode == "record":
+            options["update_content"] = "attach" if self.path.endswith(".zip") else "embed"
+        return options
+
+def _cache_directives(headers: Dict[str, str]) -> Dict[str, str]:
+    directives = {}
+    for item in headers.get("cache-control", "").lower().split(","):
+        name, _, value = item.strip().partition("=")
+        if name:
+            directives[name] = value.strip().strip('"')
+    return directives
+
+def freshness_lifetime(status: int, headers: Dict[str, str], resource_type: str, default_ttl_s: float) -> Optional[float]:
+    """
+    Seconds a response may be served from cache, or None if it must not be stored.
+
+    Honours no-store, no-cache and (s-)max-age, and treats private like no-store since
+    the cache is shared. Responses without an explicit lifetime get default_ttl_s for
+    static resource types and 0 (stored for offline replay only) otherwise.
+    """
+    if status != 200 or "set-cookie" in headers or headers.get("vary", "").strip() == "*":
+        return None
+    directives = _cache_directives(headers)
+    if "no-store" in directives or "private" in directives:
+        return None
+    if "no-cache" in directives:
+        return 0.0
+    for name in ("s-maxage", "max-age"):
+        if name in directives:
+            try:
+                return max(float(directives[name]), 0.0)
+            except ValueError:
+                return 0.0
+    return default_ttl_s if resource_type in STATIC_RESOURCE_TYPES else 0.0
+
+def request_credentials(headers: Dict[str, str]) -> Optional[str]:
+    """The CREDENTIAL_HEADERS a request sent, as one string, or None for an anonymous request."""
+    headers = {name.lower(): value for name, value in headers.items()}
+    sent = [f"{name}: {headers[name]}" for name in CREDENTIAL_HEADERS if headers.get(name)]
+    return "\n".join(sent) if sent else None
+
+def url_key(url: str, credentials: Optional[str] = None) -> str:
+    """
+    Cache key of a GET request: the SHA-256 of its URL without the fragment and of the
+    credentials it sent, if any, so a response is only served to the same credentials.
+    """
+    digest = hashlib.sha256(urldefrag(url)[0].encode("utf-8"))
+    if credentials is not None:
+        digest.update(b"\x00")
+        digest.update(credentials.encode("utf-8"))
+    return digest.hexdigest()
+
+class HttpResponseCache:
+    """
+    Content-addressed on-disk cache of GET responses, shared by any number of
+    contexts and runs.
+
+    Bodies are stored once per SHA-256 digest under blobs/, and each URL gets a small
+    metadata file under entries/ pointing at its body. Requests that sent cookies or
+    an Authorization header are keyed by those credentials too, so one identity's
+    responses are never served to another run or identity; responses marked private
+    are not stored at all. The total size of the bodies
+    is bounded by max_bytes, least recently used URLs evicted first.
+
+    With offline=True every request is answered from the cache, whatever its age,
+    and misses are aborted, so a recorded site can be replayed without network.
+
+    Install it with context.route("**/*", cache.handle) (handle_async for the
+    async API) before any other route: Playwright runs the most recently
+    registered route first, so blockers and HAR replay still see requests before
+    the cache fetches them.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 512 * 1024 * 1024, default_ttl_s: float = 24 * 3600,
+                 offline: bool = False, max_entry_bytes: int = 16 * 1024 * 1024):
+        """
+        Args:
+            directory: Cache directory (created if missing)
+            max_bytes: Size bound of the stored bodies
+            default_ttl_s: Lifetime of static resources served without cache headers
+            offline: Serve only from the cache and abort everything else
+            max_entry_bytes: Bodies larger than this are never stored
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.default_ttl_s = default_ttl_s
+        self.offline = offline
+        self.max_entry_bytes = max_entry_bytes
+
+        self._blob_dir = os.path.join(directory, "blobs")
+        self._entry_dir = os.path.join(directory, "entries")
+        os.makedirs(self._blob_dir, exist_ok=True)
+        os.makedirs(self._entry_dir, exist_ok=True)
+
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._blob_refs: Dict[str, int] = {}
+        self._blob_sizes: Dict[str, int] = {}
+        self._bytes = 0
+        self._counts = {"hits": 0, "misses": 0, "stored": 0, "offline_aborted": 0, "bytes_served": 0}
+        self._lock = threading.Lock()
+        self._load_index()
+
+    # --- Route handlers ---
+
+    def handle(self, route):
+        """Route handler for the sync API."""
+        request = route.request
+        if not self._cacheable_request(request):
+            if self.offline:
+                self._count("offline_aborted")
+                route.abort("internetdisconnected")
+            else:
+                route.fallback()
+            return
+        credentials = request_credentials(request.all_headers())
+        cached = self.lookup(request.url, credentials)
+        if cached is not None:
+            status, headers, body = cached
+            route.fulfill(status=status, headers=headers, body=body)
+            return
+        if self.offline:
+            self._count("offline_aborted")
+            route.abort("internetdisconnected")
+            return
+        try:
+            response = route.fetch()
+            body = response.body()
+        except Exception:
+            # Let the browser load it and report the failure itself
+            route.fallback()
+            return
+        self.store(request.url, request.resource_type, response.status, response.headers, body, credentials)
+        route.fulfill(response=response, body=body)
+
+    async def handle_async(self, route):
+        """Route handler for the async API; disk access runs in a worker thread."""
+        request = route.request
+        if not self._cacheable_request(request):
+            if self.offline:
+                self._count("offline_aborted")
+                await route.abort("internetdisconnected")
+            else:
+                await route.fallback()
+            return
+        credentials = request_credentials(await request.all_headers())
+        cached = await asyncio.to_thread(self.lookup, request.url, credentials)
+        if cached is not None:
+            status, headers, body = cached
+            await route.fulfill(status=status, headers=headers, body=body)
+            return
+        if self.offline:
+            self._count("offline_aborted")
+            await route.abort("internetdisconnected")
+            return
+        try:
+            response = await route.fetch()
+            body = await response.body()
+        except Exception:
+            await route.fallback()
+            return
+        await asyncio.to_thread(self.store, request.url, request.resource_type, response.status,
+                                response.headers, body, credentials)
+        await route.fulfill(response=response, body=body)
+
+    # --- Lookup and storage ---
+
+    def lookup(self, url: str, credentials: Optional[str] = None) -> Optional[Tuple[int, Dict[str, str], bytes]]:
+        """
+        Return (status, headers, body) of a fresh entry (any entry when offline), or None.
+
+        Args:
+            url: Request URL
+            credentials: request_credentials() of the request; only entries stored for the
+                same credentials match
+        """
+        key = url_key(url, credentials)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (self.offline or entry["expires"] > time.time()):
+                self._entries.move_to_end(key)
+            else:
+                entry = None
+        if entry is None:
+            self._count("misses")
+            return None
+        try:
+            with open(os.path.join(self._blob_dir, entry["blob"]), "rb") as f:
+                body = f.read()
+        except OSError:
+            # Body evicted or removed underneath us
+            self._count("misses")
+            return None
+        try:
+            os.utime(os.path.join(self._entry_dir, f"{key}.json"), None)
+        except OSError:
+            pass
+        self._count("hits")
+        self._count("bytes_served", len(body))
+        return entry["status"], entry["headers"], body
+
+    def store(self, url: str, resource_type: str, status: int, headers: Dict[str, str], body: bytes,
+              credentials: Optional[str] = None) -> bool:
+        """
+        Store a response if its status, headers and size allow it.
+
+        Args:
+            url: Request URL
+            resource_type: Playwright resource type of the request
+            status: Response status
+            headers: Response headers
+            body: Decoded response body
+            credentials: request_credentials() of the request the response answered
+
+        Returns:
+            bool: Whether the response was stored
+        """
+        headers = {name.lower(): value for name, value in headers.items()}
+        lifetime = freshness_lifetime(status, headers, resource_type, self.default_ttl_s)
+        if lifetime is None or len(body) > self.max_entry_bytes:
+            return False
+        blob = hashlib.sha256(body).hexdigest()
+        blob_path = os.path.join(self._blob_dir, blob)
+        if not os.path.exists(blob_path):
+            tmp_path = f"{blob_path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(body)
+            os.replace(tmp_path, blob_path)
+
+        key = url_key(url, credentials)
+        entry = {
+            "url": urldefrag(url)[0],
+            "status": status,
+            "headers": {name: value for name, value in headers.items() if name not in _DROPPED_HEADERS},
+            "blob": blob,
+            "size": len(body),
+            "stored_at": time.time(),
+            "expires": time.time() + lifetime,
+        }
+        entry_path = os.path.join(self._entry_dir, f"{key}.json")
+        tmp_path = f"{entry_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, entry_path)
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._release_blob(previous["blob"])
+            self._entries[key] = entry
+            self._retain_blob(blob, len(body))
+            self._counts["stored"] += 1
+            if self._bytes > self.max_bytes:
+                self._evict()
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counts, bytes served from cache and the size of the store."""
+        with self._lock:
+            lookups = self._counts["hits"] + self._counts["misses"]
+            return {
+                **self._counts,
+                "hit_rate": self._counts["hits"] / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "offline": self.offline,
+            }
+
+    # --- Internals ---
+
+    def _cacheable_request(self, request) -> bool:
+        return request.method == "GET" and request.url.startswith(("http://", "https://"))
+
+    def _count(self, name: str, amount: int = 1):
+        with self._lock:
+            self._counts[name] += amount
+
+    def _load_index(self):
+        loaded = []
+        for name in os.listdir(self._entry_dir):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self._entry_dir, name)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+                blob_size = os.path.getsize(os.path.join(self._blob_dir, entry["blob"]))
+                loaded.append((os.path.getmtime(path), name[:-len(".json")], entry, blob_size))
+            except (OSError, ValueError, KeyError):
+                continue
+        loaded.sort(key=lambda item: item[0])
+        for _, key, entry, blob_size in loaded:
+            self._entries[key] = entry
+            self._retain_blob(entry["blob"], blob_size)
+
+    def _retain_blob(self, blob: str, size: int):
+        # Call with self._lock held (or from __init__)
+        if blob not in self._blob_refs:
+            self._blob_refs[blob] = 0
+            self._blob_sizes[blob] = size
+            self._bytes += size
+        self._blob_refs[blob] += 1
+
+    def _release_blob(self, blob: str):
+        # Call with self._lock held
+        self._blob_refs[blob] -= 1
+        if self._blob_refs[blob] == 0:
+            del self._blob_refs[blob]
+            self._bytes -= self._blob_sizes.pop(blob)
+            try:
+                os.remove(os.path.join(self._blob_dir, blob))
+            except OSError:
+                pass
+
+    def _evict(self):
+        # Call with self._lock held
+        while self._bytes > self.max_bytes and self._entries:
+            key, entry = self._entries.popitem(last=False)
+            try:
+                os.remove(os.path.join(self._entry_dir, f"{key}.json"))
+            except OSError:
+                pass
+            self._release_blob(entry["blob"])
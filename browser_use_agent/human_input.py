@@ -0,0 +1,247 @@
+"""Brokers answering the agent's questions to a human without blocking other runs."""
+
+import asyncio
+import concurrent.futures
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+from .logging_config import get_logger, redact
+
+logger = get_logger("tools")
+
+class HumanInputRequest(BaseModel):
+    """A question waiting for a human answer."""
+    request_id: str
+    session_id: Optional[str] = None
+    prompt: str
+    created_at: float = Field(default_factory=time.time)
+
+class HumanInputBroker:
+    """
+    Base of the human input brokers. get_user_input puts a request on the broker and
+    awaits the answer, so only the asking run is suspended (its browser context stays
+    open, idle) while other runs on the event loop carry on. Answers come from
+    whoever serves the queue: pending() lists the open requests and answer() replies.
+
+    Subclasses implement _put, _wait_answer, _discard, answer and pending; the base
+    keeps the queue depth and wait time metrics.
+    """
+
+    def __init__(self, timeout_s: float = 300.0):
+        """
+        Args:
+            timeout_s: How long a run waits for an answer before it carries on without one
+        """
+        self.timeout_s = timeout_s
+        self._lock = threading.Lock()
+        self._depth = 0
+        self._counts = {"requests": 0, "answered": 0, "timed_out": 0, "max_depth": 0,
+                        "wait_ms": 0.0, "max_wait_ms": 0.0}
+
+    async def ask(self, prompt: str, session_id: Optional[str] = None, timeout_s: Optional[float] = None,
+                  on_queued: Optional[Callable[[HumanInputRequest], None]] = None) -> Optional[str]:
+        """
+        Queue a question and wait for its answer.
+
+        Args:
+            prompt: The question for the human
+            session_id: Session of the asking run, shown to whoever answers
+            timeout_s: Overrides the broker's timeout for this request
+            on_queued: Called with the request once it is queued (e.g. to announce its id)
+
+        Returns:
+            The answer, or None when none arrived in time
+        """
+        request = HumanInputRequest(request_id=uuid.uuid4().hex, session_id=session_id, prompt=prompt)
+        timeout_s = self.timeout_s if timeout_s is None else timeout_s
+        self._put(request)
+        if on_queued is not None:
+            on_queued(request)
+        with self._lock:
+            self._counts["requests"] += 1
+            self._depth += 1
+            self._counts["max_depth"] = max(self._counts["max_depth"], self._depth)
+        started = time.perf_counter()
+        try:
+            answer = await asyncio.wait_for(self._wait_answer(request), timeout_s)
+        except asyncio.TimeoutError:
+            answer = None
+        finally:
+            self._discard(request.request_id)
+            waited = (time.perf_counter() - started) * 1000
+            with self._lock:
+                self._depth -= 1
+                self._counts["wait_ms"] += waited
+                self._counts["max_wait_ms"] = max(self._counts["max_wait_ms"], waited)
+        with self._lock:
+            self._counts["answered" if answer is not None else "timed_out"] += 1
+        return answer
+
+    def answer(self, request_id: str, response: str) -> bool:
+        """Answer a pending request. Returns False when it is unknown or no longer waiting."""
+        raise NotImplementedError
+
+    def pending(self) -> List[HumanInputRequest]:
+        """Return the requests waiting for an answer, oldest first."""
+        raise NotImplementedError
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return request counts, current and maximum queue depth and average/max wait time."""
+        with self._lock:
+            counts = dict(self._counts)
+            counts["depth"] = self._depth
+        done = counts["answered"] + counts["timed_out"]
+        counts["avg_wait_ms"] = counts.pop("wait_ms") / done if done else 0.0
+        return counts
+
+    def _put(self, request: HumanInputRequest):
+        raise NotImplementedError
+
+    async def _wait_answer(self, request: HumanInputRequest) -> str:
+        raise NotImplementedError
+
+    def _discard(self, request_id: str):
+        """Forget a request that was answered or timed out."""
+
+class QueueHumanInputBroker(HumanInputBroker):
+    """
+    In-process queue. answer() can be called from any thread (a web handler, a chat bot,
+    a console thread); the waiting run wakes up on its own event loop.
+    """
+
+    def __init__(self, timeout_s: float = 300.0):
+        super().__init__(timeout_s)
+        self._requests: Dict[str, HumanInputRequest] = {}
+        self._futures: Dict[str, concurrent.futures.Future] = {}
+
+    def answer(self, request_id: str, response: str) -> bool:
+        with self._lock:
+            future = self._futures.get(request_id)
+        if future is None or future.done():
+            return False
+        future.set_result(response)
+        return True
+
+    def pending(self) -> List[HumanInputRequest]:
+        with self._lock:
+            return sorted(self._requests.values(), key=lambda r: r.created_at)
+
+    def _put(self, request: HumanInputRequest):
+        with self._lock:
+            self._requests[request.request_id] = request
+            self._futures[request.request_id] = concurrent.futures.Future()
+
+    async def _wait_answer(self, request: HumanInputRequest) -> str:
+        with self._lock:
+            future = self._futures[request.request_id]
+        return await asyncio.wrap_future(future)
+
+    def _discard(self, request_id: str):
+        with self._lock:
+            self._requests.pop(request_id, None)
+            future = self._futures.pop(request_id, None)
+        if future is not None:
+            future.cancel()
+
+class SqliteHumanInputBroker(HumanInputBroker):
+    """
+    Queue in a SQLite table, so requests can be answered from another process (an
+    operator console or service sharing the database file). Waiting runs poll for
+    their answer every poll_interval_s without blocking the event loop.
+    """
+
+    def __init__(self, path: str, timeout_s: float = 300.0, poll_interval_s: float = 0.5):
+        super().__init__(timeout_s)
+        self.path = path
+        self.poll_interval_s = poll_interval_s
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS human_input (request_id TEXT PRIMARY KEY, session_id TEXT, "
+            "prompt TEXT NOT NULL, created_at REAL NOT NULL, response TEXT, answered_at REAL)")
+        self._connection.commit()
+        self._db_lock = threading.Lock()
+
+    def answer(self, request_id: str, response: str) -> bool:
+        with self._db_lock, self._connection:
+            cursor = self._connection.execute(
+                "UPDATE human_input SET response = ?, answered_at = ? WHERE request_id = ? AND response IS NULL",
+                (response, time.time(), request_id))
+        return cursor.rowcount == 1
+
+    def pending(self) -> List[HumanInputRequest]:
+        with self._db_lock:
+            rows = self._connection.execute(
+                "SELECT request_id, session_id, prompt, created_at FROM human_input "
+                "WHERE response IS NULL ORDER BY created_at").fetchall()
+        return [HumanInputRequest(request_id=r[0], session_id=r[1], prompt=r[2], created_at=r[3]) for r in rows]
+
+    def close(self):
+        self._connection.close()
+
+    def _put(self, request: HumanInputRequest):
+        with self._db_lock, self._connection:
+            self._connection.execute(
+                "INSERT INTO human_input (request_id, session_id, prompt, created_at) VALUES (?, ?, ?, ?)",
+                (request.request_id, request.session_id, request.prompt, request.created_at))
+
+    async def _wait_answer(self, request: HumanInputRequest) -> str:
+        while True:
+            with self._db_lock:
+                row = self._connection.execute("SELECT response FROM human_input WHERE request_id = ?",
+                                               (request.request_id,)).fetchone()
+            if row is not None and row[0] is not None:
+                return row[0]
+            await asyncio.sleep(self.poll_interval_s)
+
+    def _discard(self, request_id: str):
+        with self._db_lock, self._connection:
+            self._connection.execute("DELETE FROM human_input WHERE request_id = ?", (request_id,))
+
+class ConsoleHumanInputBroker(QueueHumanInputBroker):
+    """
+    Asks at the terminal, like the original input() prompt, but reads on a background
+    thread so the asking run awaits the answer instead of blocking the process.
+    Questions of concurrent runs are asked one at a time.
+    """
+
+    def __init__(self, timeout_s: float = 300.0):
+        super().__init__(timeout_s)
+        self._console = threading.Lock()
+
+    def _put(self, request: HumanInputRequest):
+        super()._put(request)
+        threading.Thread(target=self._prompt, args=(request,), name="orbit-human-input", daemon=True).start()
+
+    def _prompt(self, request: HumanInputRequest):
+        with self._console:
+            with self._lock:
+                if request.request_id not in self._futures:
+                    return  # timed out while an earlier question was on screen
+            # Print a clear separator to make the prompt stand out
+            print("\n" + "="*50)
+            print("👤 HUMAN INPUT REQUIRED:")
+            print(request.prompt)
+            print("="*50)
+            try:
+                response = input("Your response: ")
+            except EOFError:
+                return
+        logger.info("Received user input %s", redact(response))
+        self.answer(request.request_id, response)
+
+_default_broker: Optional[HumanInputBroker] = None
+_default_lock = threading.Lock()
+
+def default_broker() -> HumanInputBroker:
+    """Return the process-wide console broker used by runs without their own broker."""
+    global _default_broker
+    with _default_lock:
+        if _default_broker is None:
+            _default_broker = ConsoleHumanInputBroker()
+        return _default_broker
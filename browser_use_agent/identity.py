@@ -0,0 +1,207 @@
+"""Encrypted, expiring Playwright storage state per named identity, shared safely across runs."""
+
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from .logging_config import get_logger
+
+logger = get_logger("browser")
+
+IDENTITY_KEY_ENV = "ORBIT_IDENTITY_KEY"
+
+def generate_identity_key() -> str:
+    """Return a new Fernet key for IdentityStore (keep it outside the store's directory)."""
+    return _fernet_class().generate_key().decode("ascii")
+
+def _fernet_class():
+    try:
+        from cryptography.fernet import Fernet
+    except ImportError as e:
+        raise RuntimeError("Identity storage needs the 'cryptography' package (pip install cryptography)") from e
+    return Fernet
+
+def _cookie_key(cookie: Dict[str, Any]):
+    return cookie.get("name"), cookie.get("domain"), cookie.get("path")
+
+def merge_storage_states(base: Optional[Dict[str, Any]], update: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Combine two storage states, the update winning per cookie (name, domain, path) and
+    per origin, so a run saving its state keeps what another run of the identity added.
+    """
+    if not base:
+        return update
+    cookies = {_cookie_key(c): c for c in base.get("cookies", [])}
+    cookies.update({_cookie_key(c): c for c in update.get("cookies", [])})
+    origins = {o.get("origin"): o for o in base.get("origins", [])}
+    origins.update({o.get("origin"): o for o in update.get("origins", [])})
+    return {"cookies": list(cookies.values()), "origins": list(origins.values())}
+
+def drop_expired_cookies(state: Dict[str, Any], now: Optional[float] = None) -> int:
+    """Remove cookies past their expiry (session cookies, expires -1, are kept). Returns how many."""
+    now = time.time() if now is None else now
+    cookies = state.get("cookies", [])
+    kept = [c for c in cookies if c.get("expires", -1) is None or c.get("expires", -1) < 0 or c["expires"] > now]
+    state["cookies"] = kept
+    return len(cookies) - len(kept)
+
+class IdentityStore:
+    """
+    Directory of storage states (cookies and localStorage) by identity name, so runs
+    under an identity start past the logins and consent banners of earlier runs.
+
+    Each state is Fernet-encrypted at rest and rejected once older than max_age_s;
+    expired cookies are dropped on load. Reads and writes of an identity hold an
+    exclusive lock on its lock file, so concurrent runs (threads or processes) under
+    the same identity never see a half-written file, and saves merge into what is
+    stored instead of overwriting other runs' cookies.
+    """
+
+    def __init__(self, directory: str, key: Optional[str] = None, max_age_s: float = 7 * 24 * 3600,
+                 lock_timeout_s: float = 10.0):
+        """
+        Args:
+            directory: Where the encrypted states and lock files are kept
+            key: Fernet key (see generate_identity_key); defaults to the ORBIT_IDENTITY_KEY
+                environment variable
+            max_age_s: States saved longer ago than this are ignored (None never expires them)
+            lock_timeout_s: How long to wait for another run holding the identity's lock
+        """
+        key = key or os.environ.get(IDENTITY_KEY_ENV)
+        if not key:
+            raise ValueError(f"IdentityStore needs an encryption key (key argument or {IDENTITY_KEY_ENV})")
+        self._fernet = _fernet_class()(key.encode("ascii") if isinstance(key, str) else key)
+        self.directory = directory
+        self.max_age_s = max_age_s
+        self.lock_timeout_s = lock_timeout_s
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._counts = {"loads": 0, "hits": 0, "expired": 0, "invalid": 0, "saves": 0,
+                        "cookies_dropped": 0, "lock_wait_ms": 0.0}
+
+    def load(self, identity: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the identity's storage state for BrowserContext(storage_state=...), or None
+        when nothing usable is stored.
+        """
+        from cryptography.fernet import InvalidToken
+        with self._locked(identity):
+            token = self._read(identity)
+        self._count("loads")
+        if token is None:
+            return None
+        try:
+            ttl = int(self.max_age_s) if self.max_age_s is not None else None
+            state = json.loads(self._fernet.decrypt(token, ttl=ttl))
+        except InvalidToken:
+            # Too old, or written with another key: start from a blank profile
+            expired = self._is_expired(token)
+            self._count("expired" if expired else "invalid")
+            logger.info("Stored state of identity %s is %s, ignoring it", identity,
+                        "expired" if expired else "unreadable with this key")
+            return None
+        self._count("hits")
+        self._count("cookies_dropped", drop_expired_cookies(state))
+        return state
+
+    def save(self, identity: str, state: Dict[str, Any]):
+        """Merge a context's storage state into the identity's stored state."""
+        from cryptography.fernet import InvalidToken
+        with self._locked(identity):
+            stored = None
+            token = self._read(identity)
+            if token is not None:
+                try:
+                    stored = json.loads(self._fernet.decrypt(token))
+                except InvalidToken:
+                    stored = None
+            merged = merge_storage_states(stored, state)
+            self._count("cookies_dropped", drop_expired_cookies(merged))
+            self._write(identity, self._fernet.encrypt(json.dumps(merged).encode("utf-8")))
+        self._count("saves")
+
+    def delete(self, identity: str):
+        with self._locked(identity):
+            try:
+                os.remove(self._path(identity))
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Return loads, hits, expired/unreadable states, saves, dropped cookies and lock wait time."""
+        with self._lock:
+            return dict(self._counts)
+
+    def _count(self, name: str, amount: float = 1):
+        with self._lock:
+            self._counts[name] += amount
+
+    def _path(self, identity: str) -> str:
+        if not re.fullmatch(r"[A-Za-z0-9._@-]+", identity) or identity.startswith("."):
+            raise ValueError(f"Invalid identity name: {identity!r}")
+        return os.path.join(self.directory, f"{identity}.state")
+
+    def _read(self, identity: str) -> Optional[bytes]:
+        try:
+            with open(self._path(identity), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _write(self, identity: str, token: bytes):
+        # Write then rename, so a crash never leaves a truncated state behind
+        path = self._path(identity)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(token)
+        os.replace(tmp, path)
+
+    def _is_expired(self, token: bytes) -> bool:
+        if self.max_age_s is None:
+            return False
+        try:
+            return time.time() - self._fernet.extract_timestamp(token) > self.max_age_s
+        except Exception:
+            return False
+
+    @contextmanager
+    def _locked(self, identity: str) -> Iterator[None]:
+        """Hold the identity's exclusive file lock (blocks other threads and processes)."""
+        started = time.perf_counter()
+        with open(self._path(identity) + ".lock", "a+b") as handle:
+            _acquire_file_lock(handle, self.lock_timeout_s)
+            self._count("lock_wait_ms", (time.perf_counter() - started) * 1000)
+            try:
+                yield
+            finally:
+                _release_file_lock(handle)
+
+def _acquire_file_lock(handle, timeout_s: float):
+    deadline = time.monotonic() + timeout_s
+    while True:
+        try:
+            try:
+                import fcntl
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except ImportError:
+                import msvcrt
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+            return
+        except OSError:
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Timed out waiting for identity lock {handle.name}")
+            time.sleep(0.05)
+
+def _release_file_lock(handle):
+    try:
+        import fcntl
+        fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+    except ImportError:
+        import msvcrt
+        handle.seek(0)
+        msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
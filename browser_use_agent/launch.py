@@ -0,0 +1,66 @@
+"""Named Chromium launch profiles shared by the controllers and the pool."""
+
+from typing import Any, Dict, List, Union
+
+from pydantic import BaseModel, Field
+
+_BASE_ARGS = ["--disable-extensions", "--disable-file-system"]
+
+class LaunchProfile(BaseModel):
+    """How Chromium is launched and how its pages are sized."""
+    name: str
+    headless: bool = Field(default=False, description="Run without a visible window")
+    args: List[str] = Field(default_factory=lambda: list(_BASE_ARGS), description="Extra Chromium command line flags")
+    device_scale_factor: float = Field(default=1.0, description="Fixed device pixel ratio of every page")
+    chromium_sandbox: bool = True
+
+    def launch_options(self) -> Dict[str, Any]:
+        """Keyword arguments for playwright.chromium.launch()."""
+        return {
+            "headless": self.headless,
+            "chromium_sandbox": self.chromium_sandbox,
+            "env": {},
+            "args": list(self.args),
+        }
+
+    def context_options(self, viewport_width: int, viewport_height: int) -> Dict[str, Any]:
+        """Keyword arguments for browser.new_context()."""
+        return {
+            "viewport": {"width": viewport_width, "height": viewport_height},
+            "device_scale_factor": self.device_scale_factor,
+        }
+
+LAUNCH_PROFILES: Dict[str, LaunchProfile] = {
+    # Visible window, for watching and debugging runs
+    "default": LaunchProfile(name="default"),
+    "headless": LaunchProfile(name="headless", headless=True),
+    # Servers and containers: no GPU process, no /dev/shm pressure, no background work
+    "headless-nogpu": LaunchProfile(
+        name="headless-nogpu",
+        headless=True,
+        args=_BASE_ARGS + [
+            "--disable-gpu",
+            "--disable-software-rasterizer",
+            "--disable-dev-shm-usage",
+            "--disable-background-networking",
+            "--disable-background-timer-throttling",
+            "--disable-renderer-backgrounding",
+            "--disable-default-apps",
+            "--disable-sync",
+            "--no-first-run",
+            "--mute-audio",
+            "--hide-scrollbars",
+        ],
+    ),
+}
+
+def get_launch_profile(profile: Union[str, LaunchProfile, None]) -> LaunchProfile:
+    """Resolve a profile name (or None for "default") to a LaunchProfile."""
+    if profile is None:
+        return LAUNCH_PROFILES["default"]
+    if isinstance(profile, LaunchProfile):
+        return profile
+    try:
+        return LAUNCH_PROFILES[profile]
+    except KeyError:
+        raise ValueError(f"Unknown launch profile '{profile}', expected one of {sorted(LAUNCH_PROFILES)}") from None
@@ -0,0 +1,255 @@
+"""Content-addressed memoization of model responses for the coordinator and executor."""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from google.adk.models import LlmRequest, LlmResponse
+
+from .logging_config import USER_INPUT_TOOLS, redacted_values
+
+# Set to "1" to bypass every LlmResponseCache without changing code
+BYPASS_ENV_VAR = "ORBIT_LLM_CACHE_BYPASS"
+
+def request_key(llm_request: LlmRequest) -> str:
+    """
+    Hash the parts of a request that determine the response: model name, system
+    instruction, available tools and every content part. Images are reduced to the
+    SHA-256 digest of their bytes.
+    """
+    digest = hashlib.sha256()
+
+    def feed(value: Any):
+        digest.update(json.dumps(value, sort_keys=True, default=str).encode("utf-8"))
+        digest.update(b"\x00")
+
+    feed(llm_request.model)
+    config = llm_request.config
+    feed(str(config.system_instruction) if config is not None and config.system_instruction is not None else "")
+    feed(sorted(llm_request.tools_dict.keys()))
+    for content in llm_request.contents:
+        feed(content.role)
+        for part in content.parts or []:
+            if part.text is not None:
+                feed(["text", part.text])
+            elif part.inline_data is not None:
+                feed(["blob", part.inline_data.mime_type, hashlib.sha256(part.inline_data.data or b"").hexdigest()])
+            elif part.function_call is not None:
+                feed(["call", part.function_call.name, part.function_call.args])
+            elif part.function_response is not None:
+                feed(["response", part.function_response.name, part.function_response.response])
+    return digest.hexdigest()
+
+def follows_user_input(llm_request: LlmRequest) -> bool:
+    """Whether the request carries a human's answer (a USER_INPUT_TOOLS response)."""
+    return any(part.function_response is not None and part.function_response.name in USER_INPUT_TOOLS
+               for content in llm_request.contents for part in content.parts or [])
+
+def passes_on_typed_text(llm_response: LlmResponse) -> bool:
+    """Whether the response calls a tool with text to type, or a description of it (REDACTED_ARG_KEYS)."""
+    return any(part.function_call is not None and redacted_values(part.function_call.args or {})
+               for part in llm_response.content.parts or [])
+
+class LlmResponseCache:
+    """
+    Two-tier cache of model responses: an in-memory LRU bounded by bytes, backed by
+    an optional on-disk tier bounded by total size (oldest files evicted first).
+
+    Register one per run as the "llm_cache" session resource; the model callbacks in
+    agents/callbacks.py consult it before every coordinator and executor call.
+
+    Responses that may carry secrets are kept in memory only, never written to the disk
+    tier: function calls with text to type (or its description) and any response to a
+    request that contains a human's answer.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_memory_bytes: int = 64 * 1024 * 1024,
+                 max_disk_bytes: int = 512 * 1024 * 1024, enabled: bool = True, max_pending: int = 256,
+                 pending_ttl_s: float = 600.0):
+        """
+        Args:
+            directory: Directory of the disk tier (None keeps the cache in memory only)
+            max_memory_bytes: Size bound of the in-memory tier
+            max_disk_bytes: Size bound of the disk tier
+            enabled: False turns every lookup into a bypass
+            max_pending: Missed calls kept waiting for store(); the oldest are dropped beyond it
+            pending_ttl_s: Missed calls older than this are dropped (their model call failed
+                and store() never came)
+        """
+        self.directory = directory
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.enabled = enabled
+        self.max_pending = max_pending
+        self.pending_ttl_s = pending_ttl_s
+
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes = 0
+        self._kept_off_disk = 0
+        self._pending: "OrderedDict[Tuple[str, str], Tuple[str, float, bool]]" = OrderedDict()
+        self._run_stats: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._disk_bytes = sum(
+                os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory) if name.endswith(".json")
+            )
+
+    @property
+    def bypassed(self) -> bool:
+        return not self.enabled or os.environ.get(BYPASS_ENV_VAR) == "1"
+
+    # --- Callback entry points ---
+
+    def lookup(self, run_id: str, call_id: Tuple[str, str], llm_request: LlmRequest) -> Optional[LlmResponse]:
+        """
+        Return the cached response for a request, or None after remembering the key and
+        start time so store() can save the real response.
+
+        Args:
+            run_id: Session id the statistics are reported under
+            call_id: (invocation id, agent name) identifying the pending model call
+            llm_request: The request about to be sent
+        """
+        if self.bypassed:
+            self._count(run_id, "bypassed")
+            return None
+        key = request_key(llm_request)
+        entry = self._get(key)
+        with self._lock:
+            # A call id left over from a failed call must not pair with a later response
+            self._pending.pop(call_id, None)
+            if entry is None:
+                self._pending[call_id] = (key, time.perf_counter(), follows_user_input(llm_request))
+                self._drop_stale_pending()
+        if entry is None:
+            self._count(run_id, "misses")
+            return None
+        payload, latency_ms = entry
+        self._count(run_id, "hits")
+        self._count(run_id, "saved_latency_ms", latency_ms)
+        return LlmResponse.model_validate_json(payload)
+
+    def store(self, call_id: Tuple[str, str], llm_response: LlmResponse):
+        """Save the response of a call that missed in lookup(), in memory only if it may carry secrets."""
+        with self._lock:
+            pending = self._pending.pop(call_id, None)
+        if pending is None or llm_response.partial or llm_response.error_code or llm_response.content is None:
+            return
+        key, started, after_user_input = pending
+        latency_ms = (time.perf_counter() - started) * 1000
+        sensitive = after_user_input or passes_on_typed_text(llm_response)
+        self._put(key, llm_response.model_dump_json(exclude_none=True), latency_ms, disk=not sensitive)
+
+    # --- Stats ---
+
+    def run_stats(self, run_id: str, clear: bool = False) -> Dict[str, Any]:
+        """Return hits, misses, hit rate and saved model latency for one run (clear drops them)."""
+        with self._lock:
+            stats = dict(self._run_stats.pop(run_id, {}) if clear else self._run_stats.get(run_id, {}))
+        hits = stats.get("hits", 0)
+        misses = stats.get("misses", 0)
+        return {
+            "hits": int(hits),
+            "misses": int(misses),
+            "bypassed": int(stats.get("bypassed", 0)),
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "saved_latency_ms": stats.get("saved_latency_ms", 0.0),
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the size of both tiers, the number of calls waiting for store() and of
+        responses kept off disk because they may carry secrets.
+        """
+        with self._lock:
+            return {
+                "pending_calls": len(self._pending),
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_bytes": self._disk_bytes,
+                "kept_off_disk": self._kept_off_disk,
+            }
+
+    # --- Tiers ---
+
+    def _count(self, run_id: str, name: str, amount: float = 1):
+        with self._lock:
+            stats = self._run_stats.setdefault(run_id, {})
+            stats[name] = stats.get(name, 0) + amount
+
+    def _get(self, key: str) -> Optional[Tuple[str, float]]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                return entry
+        if not self.directory:
+            return None
+        path = os.path.join(self.directory, f"{key}.json")
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return None
+        os.utime(path, None)
+        entry = (stored["response"], stored["latency_ms"])
+        with self._lock:
+            self._remember(key, entry)
+        return entry
+
+    def _put(self, key: str, payload: str, latency_ms: float, disk: bool = True):
+        entry = (payload, latency_ms)
+        with self._lock:
+            self._remember(key, entry)
+            if self.directory and not disk:
+                self._kept_off_disk += 1
+        if not self.directory or not disk:
+            return
+        path = os.path.join(self.directory, f"{key}.json")
+        data = json.dumps({"response": payload, "latency_ms": latency_ms})
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(data)
+        existing = os.path.getsize(path) if os.path.exists(path) else 0
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._disk_bytes += len(data) - existing
+            if self._disk_bytes > self.max_disk_bytes:
+                self._evict_disk()
+
+    def _drop_stale_pending(self):
+        # Call with self._lock held; entries are in start order, oldest first
+        cutoff = time.perf_counter() - self.pending_ttl_s
+        while self._pending:
+            _, started, _ = next(iter(self._pending.values()))
+            if len(self._pending) <= self.max_pending and started >= cutoff:
+                break
+            self._pending.popitem(last=False)
+
+    def _remember(self, key: str, entry: Tuple[str, float]):
+        # Call with self._lock held
+        if key in self._memory:
+            self._memory_bytes -= len(self._memory.pop(key)[0])
+        self._memory[key] = entry
+        self._memory_bytes += len(entry[0])
+        while self._memory_bytes > self.max_memory_bytes and self._memory:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted[0])
+
+    def _evict_disk(self):
+        # Call with self._lock held
+        paths = [os.path.join(self.directory, name) for name in os.listdir(self.directory) if name.endswith(".json")]
+        paths.sort(key=os.path.getmtime)
+        for path in paths:
+            if self._disk_bytes <= self.max_disk_bytes:
+                break
+            size = os.path.getsize(path)
+            os.remove(path)
+            self._disk_bytes -= size
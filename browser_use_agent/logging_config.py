@@ -0,0 +1,121 @@
+"""Logger hierarchy of the package (orbit.browser, orbit.tools, orbit.runner) and its console setup."""
+
+import json
+import logging
+import os
+import sys
+from typing import Any, Optional, Union
+
+ROOT_LOGGER_NAME = "orbit"
+
+# Set to "1" to log typed text verbatim instead of its length (debugging only)
+LOG_TYPED_TEXT_ENV_VAR = "ORBIT_LOG_TYPED_TEXT"
+
+# The package stays silent until the application configures logging
+logging.getLogger(ROOT_LOGGER_NAME).addHandler(logging.NullHandler())
+
+def get_logger(name: str) -> logging.Logger:
+    """Return the package logger orbit.<name>."""
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{name}")
+
+class Redacted:
+    """
+    Log argument standing in for user input such as typed text. It is only rendered
+    when a record is actually emitted, and then shows the length, not the text.
+    """
+
+    __slots__ = ("text",)
+
+    def __init__(self, text):
+        self.text = text
+
+    def __str__(self) -> str:
+        if os.environ.get(LOG_TYPED_TEXT_ENV_VAR) == "1":
+            return repr(self.text)
+        return f"<{len(str(self.text))} chars redacted>"
+
+    __repr__ = __str__
+
+def redact(text) -> Redacted:
+    return Redacted(text)
+
+# Tool call arguments that carry text typed into the page, or describe it
+REDACTED_ARG_KEYS = ("text", "action_description")
+
+# Tools whose response is the human's answer to a question
+USER_INPUT_TOOLS = ("get_user_input_wrapper", "HumanInteractionAgent")
+
+def redact_args(args: Any) -> Any:
+    """
+    Return a copy of tool call arguments with the values of REDACTED_ARG_KEYS, at any
+    depth, replaced by their redacted form, for arguments that are stored or published.
+    """
+    if isinstance(args, dict):
+        return {key: str(redact(value)) if key in REDACTED_ARG_KEYS and value is not None else redact_args(value)
+                for key, value in args.items()}
+    if isinstance(args, (list, tuple)):
+        return [redact_args(value) for value in args]
+    return args
+
+def redacted_values(args: Any) -> list:
+    """Return the string values of REDACTED_ARG_KEYS found in tool call arguments, at any depth."""
+    if isinstance(args, dict):
+        values = []
+        for key, value in args.items():
+            if key in REDACTED_ARG_KEYS and isinstance(value, str) and value:
+                values.append(value)
+            else:
+                values.extend(redacted_values(value))
+        return values
+    if isinstance(args, (list, tuple)):
+        return [value for item in args for value in redacted_values(item)]
+    return []
+
+class JsonFormatter(logging.Formatter):
+    """Formats each record as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            payload["exception"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+def configure_logging(level: Union[int, str, None] = None, json_output: Optional[bool] = None, stream=None) -> logging.Logger:
+    """
+    Send the package's log records to a console handler. Calling it again replaces
+    the handler it installed before.
+
+    Args:
+        level: Log level (defaults to $ORBIT_LOG_LEVEL or INFO)
+        json_output: Emit JSON lines instead of text (defaults to $ORBIT_LOG_JSON == "1")
+        stream: Output stream (defaults to stderr)
+
+    Returns:
+        logging.Logger: The package root logger
+    """
+    if level is None:
+        level = os.environ.get("ORBIT_LOG_LEVEL", "INFO")
+    if json_output is None:
+        json_output = os.environ.get("ORBIT_LOG_JSON") == "1"
+
+    logger = logging.getLogger(ROOT_LOGGER_NAME)
+    for handler in list(logger.handlers):
+        if getattr(handler, "_orbit_console", False):
+            logger.removeHandler(handler)
+
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler._orbit_console = True
+    if json_output:
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)-7s %(name)s: %(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(level.upper() if isinstance(level, str) else level)
+    # Records are handled here; don't print them twice through a configured root logger
+    logger.propagate = False
+    return logger
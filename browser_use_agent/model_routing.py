@@ -0,0 +1,152 @@
+"""Per-step escalation to a stronger model after a failure, and per-model call accounting."""
+
+import time
+from collections import OrderedDict, deque
+from typing import Any, Dict, Optional, Tuple
+
+from google.genai import types
+
+from . import GEMINI_ESCALATION_MODEL
+from .logging_config import get_logger
+
+logger = get_logger("runner")
+
+class ModelRouter:
+    """
+    Picks the model of every coordinator/executor call of one run and records per-model
+    call counts, latency and tokens.
+
+    Each agent normally runs on its own model (GEMINI_COORDINATOR_MODEL, ...). After a
+    failure (a click or other tool call that failed, a model reply with a malformed
+    function call, or a step that left the screen unchanged) the rest of that step and
+    the next step are sent to escalation_model; the step after that goes back to the
+    cheap models. Register one per run as the "model_router" session resource.
+
+    Escalation rewrites llm_request.model, which the Gemini backend calls; agents whose
+    model is a BaseLlm instance of another backend keep their own model. Responses
+    served from the LlmResponseCache are counted as cached calls of the model.
+    """
+
+    def __init__(self, escalation_model: Optional[str] = GEMINI_ESCALATION_MODEL,
+                 agents: Tuple[str, ...] = ("BrowserCoordinatorAgent", "BrowserActionExecutorAgent"),
+                 maxlen: int = 1000, max_pending: int = 64):
+        """
+        Args:
+            escalation_model: Model failed steps are retried with (None disables escalation
+                and only records calls); defaults to GEMINI_ESCALATION_MODEL
+            agents: Agents whose calls may be escalated. The HumanInteractionAgent is left
+                out on purpose: it only words questions for the human, so its calls are
+                recorded but always stay on GEMINI_INTERACTION_MODEL
+            maxlen: Number of most recent calls kept for the metrics
+            max_pending: Started calls kept waiting for their response; the oldest are
+                dropped beyond it (calls that raised never finish)
+        """
+        self.escalation_model = escalation_model
+        self.agents = agents
+        self.escalated = False
+        self._failed_in_step = False
+        self._steps = 0
+        self._escalated_steps = 0
+        self._failures: Dict[str, int] = {}
+        self.max_pending = max_pending
+        self._pending: "OrderedDict[Any, Tuple[str, float, bool]]" = OrderedDict()
+        self.history = deque(maxlen=maxlen)
+
+    def start_step(self, screen_unchanged: bool = False):
+        """Decide at the start of a loop iteration whether it runs on the escalation model."""
+        self.escalated = bool(self.escalation_model) and (self._failed_in_step or screen_unchanged)
+        if screen_unchanged:
+            self._count_failure("screen_unchanged")
+        self._failed_in_step = False
+        self._steps += 1
+        if self.escalated:
+            self._escalated_steps += 1
+            logger.info("Escalating step to %s", self.escalation_model)
+
+    def note_failure(self, reason: str):
+        """Escalate the rest of this step and the next one."""
+        self._count_failure(reason)
+        self._failed_in_step = True
+        if self.escalation_model and not self.escalated:
+            logger.info("Escalating to %s after %s", self.escalation_model, reason)
+            self.escalated = True
+
+    def model_for(self, agent_name: str, model: str) -> str:
+        """Return the model this agent's next call should use."""
+        if self.escalated and agent_name in self.agents:
+            return self.escalation_model
+        return model
+
+    def start_call(self, call_id, model: str):
+        self._pending.pop(call_id, None)
+        self._pending[call_id] = (model, time.perf_counter(), self.escalated)
+        while len(self._pending) > self.max_pending:
+            self._pending.popitem(last=False)
+
+    def record_cache_hit(self, agent_name: str, model: str):
+        """Record a call answered from the response cache (no latency, no tokens)."""
+        self.history.append({"model": model, "agent": agent_name, "latency_ms": 0.0, "escalated": self.escalated,
+                             "cached": True, "prompt_tokens": 0, "output_tokens": 0})
+
+    def finish_call(self, call_id, agent_name: str, llm_response) -> None:
+        """Record a finished call and treat a malformed function call as a failure."""
+        pending = self._pending.pop(call_id, None)
+        if pending is None:
+            return
+        model, started, escalated = pending
+        usage = llm_response.usage_metadata
+        self.history.append({
+            "model": model,
+            "agent": agent_name,
+            "latency_ms": (time.perf_counter() - started) * 1000,
+            "escalated": escalated,
+            "cached": False,
+            "prompt_tokens": (usage.prompt_token_count or 0) if usage else 0,
+            "output_tokens": (usage.candidates_token_count or 0) if usage else 0,
+        })
+        if llm_response.finish_reason == types.FinishReason.MALFORMED_FUNCTION_CALL:
+            self.note_failure("malformed_call")
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Return per-model and per-agent call counts, latency and tokens, and escalation counts.
+        Cached calls count as calls; avg_ms and max_ms only cover the calls made to the model.
+        """
+        by_model: Dict[str, Dict[str, Any]] = {}
+        by_agent: Dict[str, Dict[str, int]] = {}
+        for call in self.history:
+            entry = by_model.setdefault(call["model"], {"calls": 0, "cached_calls": 0, "escalated_calls": 0,
+                                                        "total_ms": 0.0, "max_ms": 0.0, "prompt_tokens": 0,
+                                                        "output_tokens": 0})
+            entry["calls"] += 1
+            entry["cached_calls"] += int(call["cached"])
+            entry["escalated_calls"] += int(call["escalated"])
+            entry["total_ms"] += call["latency_ms"]
+            entry["max_ms"] = max(entry["max_ms"], call["latency_ms"])
+            entry["prompt_tokens"] += call["prompt_tokens"]
+            entry["output_tokens"] += call["output_tokens"]
+            agent = by_agent.setdefault(call["agent"], {})
+            agent[call["model"]] = agent.get(call["model"], 0) + 1
+        for entry in by_model.values():
+            made = entry["calls"] - entry["cached_calls"]
+            entry["avg_ms"] = entry.pop("total_ms") / made if made else 0.0
+        return {
+            "escalation_model": self.escalation_model,
+            "steps": self._steps,
+            "escalated_steps": self._escalated_steps,
+            "failures": dict(self._failures),
+            "by_model": by_model,
+            "by_agent": by_agent,
+        }
+
+    def _count_failure(self, reason: str):
+        self._failures[reason] = self._failures.get(reason, 0) + 1
+
+def is_failed_tool_response(tool_response) -> bool:
+    """Whether a tool response reports a failure: the wrappers' 'Error...'/'Failed...' strings
+    or the executor's output with success false."""
+    if isinstance(tool_response, dict):
+        if tool_response.get("success") is False:
+            return True
+        tool_response = tool_response.get("result", "")
+    return isinstance(tool_response, str) and tool_response.lstrip().startswith(("Error", "Failed"))
@@ -0,0 +1,104 @@
+"""Overlap screenshot capture, encoding and screen comparison with the model calls of a step."""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+from google.genai import types
+from pydantic import BaseModel, Field
+
+from .screenshot import ScreenshotPolicy, encode_screenshot, screen_signature
+
+class PipelineOptions(BaseModel):
+    """How the async controller overlaps frame capture with the rest of a step."""
+    enabled: bool = Field(default=True, description="Capture once a tool call's actions settle and encode off the event loop")
+    encode_workers: int = Field(default=2, description="Threads encoding and comparing captures")
+    max_prefetch_age_ms: int = Field(
+        default=10000, description="A frame captured longer ago than this is taken again at the end of the step")
+
+_pools: Dict[int, ThreadPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+def encode_pool(workers: int) -> ThreadPoolExecutor:
+    """Return the process-wide encoding pool with the given number of threads."""
+    with _pools_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            pool = _pools[workers] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="orbit-encode")
+        return pool
+
+def encode_frame(raw: bytes, policy: ScreenshotPolicy, width: int, height: int,
+                 capture_ms: float = 0.0) -> Tuple[types.Part, Dict[str, Any], Tuple[str, Any]]:
+    """
+    Encode a capture and compute the screen signature ScreenHistory compares frames with.
+
+    Pure CPU work (PIL and NumPy), so it can run in encode_pool() while the event loop
+    carries on.
+
+    Returns:
+        Tuple of the Part, the capture stats (with signature_ms added) and the signature
+    """
+    part, stats = encode_screenshot(raw, policy, width, height, capture_ms=capture_ms)
+    started = time.perf_counter()
+    signature = screen_signature(part.inline_data.data)
+    stats["signature_ms"] = (time.perf_counter() - started) * 1000
+    return part, stats, signature
+
+class PipelineRecorder:
+    """
+    Times loop steps and how long each one waited for its end-of-step frame.
+
+    With pipelining the capture, encoding and comparison mostly happen while the
+    models are still working, so a step only blocks on what is left of them. The
+    serial estimate adds that work back in full. Prefetched frames that were thrown away
+    because another action followed, or because they got too old, are counted too.
+    """
+
+    def __init__(self, maxlen: int = 500):
+        self.history = deque(maxlen=maxlen)
+        self._step_started: Optional[float] = None
+        self._discarded = 0
+
+    def start_step(self):
+        self._step_started = time.perf_counter()
+
+    def finish_step(self, blocked_ms: float, stats: Optional[Dict[str, Any]]):
+        """Record a step that waited blocked_ms for a frame whose capture stats are given."""
+        if self._step_started is None:
+            return
+        stats = stats or {}
+        self.history.append({
+            "step_ms": (time.perf_counter() - self._step_started) * 1000,
+            "blocked_ms": blocked_ms,
+            "stage_ms": stats.get("capture_ms", 0.0) + stats.get("encode_ms", 0.0) + stats.get("signature_ms", 0.0),
+            "prefetched": bool(stats.get("prefetched")),
+        })
+        self._step_started = None
+
+    def discard_prefetch(self):
+        """Count a prefetched frame that was cancelled or found stale instead of being used."""
+        self._discarded += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return measured and estimated serial step times and how often the frame was ready early or wasted."""
+        steps = list(self.history)
+        if not steps:
+            return {"steps": 0, "prefetched": 0, "discarded_prefetches": self._discarded, "avg_step_ms": 0.0,
+                    "avg_blocked_ms": 0.0, "avg_stage_ms": 0.0, "avg_serial_step_ms": 0.0, "avg_saved_ms": 0.0}
+        count = len(steps)
+        avg_step = sum(s["step_ms"] for s in steps) / count
+        avg_blocked = sum(s["blocked_ms"] for s in steps) / count
+        avg_stage = sum(s["stage_ms"] for s in steps) / count
+        saved = max(avg_stage - avg_blocked, 0.0)
+        return {
+            "steps": count,
+            "prefetched": sum(1 for s in steps if s["prefetched"]),
+            "discarded_prefetches": self._discarded,
+            "avg_step_ms": avg_step,
+            "avg_blocked_ms": avg_blocked,
+            "avg_stage_ms": avg_stage,
+            "avg_serial_step_ms": avg_step + saved,
+            "avg_saved_ms": saved,
+        }
@@ -0,0 +1,550 @@
+"""Pools of warm Chromium browsers handing out an isolated context per task."""
+
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Dict, List, Literal, Optional, Union
+
+from playwright.async_api import async_playwright
+from playwright.sync_api import sync_playwright, Browser, Playwright
+
+from .async_browser import AsyncBrowserController
+from .blocking import BlockingOptions
+from .browser import BrowserController
+from .http_cache import HarOptions, HttpResponseCache
+from .text_entry import TypingOptions
+from .identity import IdentityStore
+from .launch import LaunchProfile, get_launch_profile
+from .pipeline import PipelineOptions
+from .screenshot import ScreenshotPolicy
+from .settle import SettleOptions
+from .logging_config import get_logger
+
+logger = get_logger("browser.pool")
+
+# What acquire() does when every warm browser already has max_contexts_per_browser open
+# ("wait" is only available on the AsyncBrowserPool)
+OverflowPolicy = Literal["wait", "share", "launch", "error"]
+
+class _PooledBrowser:
+    """Bookkeeping for one launched browser."""
+
+    def __init__(self, browser: Browser):
+        self.browser = browser
+        self.uses = 0
+        self.active = 0
+        self.launched_at = time.time()
+
+    def is_healthy(self) -> bool:
+        try:
+            return self.browser.is_connected()
+        except Exception:
+            return False
+
+class _PoolBase:
+    """Settings, bookkeeping and browser choice shared by BrowserPool and AsyncBrowserPool."""
+
+    POLICIES = ("share", "launch", "error")
+
+    def __init__(self, size: int, max_uses_per_browser: int, max_contexts_per_browser: int,
+                 viewport_width: int, viewport_height: int, launch_profile: Union[str, LaunchProfile],
+                 overflow: OverflowPolicy, max_overflow: int):
+        if overflow not in self.POLICIES:
+            expected = ", ".join(f"'{policy}'" for policy in self.POLICIES)
+            raise ValueError(f"Unknown overflow policy '{overflow}' for {type(self).__name__}, expected {expected}")
+        self.size = size
+        self.max_uses_per_browser = max_uses_per_browser
+        self.max_contexts_per_browser = max_contexts_per_browser
+        self.overflow = overflow
+        self.max_overflow = max_overflow
+        self.viewport_width = viewport_width
+        self.viewport_height = viewport_height
+        self.launch_profile = get_launch_profile(launch_profile)
+
+        self._browsers: List[_PooledBrowser] = []
+        self._leases: Dict[int, _PooledBrowser] = {}
+
+        self._acquires = 0
+        self._hits = 0
+        self._launches = 0
+        self._recycled = 0
+        self._unhealthy = 0
+        self._overflow_launches = 0
+        self._shared = 0
+        self._total_launch = 0.0
+        self._total_context = 0.0
+
+    def _base_metrics(self) -> Dict[str, Any]:
+        return {
+            "browsers": len(self._browsers),
+            "active_contexts": sum(pooled.active for pooled in self._browsers),
+            "acquires": self._acquires,
+            "hits": self._hits,
+            "hit_rate": self._hits / self._acquires if self._acquires else 0.0,
+            "avg_context_ms": 1000 * self._total_context / self._acquires if self._acquires else 0.0,
+            "overflow": self.overflow,
+            "overflow_launches": self._overflow_launches,
+            "shared": self._shared,
+            "launches": self._launches,
+            "avg_launch_ms": 1000 * self._total_launch / self._launches if self._launches else 0.0,
+            "recycled": self._recycled,
+            "unhealthy_replaced": self._unhealthy,
+        }
+
+    def _retire_unhealthy(self) -> List[_PooledBrowser]:
+        """Take idle disconnected browsers out of the pool; the caller closes and replaces them."""
+        dead = [pooled for pooled in self._browsers if pooled.active == 0 and not pooled.is_healthy()]
+        for pooled in dead:
+            self._browsers.remove(pooled)
+            self._unhealthy += 1
+        return dead
+
+    def _choose(self) -> Union[_PooledBrowser, str]:
+        """
+        Pick the browser the next context opens on, or return "launch" when a browser has to
+        be launched for it and "wait" when the caller should wait for a release.
+        """
+        full = []
+        for pooled in self._browsers:
+            if not pooled.is_healthy() or pooled.uses >= self.max_uses_per_browser:
+                continue
+            if pooled.active < self.max_contexts_per_browser:
+                self._hits += 1
+                return pooled
+            full.append(pooled)
+        if full:
+            # Every usable browser is at capacity: apply the overflow policy
+            if self.overflow == "error":
+                raise RuntimeError(f"All {len(full)} pooled browsers have {self.max_contexts_per_browser} "
+                                   "contexts open (overflow policy 'error')")
+            if self.overflow == "wait":
+                return "wait"
+            if self.overflow == "share" or len(self._browsers) - self.size >= self.max_overflow:
+                self._shared += 1
+                return min(full, key=lambda pooled: pooled.active)
+            self._overflow_launches += 1
+        # No usable browser left (all worn out or disconnected) or an overflow launch
+        return "launch"
+
+    def _lease(self, pooled: _PooledBrowser, controller, context_s: float):
+        self._leases[id(controller)] = pooled
+        self._acquires += 1
+        self._total_context += context_s
+
+    def _after_release(self, pooled: _PooledBrowser) -> Optional[str]:
+        """Return "close" for an idle overflow browser and "recycle" for an idle worn-out one."""
+        pooled.active -= 1
+        if pooled.active == 0 and len(self._browsers) > self.size:
+            # Overflow browser launched under load: let it go
+            self._browsers.remove(pooled)
+            return "close"
+        if pooled.active == 0 and (pooled.uses >= self.max_uses_per_browser or not pooled.is_healthy()):
+            self._browsers.remove(pooled)
+            self._recycled += 1
+            return "recycle"
+        return None
+
+class BrowserPool(_PoolBase):
+    """
+    Keeps ``size`` Chromium browsers launched and gives every task a fresh
+    BrowserContext/Page on one of them.
+
+    Playwright's sync API is bound to the thread that started it, so a pool must be
+    created, used and closed from a single thread. For the same reason acquire() can
+    never block until another task releases a browser; when every warm browser is at
+    max_contexts_per_browser the overflow policy decides:
+
+    - "share": open the context on the least busy warm browser anyway (no launch)
+    - "launch": launch a temporary browser, up to max_overflow of them, closed again
+      once its last context is released; beyond max_overflow contexts are shared
+    - "error": raise RuntimeError
+
+    Concurrent asyncio runs use AsyncBrowserPool instead, which can also wait.
+    """
+
+    def __init__(self, size: int = 2, max_uses_per_browser: int = 50, max_contexts_per_browser: int = 4,
+                 viewport_width: int = 1024, viewport_height: int = 768,
+                 launch_profile: Union[str, LaunchProfile] = None, overflow: OverflowPolicy = "share",
+                 max_overflow: int = 2):
+        """
+        Args:
+            size: Number of browsers kept warm
+            max_uses_per_browser: Contexts handed out by a browser before it is recycled
+            max_contexts_per_browser: Contexts allowed open on one browser at the same time
+            viewport_width: Viewport width of the pages handed out
+            viewport_height: Viewport height of the pages handed out
+            launch_profile: Name of a LAUNCH_PROFILES entry or a LaunchProfile the browsers are
+                launched with (defaults to "default")
+            overflow: What to do when every warm browser is at capacity: "share", "launch" or "error"
+            max_overflow: Most temporary browsers the "launch" policy keeps open at once
+        """
+        super().__init__(size, max_uses_per_browser, max_contexts_per_browser, viewport_width, viewport_height,
+                         launch_profile, overflow, max_overflow)
+        self.playwright: Playwright = None
+        self._lock = threading.Lock()
+
+    # --- Lifecycle ---
+
+    def start(self):
+        """Start Playwright and launch the warm browsers."""
+        if self.playwright is not None:
+            return
+        self.playwright = sync_playwright().start()
+        for _ in range(self.size):
+            self._browsers.append(self._launch())
+        logger.info("Browser pool started with %d warm browsers.", self.size)
+
+    def close(self):
+        """Close every browser and stop Playwright."""
+        logger.info("Closing browser pool...")
+        with self._lock:
+            for pooled in self._browsers:
+                self._close_browser(pooled)
+            self._browsers = []
+            self._leases = {}
+        if self.playwright is not None:
+            self.playwright.stop()
+            self.playwright = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # --- Leasing ---
+
+    def acquire(self, screenshot_policy: ScreenshotPolicy = None, settle_options: SettleOptions = None,
+                blocking: BlockingOptions = None, http_cache: HttpResponseCache = None,
+                har: HarOptions = None, typing_options: TypingOptions = None,
+                storage_state: Dict[str, Any] = None, identity_store: IdentityStore = None,
+                identity: str = None) -> BrowserController:
+        """
+        Hand out a BrowserController on a fresh context of a warm browser.
+
+        Args:
+            screenshot_policy: How the controller encodes screenshots
+            settle_options: How the controller waits for the page after actions
+            blocking: Optional request blocking for this task's context
+            http_cache: Optional persistent response cache for this task's context
+            har: Optional HAR recording or replay for this task's context
+            typing_options: How the controller enters text
+            storage_state: Optional cookies and local storage to start the context with
+            identity_store: Optional encrypted store of storage states by identity
+            identity: Identity whose stored state the context starts with and is saved back
+                to when the controller is released
+
+        Returns:
+            BrowserController: A controller whose close() only closes its context.
+                Give it back with release().
+        """
+        self.start()
+        with self._lock:
+            for pooled in self._retire_unhealthy():
+                self._close_browser(pooled)
+            self._refill()
+            pooled = self._choose()
+            if pooled == "launch":
+                pooled = self._launch()
+                self._browsers.append(pooled)
+            pooled.uses += 1
+            pooled.active += 1
+        context_started = time.perf_counter()
+        try:
+            controller = BrowserController(
+                viewport_width=self.viewport_width,
+                viewport_height=self.viewport_height,
+                browser=pooled.browser,
+                screenshot_policy=screenshot_policy,
+                settle_options=settle_options,
+                launch_profile=self.launch_profile,
+                blocking=blocking,
+                http_cache=http_cache,
+                har=har,
+                typing_options=typing_options,
+                storage_state=storage_state,
+                identity_store=identity_store,
+                identity=identity
+            )
+        except Exception:
+            with self._lock:
+                pooled.active -= 1
+            raise
+        with self._lock:
+            self._lease(pooled, controller, time.perf_counter() - context_started)
+        return controller
+
+    def release(self, controller: BrowserController):
+        """Close the controller's context and recycle its browser if it is worn out."""
+        with self._lock:
+            pooled = self._leases.pop(id(controller), None)
+        controller.close()
+        if pooled is None:
+            return
+        with self._lock:
+            outcome = self._after_release(pooled)
+            if outcome is not None:
+                self._close_browser(pooled)
+            if outcome == "recycle":
+                self._refill()
+
+    @contextmanager
+    def lease(self):
+        """Context manager wrapping acquire()/release()."""
+        controller = self.acquire()
+        try:
+            yield controller
+        finally:
+            self.release(controller)
+
+    # --- Health and metrics ---
+
+    def health_check(self) -> int:
+        """
+        Replace idle browsers that are disconnected.
+
+        Returns:
+            int: Number of browsers replaced
+        """
+        with self._lock:
+            dead = self._retire_unhealthy()
+            for pooled in dead:
+                self._close_browser(pooled)
+            self._refill()
+        if dead:
+            logger.warning("Replaced %d unhealthy browsers.", len(dead))
+        return len(dead)
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Return acquire counts, warm hit rate, context creation and launch times, overflow
+        handling and browser churn. acquire() never waits, so there is no wait time.
+        """
+        with self._lock:
+            return self._base_metrics()
+
+    # --- Internals (call with self._lock held) ---
+
+    def _refill(self):
+        while len(self._browsers) < self.size:
+            self._browsers.append(self._launch())
+
+    def _launch(self) -> _PooledBrowser:
+        started = time.perf_counter()
+        browser = self.playwright.chromium.launch(**self.launch_profile.launch_options())
+        self._launches += 1
+        self._total_launch += time.perf_counter() - started
+        return _PooledBrowser(browser)
+
+    def _close_browser(self, pooled: _PooledBrowser):
+        try:
+            pooled.browser.close()
+        except Exception as e:
+            logger.error("Error closing pooled browser: %s", e)
+
+class AsyncBrowserPool(_PoolBase):
+    """
+    asyncio counterpart of BrowserPool for concurrent runs on one event loop
+    (run_browser_agents_async): ``size`` warm browsers, each task an
+    AsyncBrowserController on a fresh context of one of them.
+
+    Tasks run concurrently, so acquire() can wait for another task to release a
+    context. When every warm browser is at max_contexts_per_browser the overflow
+    policy decides:
+
+    - "wait": wait until a context is released (the default); the time spent waiting
+      is reported as avg_wait_ms / max_wait_ms
+    - "share", "launch", "error": as in BrowserPool
+
+    The pool belongs to the event loop it was started on.
+    """
+
+    POLICIES = ("wait", "share", "launch", "error")
+
+    def __init__(self, size: int = 2, max_uses_per_browser: int = 50, max_contexts_per_browser: int = 4,
+                 viewport_width: int = 1024, viewport_height: int = 768,
+                 launch_profile: Union[str, LaunchProfile] = None, overflow: OverflowPolicy = "wait",
+                 max_overflow: int = 2):
+        """
+        Args:
+            size: Number of browsers kept warm
+            max_uses_per_browser: Contexts handed out by a browser before it is recycled
+            max_contexts_per_browser: Contexts allowed open on one browser at the same time
+            viewport_width: Viewport width of the pages handed out
+            viewport_height: Viewport height of the pages handed out
+            launch_profile: Name of a LAUNCH_PROFILES entry or a LaunchProfile the browsers are
+                launched with (defaults to "default")
+            overflow: What to do when every warm browser is at capacity: "wait", "share",
+                "launch" or "error"
+            max_overflow: Most temporary browsers the "launch" policy keeps open at once
+        """
+        super().__init__(size, max_uses_per_browser, max_contexts_per_browser, viewport_width, viewport_height,
+                         launch_profile, overflow, max_overflow)
+        self.playwright = None
+        self._condition = asyncio.Condition()
+        self._waits = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    # --- Lifecycle ---
+
+    async def start(self):
+        """Start Playwright and launch the warm browsers."""
+        if self.playwright is not None:
+            return
+        self.playwright = await async_playwright().start()
+        async with self._condition:
+            await self._refill()
+        logger.info("Async browser pool started with %d warm browsers.", self.size)
+
+    async def close(self):
+        """Close every browser and stop Playwright."""
+        logger.info("Closing async browser pool...")
+        async with self._condition:
+            for pooled in self._browsers:
+                await self._close_browser(pooled)
+            self._browsers = []
+            self._leases = {}
+        if self.playwright is not None:
+            await self.playwright.stop()
+            self.playwright = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    # --- Leasing ---
+
+    async def acquire(self, screenshot_policy: ScreenshotPolicy = None, settle_options: SettleOptions = None,
+                      blocking: BlockingOptions = None, http_cache: HttpResponseCache = None,
+                      har: HarOptions = None, typing_options: TypingOptions = None,
+                      pipeline_options: PipelineOptions = None, storage_state: Dict[str, Any] = None,
+                      identity_store: IdentityStore = None, identity: str = None) -> AsyncBrowserController:
+        """
+        Hand out an AsyncBrowserController on a fresh context of a warm browser, waiting
+        for a release first when the pool is full and the overflow policy is "wait".
+
+        Args:
+            screenshot_policy: How the controller encodes screenshots
+            settle_options: How the controller waits for the page after actions
+            blocking: Optional request blocking for this task's context
+            http_cache: Optional persistent response cache for this task's context
+            har: Optional HAR recording or replay for this task's context
+            typing_options: How the controller enters text
+            pipeline_options: Whether end-of-step frames are captured early and encoded off the event loop
+            storage_state: Optional cookies and local storage to start the context with
+            identity_store: Optional encrypted store of storage states by identity
+            identity: Identity whose stored state the context starts with and is saved back
+                to when the controller is released
+
+        Returns:
+            AsyncBrowserController: A controller whose close() only closes its context.
+                Give it back with release().
+        """
+        await self.start()
+        async with self._condition:
+            waited = 0.0
+            while True:
+                for pooled in self._retire_unhealthy():
+                    await self._close_browser(pooled)
+                await self._refill()
+                pooled = self._choose()
+                if pooled != "wait":
+                    break
+                # Only the time spent waiting for a release counts as waiting
+                wait_started = time.perf_counter()
+                await self._condition.wait()
+                waited += time.perf_counter() - wait_started
+            if waited:
+                self._waits += 1
+                self._total_wait += waited
+                self._max_wait = max(self._max_wait, waited)
+            if pooled == "launch":
+                pooled = await self._launch()
+                self._browsers.append(pooled)
+            pooled.uses += 1
+            pooled.active += 1
+        context_started = time.perf_counter()
+        try:
+            controller = await AsyncBrowserController.create(
+                viewport_width=self.viewport_width,
+                viewport_height=self.viewport_height,
+                browser=pooled.browser,
+                screenshot_policy=screenshot_policy,
+                settle_options=settle_options,
+                launch_profile=self.launch_profile,
+                blocking=blocking,
+                http_cache=http_cache,
+                har=har,
+                typing_options=typing_options,
+                pipeline_options=pipeline_options,
+                storage_state=storage_state,
+                identity_store=identity_store,
+                identity=identity
+            )
+        except Exception:
+            async with self._condition:
+                pooled.active -= 1
+                self._condition.notify()
+            raise
+        self._lease(pooled, controller, time.perf_counter() - context_started)
+        return controller
+
+    async def release(self, controller: AsyncBrowserController):
+        """Close the controller's context, recycle its browser if it is worn out and wake a waiting acquire()."""
+        pooled = self._leases.pop(id(controller), None)
+        await controller.close()
+        if pooled is None:
+            return
+        async with self._condition:
+            outcome = self._after_release(pooled)
+            if outcome is not None:
+                await self._close_browser(pooled)
+            if outcome == "recycle":
+                await self._refill()
+            self._condition.notify()
+
+    @asynccontextmanager
+    async def lease(self):
+        """Async context manager wrapping acquire()/release()."""
+        controller = await self.acquire()
+        try:
+            yield controller
+        finally:
+            await self.release(controller)
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Return acquire counts, warm hit rate, how many acquires waited for a release and for
+        how long, context creation and launch times, overflow handling and browser churn.
+        """
+        return {
+            **self._base_metrics(),
+            "waits": self._waits,
+            "avg_wait_ms": 1000 * self._total_wait / self._acquires if self._acquires else 0.0,
+            "max_wait_ms": 1000 * self._max_wait,
+        }
+
+    # --- Internals (call with self._condition held) ---
+
+    async def _refill(self):
+        while len(self._browsers) < self.size:
+            self._browsers.append(await self._launch())
+
+    async def _launch(self) -> _PooledBrowser:
+        started = time.perf_counter()
+        browser = await self.playwright.chromium.launch(**self.launch_profile.launch_options())
+        self._launches += 1
+        self._total_launch += time.perf_counter() - started
+        return _PooledBrowser(browser)
+
+    async def _close_browser(self, pooled: _PooledBrowser):
+        try:
+            await pooled.browser.close()
+        except Exception as e:
+            logger.error("Error closing pooled browser: %s", e)
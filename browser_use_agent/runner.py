@@ -1,8 +1,12 @@
 """Initializes and runs the Browser Loop Agent with proper state management."""
 
-import os
-import traceback
-from typing import List, Optional, Dict, Any
+import asyncio
+import logging
+import queue
+import threading
+import uuid
+from collections import deque
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple, Union
 from google.genai import types
 from google.adk.runners import Runner
 from google.adk.sessions.in_memory_session_service import InMemorySessionService
@@ -11,167 +15,794 @@ from google.adk.events.event import Event
 # Import our agents and browser controller
 from .agent import browser_loop_agent
 from .browser import BrowserController
-# Import the global browser controller reference
-from .globals import BROWSER_CONTROLLER
-from .globals import check_browser_controller
+from .async_browser import AsyncBrowserController
+from .pool import AsyncBrowserPool, BrowserPool
+from .screenshot import ScreenshotPolicy
+from .settle import SettleOptions
+from .launch import LaunchProfile
+from .blocking import BlockingOptions
+from .http_cache import HarOptions, HttpResponseCache
+from .text_entry import TypingOptions
+from .pipeline import PipelineOptions
+from .checkpoint import Checkpoint, CheckpointStore, SessionCheckpointer, resume_note
+from .identity import IdentityStore
+from .human_input import HumanInputBroker
+from .model_routing import ModelRouter
+# Per-session browser controller registry
+from .globals import SESSION_ID_STATE_KEY, register_browser_controller, register_session_resource, unregister_session
+from .history import ScreenHistory
+from .llm_cache import LlmResponseCache
+from .tracing import NULL_TRACER, Tracer
+from .events import TERMINAL_EVENTS, EventStream, ProgressEvent, finished_event
+from .logging_config import get_logger
+from .trajectory import (Trajectory, TrajectoryCache, TrajectoryRecorder, fingerprints_match,
+                         replay_trajectory, replay_trajectory_sync)
+
+logger = get_logger("runner")
+
+APP_NAME = "BrowserAutomationAgent"
+
+def _build_initial_state(session_id: str, user_goal: str, max_iterations: int,
+                         additional_state: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Build the session state shared by the sync and async entry points."""
+    # DON'T store browser_controller directly - tools resolve it from the session id
+    initial_state = {
+        "has_browser_instance": True,
+        SESSION_ID_STATE_KEY: session_id,
+        "user_goal": user_goal,
+        "iteration_count": 0,
+        "max_iterations": max_iterations,
+        "task_completed": False,
+        "task_failed": False,
+        "exit_loop": False,
+    }
+    
+    # Add any additional state provided
+    if additional_state:
+        initial_state.update(additional_state)
+    return initial_state
+
+def _build_initial_message(user_goal: str, initial_screenshot_part: types.Part, replayed_steps: int = 0,
+                           resume_from: Optional[Checkpoint] = None) -> types.Content:
+    """Create initial message with user goal and screenshot."""
+    text = f"Goal: {user_goal}\n\nI am showing you a screenshot of the current web page. Please analyze this screenshot carefully to understand the page layout and available interactive elements before taking any action."
+    if replayed_steps:
+        text += f"\n\nNote: the first {replayed_steps} steps of a previous successful run of this goal were replayed automatically; continue from the current page."
+    if resume_from is not None:
+        text += "\n\n" + resume_note(resume_from)
+    return types.Content(
+        role='user',
+        parts=[
+            types.Part(text=text),
+            initial_screenshot_part  # Use the Part object directly
+        ]
+    )
+
+def _start_checkpointer(checkpoint_store: Optional[CheckpointStore], session_id: str, user_goal: str,
+                        initial_url: str, resume_from: Optional[Checkpoint]) -> Optional[SessionCheckpointer]:
+    """Register the run's checkpointer, continuing the action history of a resumed run."""
+    if checkpoint_store is None:
+        return None
+    checkpointer = SessionCheckpointer(checkpoint_store, session_id, user_goal, initial_url,
+                                       actions=resume_from.actions if resume_from is not None else None)
+    register_session_resource(session_id, "checkpointer", checkpointer)
+    return checkpointer
+
+def _resumed_state(resume_from: Optional[Checkpoint], additional_state: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Merge the checkpointed loop state (iteration count, task flags) under the caller's additional state."""
+    if resume_from is None:
+        return additional_state
+    # max_iterations comes from the run's own argument so a resumed run can be given more
+    state = {key: value for key, value in resume_from.state.items() if key != "max_iterations"}
+    return {**state, **(additional_state or {})}
+
+def _apply_replayed_result(result: Dict[str, Any], trajectory: Trajectory):
+    """Fill the result of a run that was completed entirely from a cached trajectory."""
+    _apply_final_state(result, {
+        "task_completed": True,
+        "task_result": trajectory.task_result,
+        "task_completion_reason": f"Replayed {len(trajectory.steps)} cached steps. {trajectory.task_completion_reason}",
+    })
+    result["replayed"] = True
+
+def _build_trajectory(user_goal: str, initial_url: str, recorder: TrajectoryRecorder,
+                      final_state: Dict[str, Any], final_fingerprint: Dict[str, Any]) -> Trajectory:
+    return Trajectory(
+        goal=user_goal,
+        url=initial_url,
+        steps=recorder.steps,
+        final_fingerprint=final_fingerprint,
+        task_result=str(final_state.get('task_result', '')),
+        task_completion_reason=str(final_state.get('task_completion_reason', '')),
+    )
+
+def _new_event_buffer(max_events: Optional[int]):
+    """List (unbounded), bounded deque, or None when no ADK events are kept."""
+    if max_events is None:
+        return []
+    if max_events <= 0:
+        return None
+    return deque(maxlen=max_events)
+
+def _log_event(event: Event):
+    if event.content and event.content.parts and logger.isEnabledFor(logging.DEBUG):
+        for part in event.content.parts:
+            logger.debug("[EVENT][%s]: %s", event.author, part.text)
+
+def _report_trace(result: Dict[str, Any], tracer: Tracer, trace_path: Optional[str]):
+    """Log the span summary table, return it in the metrics and export the spans."""
+    logger.info("Trace summary:\n%s", tracer.format_summary())
+    result["metrics"]["trace"] = tracer.summary()
+    if trace_path:
+        tracer.export_jsonl(trace_path)
+        logger.info("Trace spans written to %s", trace_path)
+
+def _apply_final_state(result: Dict[str, Any], final_state: Dict[str, Any]):
+    """Fill success and final_result from the final session state."""
+    task_completed = final_state.get('task_completed', False)
+    task_failed = final_state.get('task_failed', False)
+    max_iterations_reached = final_state.get('max_iterations_reached', False)
+    
+    result["success"] = task_completed and not task_failed
+    
+    final_result = "Browser automation completed.\n\n"
+    
+    if task_completed:
+        final_result += "✅ Task successfully completed.\n\n"
+        final_result += f"Result: {final_state.get('task_result', 'No detailed result provided.')}\n"
+        final_result += f"Reason: {final_state.get('task_completion_reason', 'No reason provided.')}\n\n"
+    elif task_failed:
+        final_result += "❌ Task failed to complete.\n\n"
+        final_result += f"Reason: {final_state.get('task_failure_reason', 'No reason provided.')}\n"
+        final_result += f"Details: {final_state.get('task_failure_details', 'No details provided.')}\n\n"
+    elif max_iterations_reached:
+        final_result += "⚠️ Maximum iterations reached without completion.\n\n"
+    
+    result["final_result"] = final_result
+
+def _new_result(session_id: str, error: Optional[str] = None) -> Dict[str, Any]:
+    """The result dict of a run, filled in as it goes."""
+    return {
+        "success": False,
+        "final_result": error or "",
+        "events": [],
+        "metrics": {},
+        "replayed": False,
+        "session_id": session_id,
+        "error": error
+    }
+
+def _register_resources(session_id: str, browser_controller, llm_cache: Optional[LlmResponseCache],
+                        tracer: Optional[Tracer], event_stream: Optional[EventStream],
+                        human_input: Optional[HumanInputBroker], model_router: Optional[ModelRouter]) -> ModelRouter:
+    """Register the run's controller and optional resources under its session id; returns its ModelRouter."""
+    register_browser_controller(session_id, browser_controller)  # Tools resolve it by session id
+    if llm_cache is not None:
+        register_session_resource(session_id, "llm_cache", llm_cache)
+    if tracer is not None:
+        register_session_resource(session_id, "tracer", tracer)
+        browser_controller.tracer = tracer
+    if event_stream is not None:
+        register_session_resource(session_id, "event_stream", event_stream)
+    if human_input is not None:
+        register_session_resource(session_id, "human_input", human_input)
+    model_router = model_router or ModelRouter()
+    register_session_resource(session_id, "model_router", model_router)
+    return model_router
+
+def _start_replay(session_id: str, trajectory_cache: Optional[TrajectoryCache], user_goal: str, initial_url: str,
+                  resume_from: Optional[Checkpoint]) -> Tuple[Optional[TrajectoryRecorder], Optional[Trajectory]]:
+    """Register the run's trajectory recorder and return it with the cached trajectory to replay, if any."""
+    if trajectory_cache is None or resume_from is not None:
+        return None, None
+    recorder = TrajectoryRecorder()
+    register_session_resource(session_id, "trajectory_recorder", recorder)
+    trajectory = trajectory_cache.get(user_goal, initial_url)
+    if trajectory is not None:
+        logger.info("Replaying cached trajectory with %s steps", len(trajectory.steps))
+    return recorder, trajectory
+
+def _replay_finished(result: Dict[str, Any], trajectory_cache: TrajectoryCache, trajectory: Trajectory,
+                     replayed_steps: int, fingerprint: Dict[str, Any]) -> bool:
+    """Record the replay; True (with the result filled in) when it completed the task on its own."""
+    completed = (replayed_steps == len(trajectory.steps)
+                 and fingerprints_match(trajectory.final_fingerprint, fingerprint))
+    trajectory_cache.record_replay(replayed_steps, completed)
+    if not completed:
+        return False
+    logger.info("Cached trajectory replayed to completion")
+    _apply_replayed_result(result, trajectory)
+    result["metrics"]["trajectory_cache"] = trajectory_cache.stats()
+    return True
+
+def _start_session(session_id: str, user_goal: str, max_iterations: int, additional_state: Optional[Dict[str, Any]],
+                   resume_from: Optional[Checkpoint], initial_screenshot_part: types.Part, replayed_steps: int,
+                   max_inline_screenshots: int,
+                   screenshot_blob_dir: Optional[str]) -> Tuple[InMemorySessionService, Runner, types.Content, ScreenHistory]:
+    """Create the screen history, ADK session and runner of a run and its first message."""
+    screen_history = ScreenHistory(max_inline=max_inline_screenshots, blob_dir=screenshot_blob_dir)
+    screen_history.seed(initial_screenshot_part.inline_data)
+    register_session_resource(session_id, "screen_history", screen_history)
+    
+    initial_state = _build_initial_state(session_id, user_goal, max_iterations,
+                                         _resumed_state(resume_from, additional_state))
+    session_service = InMemorySessionService()
+    session_service.create_session_sync(
+        app_name=APP_NAME,
+        user_id="user",
+        state=initial_state,
+        session_id=session_id
+    )
+    runner = Runner(
+        app_name=APP_NAME, 
+        agent=browser_loop_agent,
+        session_service=session_service
+    )
+    initial_message = _build_initial_message(user_goal, initial_screenshot_part, replayed_steps, resume_from)
+    return session_service, runner, initial_message, screen_history
+
+def _final_state(session_service: InMemorySessionService, session_id: str) -> Dict[str, Any]:
+    """Session state after the agent loop finished."""
+    final_session = session_service.get_session_sync(
+        app_name=APP_NAME,
+        user_id="user",
+        session_id=session_id
+    )
+    return final_session.state
+
+def _wants_trajectory(result: Dict[str, Any], trajectory_cache: Optional[TrajectoryCache],
+                      recorder: Optional[TrajectoryRecorder]) -> bool:
+    """Whether the run's trajectory is to be cached: it succeeded and typed no secrets."""
+    if trajectory_cache is None or recorder is None or not result["success"]:
+        return False
+    if recorder.sensitive_reason is not None:
+        trajectory_cache.record_sensitive(recorder)
+        return False
+    return True
+
+def _collect_metrics(result: Dict[str, Any], session_id: str, browser_controller, screen_history: ScreenHistory,
+                     model_router: ModelRouter, blocking: Optional[BlockingOptions],
+                     http_cache: Optional[HttpResponseCache], human_input: Optional[HumanInputBroker],
+                     llm_cache: Optional[LlmResponseCache], checkpoint_store: Optional[CheckpointStore],
+                     trajectory_cache: Optional[TrajectoryCache], tracer: Optional[Tracer], trace_path: Optional[str]):
+    """Fill result['metrics'] of a run that went through the agent loop."""
+    metrics = result["metrics"]
+    metrics["screen_history"] = screen_history.metrics()
+    metrics["settle"] = browser_controller.settle_metrics()
+    metrics["typing"] = browser_controller.typing_metrics()
+    metrics["pipeline"] = browser_controller.pipeline_metrics()
+    metrics["tabs"] = browser_controller.tabs_metrics()
+    metrics["models"] = model_router.metrics()
+    if blocking is not None:
+        metrics["blocking"] = browser_controller.blocking_metrics()
+    if http_cache is not None:
+        metrics["http_cache"] = http_cache.stats()
+    if human_input is not None:
+        metrics["human_input"] = human_input.metrics()
+    if llm_cache is not None:
+        metrics["llm_cache"] = llm_cache.run_stats(session_id, clear=True)
+    if checkpoint_store is not None:
+        metrics["checkpoint"] = checkpoint_store.stats()
+    if trajectory_cache is not None:
+        metrics["trajectory_cache"] = trajectory_cache.stats()
+    if tracer is not None:
+        _report_trace(result, tracer, trace_path)
+
+def _fail(result: Dict[str, Any], stage: str, error: Exception):
+    """Record an exception raised during setup ("setup") or the agent loop ("run") in the result."""
+    if stage == "setup":
+        logger.exception("Error initializing browser or setup: %s", error)
+        result["error"] = f"Setup error: {str(error)}"
+        result["final_result"] = f"Browser automation failed during setup: {str(error)}"
+    else:
+        logger.exception("Error during agent execution: %s", error)
+        result["error"] = f"Agent execution error: {str(error)}"
+        result["final_result"] = f"Browser automation failed with error: {str(error)}"
+
+def _end_run(result: Dict[str, Any], session_id: str, identity_store: Optional[IdentityStore],
+             event_stream: Optional[EventStream]):
+    """Teardown after the controller is closed: identity stats, the finished event and the session's resources."""
+    if identity_store is not None:
+        # Taken after close(), which saves the identity's state
+        result["metrics"]["identity"] = identity_store.stats()
+    if event_stream is not None:
+        event_stream.emit(finished_event(session_id, result))
+    unregister_session(session_id)
 
 def run_browser_agent(
     user_goal: str,
     initial_url: str,
     api_key: Optional[str] = None,
     max_iterations: int = 10,
-    additional_state: Optional[Dict[str, Any]] = None
+    additional_state: Optional[Dict[str, Any]] = None,
+    pool: Optional[BrowserPool] = None,
+    screenshot_policy: Optional[ScreenshotPolicy] = None,
+    max_inline_screenshots: int = 3,
+    screenshot_blob_dir: Optional[str] = None,
+    settle_options: Optional[SettleOptions] = None,
+    typing_options: Optional[TypingOptions] = None,
+    trajectory_cache: Optional[TrajectoryCache] = None,
+    llm_cache: Optional[LlmResponseCache] = None,
+    tracer: Optional[Tracer] = None,
+    trace_path: Optional[str] = None,
+    launch_profile: Union[str, LaunchProfile, None] = None,
+    blocking: Optional[BlockingOptions] = None,
+    http_cache: Optional[HttpResponseCache] = None,
+    har: Optional[HarOptions] = None,
+    event_stream: Optional[EventStream] = None,
+    max_events: Optional[int] = None,
+    checkpoint_store: Optional[CheckpointStore] = None,
+    resume_from: Optional[Checkpoint] = None,
+    identity_store: Optional[IdentityStore] = None,
+    identity: Optional[str] = None,
+    human_input: Optional[HumanInputBroker] = None,
+    model_router: Optional[ModelRouter] = None
 ) -> Dict[str, Any]:
     """
     Initializes and runs the browser agent with state management.
     
+    The options are documented here once; run_browser_agent_async, the resume and stream
+    entry points and run_browser_agents_async take the same ones.
+    
     Args:
         user_goal: The user's intended goal for browser automation
         initial_url: The starting URL to navigate to
         api_key: Google API key (optional, ADK will use environment variable by default)
         max_iterations: Maximum iteration limit for the loop agent
         additional_state: Any additional state values to initialize the session with
+        pool: Optional BrowserPool to lease a warm browser from instead of launching one
+        screenshot_policy: How screenshots are encoded for the model (defaults to LOW_RES_POLICY:
+            a 512x384 JPEG frame, full-resolution crops through the zoom tool)
+        max_inline_screenshots: Number of most recent screens kept inline in the coordinator prompt
+        screenshot_blob_dir: Optional directory where older screens are written when compacted
+        settle_options: How to wait for the page after actions (defaults to settle detection)
+        typing_options: How text is entered (defaults to 'auto': one insertion, falling back to
+            keystrokes when the field needs key events); per-strategy counts go to metrics['typing']
+        trajectory_cache: Optional cache of successful action traces; a cached trace for the
+            same goal and URL is replayed before the LLM loop takes over (runs that typed
+            secrets are not cached)
+        llm_cache: Optional cache of model responses shared across runs; identical
+            coordinator/executor requests are answered without calling the model
+        tracer: Optional Tracer timing loop iterations, model calls, tool calls and browser
+            methods; its summary table is printed and returned under metrics['trace']
+        trace_path: Optional JSON lines file the tracer's spans are appended to
+        launch_profile: Launch profile name ("default", "headless", "headless-nogpu") or a
+            LaunchProfile; ignored when leasing from a pool, which has its own
+        blocking: Optional BlockingOptions aborting media, tracker and other unwanted
+            requests of this task; counts and estimated savings go to metrics['blocking']
+        http_cache: Optional HttpResponseCache serving repeated GET responses from disk across
+            runs (offline=True replays a recorded site without network); stats go to metrics['http_cache']
+        har: Optional HarOptions recording this run's network into a HAR file or replaying one
+        event_stream: Optional EventStream receiving typed progress events (step started,
+            action executed, screenshot taken, completed/failed) while the run happens
+        max_events: Number of most recent ADK events returned in result['events']
+            (None keeps all, 0 keeps none)
+        checkpoint_store: Optional CheckpointStore the run's progress (iteration count, task
+            flags, redacted actions, page URL and, if the store has a key, encrypted storage state)
+            is saved to after every loop iteration, under result['session_id']; write stats go to
+            metrics['checkpoint']
+        resume_from: Checkpoint to continue from instead of starting over (see resume_browser_agent)
+        identity_store: Optional IdentityStore of encrypted storage states by identity name
+        identity: Identity to run as: the browser context starts with its stored cookies and
+            local storage (skipping logins and consent banners done in earlier runs) and saves
+            them back when the run ends; store stats go to metrics['identity']
+        human_input: Optional HumanInputBroker the agent's questions to the user are queued on;
+            the run waits for an answer (up to the broker's timeout) without blocking other runs.
+            Defaults to asking at the terminal; queue depth and wait times go to metrics['human_input']
+        model_router: ModelRouter for this run (one is created by default), escalating a step to
+            GEMINI_ESCALATION_MODEL after a failed tool call, a malformed function call or an
+            unchanged screen; per-model call counts, latency and tokens go to metrics['models']
         
     Returns:
-        Dict containing final_result (str), success (bool), and events (list)
+        Dict containing final_result (str), success (bool), events (list) and metrics (dict)
     """
-    global BROWSER_CONTROLLER
-    
-    # Initialize browser
     browser_controller = None
-    result = {
-        "success": False,
-        "final_result": "",
-        "events": [],
-        "error": None
-    }
+    session_id = resume_from.session_id if resume_from is not None else uuid.uuid4().hex
+    storage_state = resume_from.storage_state if resume_from is not None else None
+    result = _new_result(session_id)
     
     try:
         # Initialize browser
-        print("[INFO] Initializing browser controller")
-        browser_controller = BrowserController()
-        BROWSER_CONTROLLER = browser_controller  # Store in global variable for tools to access
-        
-        # Call our diagnostic function to check BROWSER_CONTROLLER status in runner.py
-        print("[RUNNER] Checking BROWSER_CONTROLLER after initialization:")
-        check_browser_controller()
+        if pool is not None:
+            logger.info("Leasing browser controller from pool")
+            browser_controller = pool.acquire(screenshot_policy=screenshot_policy, settle_options=settle_options,
+                                              blocking=blocking, http_cache=http_cache, har=har,
+                                              typing_options=typing_options, storage_state=storage_state,
+                                              identity_store=identity_store, identity=identity)
+        else:
+            logger.info("Initializing browser controller")
+            browser_controller = BrowserController(screenshot_policy=screenshot_policy, settle_options=settle_options,
+                                                   launch_profile=launch_profile, blocking=blocking,
+                                                   http_cache=http_cache, har=har,
+                                                   typing_options=typing_options, storage_state=storage_state,
+                                                   identity_store=identity_store, identity=identity)
+        model_router = _register_resources(session_id, browser_controller, llm_cache, tracer, event_stream,
+                                           human_input, model_router)
+        checkpointer = _start_checkpointer(checkpoint_store, session_id, user_goal, initial_url, resume_from)
+        if resume_from is not None:
+            # Carry on from the page the interrupted run had reached
+            initial_url = resume_from.url
+            logger.info("Resuming session %s after %s iterations", session_id, resume_from.iteration_count)
         
-        if BROWSER_CONTROLLER: print("[INFO] Browser controller initialized successfully")
-        else: print("[ERROR] Browser controller initialization failed")
+        logger.info("Browser controller initialized successfully")
         
         # Navigate to initial URL
-        print(f"[INFO] Navigating to initial URL: {initial_url}")
+        logger.info("Navigating to initial URL: %s", initial_url)
         browser_controller.navigate(initial_url)
         
+        # Replay a cached trace of this goal, handing over to the LLM loop where it diverges
+        recorder, trajectory = _start_replay(session_id, trajectory_cache, user_goal, initial_url, resume_from)
+        replayed_steps = 0
+        if trajectory is not None:
+            replayed_steps = replay_trajectory_sync(browser_controller, trajectory, recorder)
+            if _replay_finished(result, trajectory_cache, trajectory, replayed_steps, browser_controller.fingerprint()):
+                return result
+        
         # Take initial screenshot - now using the method directly from browser_controller
         initial_screenshot_part = browser_controller.screenshot()
-        print("[INFO] Captured initial screenshot")
-        
-        # Prepare initial state - DON'T store browser_controller directly
-        initial_state = {
-            "has_browser_instance": True,
-            "user_goal": user_goal,
-            "iteration_count": 0,
-            "max_iterations": max_iterations,
-            "task_completed": False,
-            "task_failed": False,
-            "exit_loop": False,
-            "current_screenshot": initial_screenshot_part.inline_data
-        }
-        
-        # Add any additional state provided
-        if additional_state:
-            initial_state.update(additional_state)
-        
-        # Set up ADK runner and session
-        session_service = InMemorySessionService()
-        session = session_service.create_session(
-            app_name="BrowserAutomationAgent",
-            user_id="user",
-            state=initial_state
-        )
-        
-        # Create initial message with user goal and screenshot
-        initial_message = types.Content(
-            role='user',
-            parts=[
-                types.Part(text=f"Goal: {user_goal}\n\nI am showing you a screenshot of the current web page. Please analyze this screenshot carefully to understand the page layout and available interactive elements before taking any action."),
-                initial_screenshot_part  # Use the Part object directly
-            ]
-        )
-        
-        # Create runner
-        runner = Runner(
-            app_name="BrowserAutomationAgent", 
-            agent=browser_loop_agent,
-            session_service=session_service
-        )
-        
-        # Collect all response events
-        response_events = []
+        logger.info("Captured initial screenshot")
+        
+        session_service, runner, initial_message, screen_history = _start_session(
+            session_id, user_goal, max_iterations, additional_state, resume_from, initial_screenshot_part,
+            replayed_steps, max_inline_screenshots, screenshot_blob_dir)
+        
+        # Collect the response events (bounded by max_events)
+        response_events = _new_event_buffer(max_events)
         try:
             for event in runner.run(
-                user_id=session.user_id,
-                session_id=session.id,
+                user_id="user",
+                session_id=session_id,
                 new_message=initial_message,
             ):
-                # print("EVENT : ", event)
-                response_events.append(event)
-                
-                if event.content and event.content.parts:
-                    for part in event.content.parts:
-                            print(f"[EVENT][{event.author}]: \n       [PART]: {part.text}\n")
+                if response_events is not None:
+                    response_events.append(event)
+                _log_event(event)
             
-            # Retrieve final session state
-            final_session = session_service.get_session(
-                app_name="BrowserAutomationAgent",
-                user_id="user",
-                session_id=session.id
-            )
-            final_state = final_session.state
+            final_state = _final_state(session_service, session_id)
+            _apply_final_state(result, final_state)
+            result["events"] = list(response_events) if response_events is not None else []
+            if checkpointer is not None:
+                checkpointer.finish(result["success"], final_state)
+            if _wants_trajectory(result, trajectory_cache, recorder):
+                trajectory_cache.save(_build_trajectory(
+                    user_goal, initial_url, recorder, final_state, browser_controller.fingerprint()
+                ))
+            _collect_metrics(result, session_id, browser_controller, screen_history, model_router, blocking,
+                             http_cache, human_input, llm_cache, checkpoint_store, trajectory_cache, tracer, trace_path)
             
-            task_completed = final_state.get('task_completed', False)
-            task_failed = final_state.get('task_failed', False)
-            max_iterations_reached = final_state.get('max_iterations_reached', False)
-            
-            result["success"] = task_completed and not task_failed
-            
-            final_result = "Browser automation completed.\n\n"
-            
-            if task_completed:
-                final_result += "✅ Task successfully completed.\n\n"
-                final_result += f"Result: {final_state.get('task_result', 'No detailed result provided.')}\n"
-                final_result += f"Reason: {final_state.get('task_completion_reason', 'No reason provided.')}\n\n"
-            elif task_failed:
-                final_result += "❌ Task failed to complete.\n\n"
-                final_result += f"Reason: {final_state.get('task_failure_reason', 'No reason provided.')}\n"
-                final_result += f"Details: {final_state.get('task_failure_details', 'No details provided.')}\n\n"
-            elif max_iterations_reached:
-                final_result += "⚠️ Maximum iterations reached without completion.\n\n"
+        except Exception as runner_ex:
+            _fail(result, "run", runner_ex)
+        
+        return result
+    
+    except Exception as e:
+        _fail(result, "setup", e)
+        return result
+        
+    finally:
+        if browser_controller is not None:
+            try:
+                if pool is not None:
+                    browser_controller.tracer = NULL_TRACER
+                    pool.release(browser_controller)
+                    logger.info("Browser controller returned to pool")
+                else:
+                    browser_controller.close()
+                    logger.info("Browser controller closed")
+            except Exception as close_ex:
+                logger.error("Error closing browser: %s", close_ex)
+        _end_run(result, session_id, identity_store, event_stream)
+
+async def run_browser_agent_async(
+    user_goal: str,
+    initial_url: str,
+    api_key: Optional[str] = None,
+    max_iterations: int = 10,
+    additional_state: Optional[Dict[str, Any]] = None,
+    pool: Optional[AsyncBrowserPool] = None,
+    screenshot_policy: Optional[ScreenshotPolicy] = None,
+    max_inline_screenshots: int = 3,
+    screenshot_blob_dir: Optional[str] = None,
+    settle_options: Optional[SettleOptions] = None,
+    typing_options: Optional[TypingOptions] = None,
+    trajectory_cache: Optional[TrajectoryCache] = None,
+    llm_cache: Optional[LlmResponseCache] = None,
+    tracer: Optional[Tracer] = None,
+    trace_path: Optional[str] = None,
+    launch_profile: Union[str, LaunchProfile, None] = None,
+    blocking: Optional[BlockingOptions] = None,
+    http_cache: Optional[HttpResponseCache] = None,
+    har: Optional[HarOptions] = None,
+    pipeline_options: Optional[PipelineOptions] = None,
+    event_stream: Optional[EventStream] = None,
+    max_events: Optional[int] = None,
+    checkpoint_store: Optional[CheckpointStore] = None,
+    resume_from: Optional[Checkpoint] = None,
+    identity_store: Optional[IdentityStore] = None,
+    identity: Optional[str] = None,
+    human_input: Optional[HumanInputBroker] = None,
+    model_router: Optional[ModelRouter] = None
+) -> Dict[str, Any]:
+    """
+    Asyncio version of run_browser_agent built on AsyncBrowserController and Runner.run_async.
+    
+    Browser waits and model calls yield to the event loop instead of blocking the
+    interpreter, and each run registers its controller under its own session id, so
+    many runs can share one event loop (see run_browser_agents_async).
+    
+    Takes the arguments of run_browser_agent, documented there; the ones below differ
+    (pool is an AsyncBrowserPool) or only exist here.
+    
+    Args:
+        pool: Optional AsyncBrowserPool to lease a warm browser from instead of launching one;
+            it must have been created for the event loop the run is on
+        pipeline_options: Whether the end-of-step frame is captured as soon as the last tool call
+            settles and encoded on a worker thread while the models run (on by default); per-step
+            wall time, time blocked on the frame, the serial estimate and discarded prefetches go
+            to metrics['pipeline']
+        
+    Returns:
+        Dict containing final_result (str), success (bool), events (list) and metrics (dict)
+    """
+    browser_controller = None
+    session_id = resume_from.session_id if resume_from is not None else uuid.uuid4().hex
+    storage_state = resume_from.storage_state if resume_from is not None else None
+    result = _new_result(session_id)
+    
+    try:
+        if pool is not None:
+            logger.info("Leasing async browser controller from pool")
+            browser_controller = await pool.acquire(
+                screenshot_policy=screenshot_policy, settle_options=settle_options, blocking=blocking,
+                http_cache=http_cache, har=har, typing_options=typing_options, pipeline_options=pipeline_options,
+                storage_state=storage_state, identity_store=identity_store, identity=identity
+            )
+        else:
+            logger.info("Initializing async browser controller")
+            browser_controller = await AsyncBrowserController.create(
+                screenshot_policy=screenshot_policy, settle_options=settle_options,
+                launch_profile=launch_profile, blocking=blocking, http_cache=http_cache, har=har,
+                typing_options=typing_options, pipeline_options=pipeline_options, storage_state=storage_state,
+                identity_store=identity_store, identity=identity
+            )
+        model_router = _register_resources(session_id, browser_controller, llm_cache, tracer, event_stream,
+                                           human_input, model_router)
+        checkpointer = _start_checkpointer(checkpoint_store, session_id, user_goal, initial_url, resume_from)
+        if resume_from is not None:
+            # Carry on from the page the interrupted run had reached
+            initial_url = resume_from.url
+            logger.info("Resuming session %s after %s iterations", session_id, resume_from.iteration_count)
+        
+        logger.info("Navigating to initial URL: %s", initial_url)
+        await browser_controller.navigate(initial_url)
+        
+        # Replay a cached trace of this goal, handing over to the LLM loop where it diverges
+        recorder, trajectory = _start_replay(session_id, trajectory_cache, user_goal, initial_url, resume_from)
+        replayed_steps = 0
+        if trajectory is not None:
+            replayed_steps = await replay_trajectory(browser_controller, trajectory, recorder)
+            if _replay_finished(result, trajectory_cache, trajectory, replayed_steps,
+                                await browser_controller.fingerprint()):
+                return result
+        
+        initial_screenshot_part = await browser_controller.screenshot()
+        logger.info("Captured initial screenshot")
+        
+        session_service, runner, initial_message, screen_history = _start_session(
+            session_id, user_goal, max_iterations, additional_state, resume_from, initial_screenshot_part,
+            replayed_steps, max_inline_screenshots, screenshot_blob_dir)
+        
+        response_events = _new_event_buffer(max_events)
+        try:
+            async for event in runner.run_async(
+                user_id="user",
+                session_id=session_id,
+                new_message=initial_message,
+            ):
+                if response_events is not None:
+                    response_events.append(event)
+                _log_event(event)
             
-            result["final_result"] = final_result
-            result["events"] = response_events
+            final_state = _final_state(session_service, session_id)
+            _apply_final_state(result, final_state)
+            result["events"] = list(response_events) if response_events is not None else []
+            if checkpointer is not None:
+                checkpointer.finish(result["success"], final_state)
+            if _wants_trajectory(result, trajectory_cache, recorder):
+                trajectory_cache.save(_build_trajectory(
+                    user_goal, initial_url, recorder, final_state, await browser_controller.fingerprint()
+                ))
+            _collect_metrics(result, session_id, browser_controller, screen_history, model_router, blocking,
+                             http_cache, human_input, llm_cache, checkpoint_store, trajectory_cache, tracer, trace_path)
             
         except Exception as runner_ex:
-            print(f"[ERROR] Error during agent execution: {runner_ex}")
-            print(f"[ERROR] {traceback.format_exc()}")
-            result["error"] = f"Agent execution error: {str(runner_ex)}"
-            result["final_result"] = f"Browser automation failed with error: {str(runner_ex)}"
+            _fail(result, "run", runner_ex)
         
         return result
     
     except Exception as e:
-        print(f"[ERROR] Error initializing browser or setup: {e}")
-        print(f"[ERROR] {traceback.format_exc()}")
-        result["error"] = f"Setup error: {str(e)}"
-        result["final_result"] = f"Browser automation failed during setup: {str(e)}"
+        _fail(result, "setup", e)
         return result
         
     finally:
         if browser_controller is not None:
             try:
-                browser_controller.close()
-                print("[INFO] Browser controller closed")
+                if pool is not None:
+                    browser_controller.tracer = NULL_TRACER
+                    await pool.release(browser_controller)
+                    logger.info("Browser controller returned to pool")
+                else:
+                    await browser_controller.close()
+                    logger.info("Browser controller closed")
             except Exception as close_ex:
-                print(f"[ERROR] Error closing browser: {close_ex}")
-        BROWSER_CONTROLLER = None
\ No newline at end of file
+                logger.error("Error closing browser: %s", close_ex)
+        _end_run(result, session_id, identity_store, event_stream)
+
+def _load_resumable(session_id: str, checkpoint_store: CheckpointStore):
+    """Return (checkpoint, None) for a resumable session, or (None, error result)."""
+    checkpoint = checkpoint_store.load(session_id)
+    if checkpoint is None:
+        error = f"No checkpoint for session {session_id}"
+    elif checkpoint.status != "running":
+        error = f"Session {session_id} already {checkpoint.status}"
+    else:
+        return checkpoint, None
+    logger.error(error)
+    return None, _new_result(session_id, error)
+
+def resume_browser_agent(session_id: str, checkpoint_store: CheckpointStore, **kwargs: Any) -> Dict[str, Any]:
+    """
+    Continue an interrupted run from its last checkpoint instead of starting over.
+    
+    The new browser context starts on the page the run had reached (with the
+    checkpoint's cookies and local storage when the store has an encryption key), the
+    iteration count and task flags are restored and the coordinator is told which
+    actions were already taken.
+    
+    Args:
+        session_id: Session id of the interrupted run (its result['session_id'])
+        checkpoint_store: The CheckpointStore the run was saving to
+        **kwargs: Other keyword arguments of run_browser_agent; max_iterations defaults
+            to the interrupted run's
+        
+    Returns:
+        Dict like run_browser_agent's; an error result when the session has no checkpoint
+        or already finished
+    """
+    checkpoint, error_result = _load_resumable(session_id, checkpoint_store)
+    if checkpoint is None:
+        return error_result
+    kwargs.setdefault("max_iterations", checkpoint.state.get("max_iterations", 10))
+    return run_browser_agent(checkpoint.goal, checkpoint.initial_url, checkpoint_store=checkpoint_store,
+                             resume_from=checkpoint, **kwargs)
+
+async def resume_browser_agent_async(session_id: str, checkpoint_store: CheckpointStore,
+                                     **kwargs: Any) -> Dict[str, Any]:
+    """
+    Asyncio version of resume_browser_agent.
+    
+    Args:
+        session_id: Session id of the interrupted run (its result['session_id'])
+        checkpoint_store: The CheckpointStore the run was saving to
+        **kwargs: Other keyword arguments of run_browser_agent_async
+        
+    Returns:
+        Dict like run_browser_agent_async's
+    """
+    checkpoint, error_result = _load_resumable(session_id, checkpoint_store)
+    if checkpoint is None:
+        return error_result
+    kwargs.setdefault("max_iterations", checkpoint.state.get("max_iterations", 10))
+    return await run_browser_agent_async(checkpoint.goal, checkpoint.initial_url, checkpoint_store=checkpoint_store,
+                                         resume_from=checkpoint, **kwargs)
+
+async def run_browser_agents_async(
+    tasks: List[Dict[str, Any]],
+    max_concurrency: int = 4,
+    pool: Optional[AsyncBrowserPool] = None
+) -> List[Dict[str, Any]]:
+    """
+    Run several browser tasks concurrently on the current event loop.
+    
+    Args:
+        tasks: One dict per task with the keyword arguments of run_browser_agent_async
+            (at least user_goal and initial_url)
+        max_concurrency: Maximum number of tasks running at the same time
+        pool: Optional AsyncBrowserPool the tasks lease their browsers from (unless a task
+            names its own), so its max_contexts_per_browser and overflow policy apply
+            across the concurrent runs
+        
+    Returns:
+        List of result dicts, in the same order as tasks
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async def _run(task: Dict[str, Any]) -> Dict[str, Any]:
+        async with semaphore:
+            if pool is not None:
+                task = {"pool": pool, **task}
+            return await run_browser_agent_async(**task)
+    
+    return await asyncio.gather(*(_run(task) for task in tasks))
+
+async def stream_browser_agent_async(
+    user_goal: str,
+    initial_url: str,
+    max_history: int = 0,
+    **kwargs: Any
+) -> AsyncIterator[ProgressEvent]:
+    """
+    Run a browser task and yield its progress events as they happen, ending with a
+    TaskCompleted or TaskFailed event.
+    
+    Args:
+        user_goal: The user's intended goal for browser automation
+        initial_url: The starting URL to navigate to
+        max_history: Events kept on the EventStream for late readers (0 keeps none)
+        **kwargs: Other keyword arguments of run_browser_agent_async; ADK events are
+            not kept (max_events=0) unless given
+        
+    Yields:
+        ProgressEvent: StepStarted, ActionExecuted, ScreenshotTaken, then TaskCompleted / TaskFailed
+    """
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue = asyncio.Queue()
+    stream = kwargs.pop("event_stream", None) or EventStream(max_history=max_history)
+    listener = lambda event: loop.call_soon_threadsafe(events.put_nowait, event)
+    stream.subscribe(listener)
+    kwargs.setdefault("max_events", 0)
+    
+    run = asyncio.ensure_future(run_browser_agent_async(user_goal, initial_url, event_stream=stream, **kwargs))
+    try:
+        while True:
+            event = await events.get()
+            yield event
+            if isinstance(event, TERMINAL_EVENTS):
+                break
+        await run
+    finally:
+        stream.unsubscribe(listener)
+        # The consumer stopped early: stop the run too
+        if not run.done():
+            run.cancel()
+
+def stream_browser_agent(
+    user_goal: str,
+    initial_url: str,
+    max_history: int = 0,
+    **kwargs: Any
+) -> Iterator[ProgressEvent]:
+    """
+    Blocking generator version of stream_browser_agent_async. The run executes on an
+    event loop in a background thread; leaving the loop early lets it finish there.
+    
+    Args:
+        user_goal: The user's intended goal for browser automation
+        initial_url: The starting URL to navigate to
+        max_history: Events kept on the EventStream for late readers (0 keeps none)
+        **kwargs: Other keyword arguments of run_browser_agent_async, except pool (the run
+            has an event loop of its own)
+        
+    Yields:
+        ProgressEvent: StepStarted, ActionExecuted, ScreenshotTaken, then TaskCompleted / TaskFailed
+    """
+    events: "queue.Queue[ProgressEvent]" = queue.Queue()
+    stream = kwargs.pop("event_stream", None) or EventStream(max_history=max_history)
+    stream.subscribe(events.put)
+    kwargs.setdefault("max_events", 0)
+    
+    worker = threading.Thread(
+        target=lambda: asyncio.run(run_browser_agent_async(user_goal, initial_url, event_stream=stream, **kwargs)),
+        name="browser-agent-stream",
+        daemon=True,
+    )
+    worker.start()
+    try:
+        while True:
+            event = events.get()
+            yield event
+            if isinstance(event, TERMINAL_EVENTS):
+                break
+        worker.join()
+    finally:
+        stream.unsubscribe(events.put)
@@ -8,10 +8,33 @@ class Point(BaseModel):
 class ClickArgs(BaseModel):
     label: Optional[str] = Field(description="Label of the element to click (for context)")
     points: Point = Field(description="Coordinates to click")
+    in_zoom: Optional[bool] = Field(
+        default=None, description="True when the points are relative to the last zoom crop instead of the full screen")
 
 class TypeArgs(BaseModel):
     text: str = Field(description="Text to type")
     label: Optional[str] = Field(description="Label of the field being typed into (for context)")
+    mode: Optional[Literal['auto', 'insert', 'fill', 'type']] = Field(
+        default=None,
+        description="How to enter the text: 'insert' (instant), 'fill' (replace the field's content), 'type' "
+                    "(real keystrokes, for autocomplete widgets and key shortcuts) or 'auto'; omit for the default")
+
+class ZoomArgs(BaseModel):
+    top_left: Point = Field(description="Top-left corner of the region to zoom into (0-1000 scale of the full screen)")
+    bottom_right: Point = Field(description="Bottom-right corner of the region to zoom into (0-1000 scale of the full screen)")
+
+class OpenTabArgs(BaseModel):
+    url: Optional[str] = Field(default=None, description="URL to load in the new tab (omit for a blank tab)")
+
+class TabArgs(BaseModel):
+    index: Optional[int] = Field(default=None, description="Index of the tab from list_tabs_wrapper (omit to close the active tab)")
+
+class FanOutArgs(BaseModel):
+    urls: List[str] = Field(description="URLs to load at the same time in new tabs (at most 8)")
+    extract: Optional[Literal['text', 'screenshot']] = Field(
+        default='text', description="'text' returns each page's visible text, 'screenshot' attaches a capture of each to your next request")
+    keep_open: Optional[bool] = Field(
+        default=False, description="Keep the tabs open so you can switch to them afterwards")
 
 class ScrollArgs(BaseModel):
     direction: Optional[str] = Field(description="Direction to scroll ('up' or 'down')")
@@ -22,6 +45,28 @@ class ScrollArgs(BaseModel):
 class KeypressArgs(BaseModel):
     keys: List[str] = Field(description="List of keys to press (e.g., ['Enter'], ['Control', 'a'])")
 
+class ElementClickArgs(BaseModel):
+    element_id: int = Field(description="Id of the element from the list_elements_wrapper tool")
+    label: Optional[str] = Field(default=None, description="Label of the element to click (for context)")
+
+class ElementTypeArgs(BaseModel):
+    element_id: int = Field(description="Id of the input element from the list_elements_wrapper tool")
+    text: str = Field(description="Text to type")
+    mode: Optional[Literal['auto', 'insert', 'fill', 'type']] = Field(
+        default=None,
+        description="How to enter the text: 'insert' (instant), 'fill' (replace the field's content), 'type' "
+                    "(real keystrokes, for autocomplete widgets and key shortcuts) or 'auto'; omit for the default")
+
+class ActionStep(BaseModel):
+    action: Literal['click', 'type_text', 'scroll', 'keypress'] = Field(description="The type of action to perform")
+    click: Optional[ClickArgs] = Field(default=None, description="Arguments when action is 'click'")
+    type_text: Optional[TypeArgs] = Field(default=None, description="Arguments when action is 'type_text'")
+    scroll: Optional[ScrollArgs] = Field(default=None, description="Arguments when action is 'scroll'")
+    keypress: Optional[KeypressArgs] = Field(default=None, description="Arguments when action is 'keypress'")
+
+class ActionSequenceArgs(BaseModel):
+    actions: List[ActionStep] = Field(description="Actions to perform in order; stops at the first one that fails")
+
 class HumanInteractionInput(BaseModel):
     """Input schema for the HumanInteractionAgent."""
     reason: str = Field(description="The reason why human input is required (e.g., 'Login required', 'Ambiguous choice').")
@@ -30,10 +75,15 @@ class HumanInteractionInput(BaseModel):
 
 # --- Input Schema --- #
 
-class BrowserActionInput(BaseModel):
+class BrowserActionStep(BaseModel):
     action : str = Field(description= " The type of action to perform (e.g., 'click', 'type_text', 'scroll', 'keypress').")
     action_description: str = Field(description="A description of the action to be performed. eg. type the text - 'animal movie ticket', click on the search bar, etc.")
 
+class BrowserActionInput(BaseModel):
+    action : str = Field(description= " The type of action to perform (e.g., 'click', 'type_text', 'scroll', 'keypress', or 'sequence' when steps are given).")
+    action_description: str = Field(description="A description of the action to be performed. eg. type the text - 'animal movie ticket', click on the search bar, etc.")
+    steps: Optional[List[BrowserActionStep]] = Field(default=None, description="Optional ordered list of actions to perform back to back in one call, e.g. click the search bar, type 'animal movie ticket', press Enter.")
+
 # --- Output Schema --- #
 
 class BrowserActionOutput(BaseModel):
@@ -0,0 +1,148 @@
+"""Screenshot encoding policy shared by the sync and async browser controllers."""
+
+import io
+import time
+from typing import Any, Dict, Literal, Optional, Tuple
+
+from google.genai import types
+from pydantic import BaseModel, Field
+
+class ScreenshotPolicy(BaseModel):
+    """How screenshots are encoded before they are sent to the model."""
+    format: Literal["png", "jpeg", "webp"] = Field(default="png", description="Image format sent to the model")
+    quality: Optional[int] = Field(default=None, ge=1, le=100, description="JPEG/WebP quality (ignored for PNG)")
+    max_width: Optional[int] = Field(default=None, description="Downscale so the image is at most this wide")
+    max_height: Optional[int] = Field(default=None, description="Downscale so the image is at most this high")
+    grayscale: bool = Field(default=False, description="Convert to grayscale")
+
+    @property
+    def mime_type(self) -> str:
+        return f"image/{self.format}"
+
+    def needs_transform(self, width: int, height: int) -> bool:
+        """Whether the capture has to go through PIL for a viewport of the given size."""
+        if self.grayscale or self.format == "webp":
+            return True
+        if self.max_width is not None and width > self.max_width:
+            return True
+        if self.max_height is not None and height > self.max_height:
+            return True
+        return False
+
+    def capture_options(self, width: int, height: int) -> Dict[str, Any]:
+        """Keyword arguments for Playwright's page.screenshot()."""
+        # CSS pixels, so a launch profile with device_scale_factor > 1 does not inflate captures
+        if self.needs_transform(width, height):
+            # Lossless source for the PIL stage
+            return {"type": "png", "scale": "css"}
+        if self.format == "jpeg":
+            return {"type": "jpeg", "quality": self.quality or 80, "scale": "css"}
+        return {"type": "png", "scale": "css"}
+
+    def zoom_policy(self) -> "ScreenshotPolicy":
+        """Policy of zoom crops: the same encoding, never downscaled."""
+        return self.model_copy(update={"max_width": None, "max_height": None})
+
+    def zoom_capture_options(self, region: Tuple[float, float, float, float]) -> Dict[str, Any]:
+        """Keyword arguments for page.screenshot() of a (left, top, width, height) CSS region."""
+        left, top, width, height = region
+        options = self.zoom_policy().capture_options(int(width), int(height))
+        # Device pixels: a launch profile with device_scale_factor > 1 gives sharper crops
+        options.update(clip={"x": left, "y": top, "width": width, "height": height}, scale="device")
+        return options
+
+# Two-tier vision: a small full frame every step, full-resolution crops on request through
+# the executor's zoom tool. A 512x384 JPEG costs far fewer image tokens than a 1024x768 PNG.
+# The controllers use it when no policy is given; pass ScreenshotPolicy() for full-size PNGs.
+LOW_RES_POLICY = ScreenshotPolicy(format="jpeg", quality=70, max_width=512, max_height=384)
+
+def encode_screenshot(raw: bytes, policy: ScreenshotPolicy, width: int, height: int,
+                      capture_ms: float = 0.0) -> Tuple[types.Part, Dict[str, Any]]:
+    """
+    Turn a Playwright capture into a Part following the policy.
+
+    Playwright already produces the final bytes unless the policy needs a downscale,
+    grayscale or WebP, so PIL is only imported and used in that case.
+
+    Args:
+        raw: Bytes returned by page.screenshot(**policy.capture_options(width, height))
+        policy: The screenshot policy
+        width: Viewport width used for the capture
+        height: Viewport height used for the capture
+        capture_ms: Time spent in page.screenshot, reported in the stats
+
+    Returns:
+        Tuple of the Part and a stats dict (format, bytes, capture_ms, encode_ms, width, height)
+    """
+    started = time.perf_counter()
+    data = raw
+    out_width, out_height = width, height
+
+    if policy.needs_transform(width, height):
+        from PIL import Image
+
+        img = Image.open(io.BytesIO(raw))
+        if policy.grayscale:
+            img = img.convert("L")
+        elif policy.format == "jpeg" and img.mode != "RGB":
+            img = img.convert("RGB")
+        max_width = policy.max_width or img.width
+        max_height = policy.max_height or img.height
+        scale = min(max_width / img.width, max_height / img.height, 1.0)
+        if scale < 1.0:
+            img = img.resize((max(1, int(img.width * scale)), max(1, int(img.height * scale))), Image.LANCZOS)
+        out_width, out_height = img.size
+
+        output_stream = io.BytesIO()
+        if policy.format == "png":
+            img.save(output_stream, format="PNG")
+        else:
+            img.save(output_stream, format=policy.format.upper(), quality=policy.quality or 80)
+        data = output_stream.getvalue()
+
+    stats = {
+        "format": policy.format,
+        "bytes": len(data),
+        "capture_ms": capture_ms,
+        "encode_ms": (time.perf_counter() - started) * 1000,
+        "width": out_width,
+        "height": out_height,
+    }
+    part = types.Part(inline_data=types.Blob(mime_type=policy.mime_type, data=data))
+    return part, stats
+
+def screen_signature(data: bytes, size: Tuple[int, int] = (128, 96)) -> Tuple[str, Any]:
+    """
+    Compute a perceptual hash and a downsampled grayscale thumbnail of a capture.
+
+    Args:
+        data: Encoded image bytes (PNG/JPEG/WebP)
+        size: Thumbnail size used for the pixel diff
+
+    Returns:
+        Tuple of the 64-bit difference hash (hex) and the thumbnail as a uint8 NumPy array
+    """
+    import numpy as np
+    from PIL import Image
+
+    img = Image.open(io.BytesIO(data)).convert("L")
+    # dHash: compare horizontally adjacent pixels of a 9x8 thumbnail
+    tiny = np.asarray(img.resize((9, 8), Image.BILINEAR), dtype=np.int16)
+    bits = (tiny[:, 1:] > tiny[:, :-1]).flatten()
+    dhash = int("".join("1" if bit else "0" for bit in bits), 2)
+    thumbnail = np.asarray(img.resize(size, Image.BILINEAR), dtype=np.uint8)
+    return f"{dhash:016x}", thumbnail
+
+def compare_signatures(previous: Any, current: Any) -> Tuple[float, int]:
+    """
+    Compare two thumbnails from screen_signature.
+
+    Returns:
+        Tuple of the similarity (1.0 = identical) and the largest per-cell difference (0-255)
+    """
+    import numpy as np
+
+    if previous is None or current is None or previous.shape != current.shape:
+        return 0.0, 255
+    diff = np.abs(previous.astype(np.int16) - current.astype(np.int16))
+    return 1.0 - float(diff.mean()) / 255.0, int(diff.max())
@@ -0,0 +1,171 @@
+"""Wait for a page to become quiet after an action instead of sleeping a fixed time."""
+
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel, Field
+
+# Resolves once the DOM has not mutated and no finite animation has been running for
+# quietMs, or after maxMs. Checked every animation frame (with a timer fallback for
+# pages where requestAnimationFrame is throttled).
+SETTLE_SCRIPT = """
+({quietMs, maxMs}) => new Promise(resolve => {
+    const start = performance.now();
+    let lastActivity = start;
+    let done = false;
+    const observer = new MutationObserver(() => { lastActivity = performance.now(); });
+    observer.observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+    const animating = () => {
+        if (!document.getAnimations) return false;
+        return document.getAnimations().some(a => {
+            if (a.playState !== 'running') return false;
+            const timing = a.effect && a.effect.getComputedTiming ? a.effect.getComputedTiming() : null;
+            // Infinite animations (spinners, carousels) would never settle
+            return !timing || timing.iterations !== Infinity;
+        });
+    };
+    const check = () => {
+        if (done) return;
+        const now = performance.now();
+        if (animating()) lastActivity = now;
+        const quiet = now - lastActivity >= quietMs;
+        if (quiet || now - start >= maxMs) {
+            done = true;
+            observer.disconnect();
+            clearInterval(timer);
+            resolve({quiet: quiet, elapsed: now - start});
+        }
+    };
+    const frame = () => { check(); if (!done) requestAnimationFrame(frame); };
+    const timer = setInterval(check, 50);
+    requestAnimationFrame(frame);
+})
+"""
+
+class SettleOptions(BaseModel):
+    """How the browser controllers wait after an action."""
+    enabled: bool = Field(default=True, description="Use settle detection; False falls back to fixed sleeps")
+    quiet_ms: int = Field(default=150, description="DOM must be free of mutations and animations for this long")
+    max_ms: int = Field(default=3000, description="Upper bound on the wait after any action")
+    network_idle: bool = Field(default=True, description="Also wait for pending network requests to finish")
+    poll_ms: int = Field(default=50, description="Poll interval while requests are still pending")
+    long_request_ms: int = Field(default=5000, description="Requests pending longer than this (long polling) are ignored")
+
+class NetworkTracker:
+    """Counts requests a page has in flight, fed by Playwright page events."""
+
+    def __init__(self, page, long_request_ms: int = 5000):
+        self.long_request_ms = long_request_ms
+        self._pending: Dict[int, float] = {}
+        page.on("request", self._on_request)
+        page.on("requestfinished", self._on_done)
+        page.on("requestfailed", self._on_done)
+
+    def _on_request(self, request):
+        self._pending[id(request)] = time.perf_counter()
+
+    def _on_done(self, request):
+        self._pending.pop(id(request), None)
+
+    def pending(self) -> int:
+        now = time.perf_counter()
+        return sum(1 for started in self._pending.values() if (now - started) * 1000 < self.long_request_ms)
+
+class SettleRecorder:
+    """Keeps the outcome of recent settle waits for reporting."""
+
+    def __init__(self, maxlen: int = 500):
+        self.history = deque(maxlen=maxlen)
+        self.last: Optional[Dict[str, Any]] = None
+
+    def record(self, action: str, elapsed_ms: float, dom_quiet: bool, network_idle: bool, timed_out: bool):
+        self.last = {
+            "action": action,
+            "elapsed_ms": elapsed_ms,
+            "dom_quiet": dom_quiet,
+            "network_idle": network_idle,
+            "timed_out": timed_out,
+        }
+        self.history.append(self.last)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return count, average/max settle time and how many waits hit the cap."""
+        waits = list(self.history)
+        return {
+            "settles": len(waits),
+            "avg_ms": sum(w["elapsed_ms"] for w in waits) / len(waits) if waits else 0.0,
+            "max_ms": max((w["elapsed_ms"] for w in waits), default=0.0),
+            "timed_out": sum(1 for w in waits if w["timed_out"]),
+        }
+
+def wait_for_settle(page, tracker: NetworkTracker, options: SettleOptions, max_ms: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Block until the page is quiet or max_ms has passed (sync Playwright).
+
+    Returns:
+        Dict with elapsed_ms, dom_quiet, network_idle and timed_out
+    """
+    max_ms = max_ms or options.max_ms
+    started = time.perf_counter()
+    dom_quiet = network_idle = False
+    while True:
+        remaining = max_ms - (time.perf_counter() - started) * 1000
+        if remaining <= 0:
+            break
+        try:
+            dom_quiet = page.evaluate(SETTLE_SCRIPT, {"quietMs": options.quiet_ms, "maxMs": remaining})["quiet"]
+        except Exception:
+            # The action started a navigation and destroyed the execution context
+            try:
+                page.wait_for_load_state("domcontentloaded", timeout=max(remaining, 1))
+            except Exception:
+                # Page closed or still loading at the cap: stop waiting
+                break
+            continue
+        network_idle = not options.network_idle or tracker is None or tracker.pending() == 0
+        if dom_quiet and network_idle:
+            break
+        page.wait_for_timeout(options.poll_ms)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    return {
+        "elapsed_ms": elapsed_ms,
+        "dom_quiet": dom_quiet,
+        "network_idle": network_idle,
+        "timed_out": not (dom_quiet and network_idle),
+    }
+
+async def wait_for_settle_async(page, tracker: NetworkTracker, options: SettleOptions, max_ms: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Wait until the page is quiet or max_ms has passed (async Playwright).
+
+    Returns:
+        Dict with elapsed_ms, dom_quiet, network_idle and timed_out
+    """
+    max_ms = max_ms or options.max_ms
+    started = time.perf_counter()
+    dom_quiet = network_idle = False
+    while True:
+        remaining = max_ms - (time.perf_counter() - started) * 1000
+        if remaining <= 0:
+            break
+        try:
+            dom_quiet = (await page.evaluate(SETTLE_SCRIPT, {"quietMs": options.quiet_ms, "maxMs": remaining}))["quiet"]
+        except Exception:
+            try:
+                await page.wait_for_load_state("domcontentloaded", timeout=max(remaining, 1))
+            except Exception:
+                # Page closed or still loading at the cap: stop waiting
+                break
+            continue
+        network_idle = not options.network_idle or tracker is None or tracker.pending() == 0
+        if dom_quiet and network_idle:
+            break
+        await page.wait_for_timeout(options.poll_ms)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    return {
+        "elapsed_ms": elapsed_ms,
+        "dom_quiet": dom_quiet,
+        "network_idle": network_idle,
+        "timed_out": not (dom_quiet and network_idle),
+    }
@@ -0,0 +1,87 @@
+"""Tab listing and the parallel fan-out of several URLs into tabs of one context."""
+
+from collections import deque
+from typing import Any, Dict, List, Literal, Optional
+
+from google.genai import types
+
+FanOutExtract = Literal["text", "screenshot"]
+
+# Most tabs a single fan-out opens; more URLs are left out
+MAX_FAN_OUT_TABS = 8
+
+# Visible text of the page, whitespace-collapsed and cut to the given length
+PAGE_TEXT_SCRIPT = """
+(maxChars) => {
+    const text = (document.body ? document.body.innerText : '').replace(/[ \\t]+/g, ' ').replace(/\\n\\s*\\n+/g, '\\n');
+    return text.length > maxChars ? text.slice(0, maxChars) + ' …' : text;
+}
+"""
+
+def format_tabs(tabs: List[Dict[str, Any]]) -> str:
+    """Render list_tabs() output for the model, one tab per line."""
+    lines = []
+    for tab in tabs:
+        marker = "*" if tab["active"] else " "
+        lines.append(f"{marker} [{tab['index']}] {tab['title'] or '(untitled)'} - {tab['url']}")
+    return "\n".join(lines)
+
+def format_fan_out(results: List[Dict[str, Any]]) -> str:
+    """Render fan_out() results for the model; screenshots are attached to the next request instead."""
+    blocks = []
+    for result in results:
+        header = f"[{result['label']}] {result['url']}"
+        if result.get("index") is not None:
+            header += f" (tab {result['index']})"
+        if result.get("error"):
+            blocks.append(f"{header}\nError: {result['error']}")
+        elif result.get("text") is not None:
+            blocks.append(f"{header} - {result['title']}\n{result['text']}")
+        else:
+            blocks.append(f"{header} - {result['title']}: screenshot attached")
+    return "\n\n".join(blocks)
+
+class FanOutRecorder:
+    """
+    Times fan-outs: the wall time of loading all tabs together against the sum of
+    the per-tab load times, which is roughly what visiting them one by one costs.
+    """
+
+    def __init__(self, maxlen: int = 200):
+        self.history = deque(maxlen=maxlen)
+        # (label, image) of the last screenshot fan-out, attached to the coordinator's next request
+        self.frames: List[tuple] = []
+
+    def record(self, results: List[Dict[str, Any]], wall_ms: float):
+        self.history.append({
+            "tabs": len(results),
+            "failed": sum(1 for r in results if r.get("error")),
+            "wall_ms": wall_ms,
+            "serial_ms": sum(r.get("load_ms", 0.0) for r in results),
+        })
+
+    def keep_frames(self, results: List[Dict[str, Any]]):
+        self.frames = [(f"[{r['label']}] {r['url']}", r["image"]) for r in results if r.get("image") is not None]
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return fan-out count, tabs loaded and failed, and average wall vs serial load time."""
+        fan_outs = list(self.history)
+        if not fan_outs:
+            return {"fan_outs": 0, "tabs": 0, "failed": 0, "avg_wall_ms": 0.0, "avg_serial_ms": 0.0, "avg_saved_ms": 0.0}
+        count = len(fan_outs)
+        avg_wall = sum(f["wall_ms"] for f in fan_outs) / count
+        avg_serial = sum(f["serial_ms"] for f in fan_outs) / count
+        return {
+            "fan_outs": count,
+            "tabs": sum(f["tabs"] for f in fan_outs),
+            "failed": sum(f["failed"] for f in fan_outs),
+            "avg_wall_ms": avg_wall,
+            "avg_serial_ms": avg_serial,
+            "avg_saved_ms": max(avg_serial - avg_wall, 0.0),
+        }
+
+def tab_result(label: str, url: str, index: Optional[int] = None, title: str = "", text: Optional[str] = None,
+               image: Optional[types.Blob] = None, load_ms: float = 0.0, error: Optional[str] = None) -> Dict[str, Any]:
+    """One fan-out result: the tab's label (1-based position in the URL list), URL and what was extracted."""
+    return {"label": label, "url": url, "index": index, "title": title, "text": text, "image": image,
+            "load_ms": load_ms, "error": error}
@@ -0,0 +1,175 @@
+"""Enter text into the focused field by insertion, fill or real keystrokes."""
+
+from collections import deque
+from typing import Any, Dict, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+TypingMode = Literal["auto", "insert", "fill", "type"]
+
+# Describes the focused text field (following open shadow roots), or null when no text
+# input, textarea or contenteditable has focus.
+FOCUSED_FIELD_SCRIPT = """
+() => {
+    let el = document.activeElement;
+    while (el && el.shadowRoot && el.shadowRoot.activeElement) el = el.shadowRoot.activeElement;
+    if (!el || el === document.body) return null;
+    const tag = el.tagName.toLowerCase();
+    const type = (el.getAttribute('type') || 'text').toLowerCase();
+    const textInput = tag === 'textarea' ||
+        (tag === 'input' && ['text', 'search', 'email', 'url', 'tel', 'password', 'number'].includes(type));
+    if (!textInput && !el.isContentEditable) return null;
+    const role = (el.getAttribute('role') || '').toLowerCase();
+    const autocomplete = (el.getAttribute('aria-autocomplete') || 'none').toLowerCase();
+    return {
+        kind: textInput ? 'input' : 'editable',
+        value: textInput ? el.value : el.innerText,
+        // Comboboxes, suggestion lists and inline key handlers react to individual key events
+        needsKeys: role === 'combobox' || autocomplete !== 'none' || el.hasAttribute('list') ||
+            !!(el.onkeydown || el.onkeypress || el.onkeyup),
+    };
+}
+"""
+
+# Puts back the value of the focused input/textarea after a fast entry did not take
+RESTORE_VALUE_SCRIPT = """
+(value) => {
+    let el = document.activeElement;
+    while (el && el.shadowRoot && el.shadowRoot.activeElement) el = el.shadowRoot.activeElement;
+    if (!el || !('value' in el)) return false;
+    const proto = el.tagName === 'TEXTAREA' ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+    Object.getOwnPropertyDescriptor(proto, 'value').set.call(el, value);
+    el.dispatchEvent(new Event('input', {bubbles: true}));
+    return true;
+}
+"""
+
+class TypingOptions(BaseModel):
+    """How the browser controllers enter text."""
+    mode: TypingMode = Field(
+        default="auto",
+        description="'insert' (one input event), 'fill' (replace the field's value), 'type' (a key event per "
+                    "character) or 'auto' (insert, or keystrokes when the field needs them)")
+    delay_ms: int = Field(default=50, description="Delay between keystrokes in 'type' mode")
+    fallback_delay_ms: int = Field(default=10, description="Delay between keystrokes when a fast entry falls back")
+
+class TypingRecorder:
+    """Keeps the outcome of recent text entries for reporting."""
+
+    def __init__(self, maxlen: int = 500):
+        self.history = deque(maxlen=maxlen)
+        self.last: Optional[Dict[str, Any]] = None
+
+    def record(self, requested: str, used: str, chars: int, elapsed_ms: float):
+        self.last = {
+            "requested": requested,
+            "used": used,
+            "chars": chars,
+            "elapsed_ms": elapsed_ms,
+            "fallback": used == "type" and requested != "type",
+        }
+        self.history.append(self.last)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return entry counts per strategy, fallbacks, characters and average entry time."""
+        entries = list(self.history)
+        by_strategy: Dict[str, int] = {}
+        for entry in entries:
+            by_strategy[entry["used"]] = by_strategy.get(entry["used"], 0) + 1
+        return {
+            "entries": len(entries),
+            "by_strategy": by_strategy,
+            "fallbacks": sum(1 for e in entries if e["fallback"]),
+            "chars": sum(e["chars"] for e in entries),
+            "avg_ms": sum(e["elapsed_ms"] for e in entries) / len(entries) if entries else 0.0,
+        }
+
+def _normalize(value: str) -> str:
+    return " ".join(value.split())
+
+def _wants_keystrokes(mode: str, field: Optional[Dict[str, Any]]) -> bool:
+    if mode == "type":
+        return True
+    # Without a focused text field (canvas editors, shortcuts) only key events get anywhere
+    return field is None or (mode == "auto" and field["needsKeys"])
+
+def _took(text: str, strategy: str, before: Dict[str, Any], after: Optional[Dict[str, Any]]) -> bool:
+    """Whether a fast entry left the text in the field (frameworks may reject synthetic input)."""
+    if after is None:
+        return False
+    value, expected = after["value"], text
+    if after["kind"] == "editable":
+        value, expected = _normalize(value), _normalize(text)
+    if expected not in value:
+        return False
+    return strategy == "fill" or not text or value != before["value"]
+
+def enter_text(page, text: str, options: TypingOptions, mode: Optional[str] = None, delay: Optional[int] = None,
+               timeout: int = 10000) -> str:
+    """
+    Enter text into the focused field (sync Playwright).
+
+    Fast strategies are checked against the field's value afterwards; when the page
+    did not take the text, the field is restored and the text is typed with key
+    events instead.
+
+    Args:
+        page: The page with the focused field
+        text: The text to enter
+        options: Typing options (default mode and keystroke delays)
+        mode: Strategy for this entry, overriding options.mode
+        delay: Keystroke delay in ms, overriding options.delay_ms
+        timeout: Timeout of 'fill' in ms
+
+    Returns:
+        str: The strategy that entered the text ('insert', 'fill' or 'type')
+    """
+    mode = mode or options.mode
+    field = page.evaluate(FOCUSED_FIELD_SCRIPT) if mode != "type" else None
+    if not _wants_keystrokes(mode, field):
+        strategy = "fill" if mode == "fill" else "insert"
+        try:
+            if strategy == "fill":
+                page.locator("*:focus").fill(text, timeout=timeout)
+            else:
+                page.keyboard.insert_text(text)
+            after = page.evaluate(FOCUSED_FIELD_SCRIPT)
+        except Exception:
+            after = None
+        if _took(text, strategy, field, after):
+            return strategy
+        if field["kind"] == "input":
+            page.evaluate(RESTORE_VALUE_SCRIPT, field["value"])
+    if delay is None:
+        delay = options.delay_ms if mode == "type" else options.fallback_delay_ms
+    page.keyboard.type(text, delay=delay)
+    return "type"
+
+async def enter_text_async(page, text: str, options: TypingOptions, mode: Optional[str] = None,
+                           delay: Optional[int] = None, timeout: int = 10000) -> str:
+    """
+    Enter text into the focused field (async Playwright). See enter_text.
+
+    Returns:
+        str: The strategy that entered the text ('insert', 'fill' or 'type')
+    """
+    mode = mode or options.mode
+    field = await page.evaluate(FOCUSED_FIELD_SCRIPT) if mode != "type" else None
+    if not _wants_keystrokes(mode, field):
+        strategy = "fill" if mode == "fill" else "insert"
+        try:
+            if strategy == "fill":
+                await page.locator("*:focus").fill(text, timeout=timeout)
+            else:
+                await page.keyboard.insert_text(text)
+            after = await page.evaluate(FOCUSED_FIELD_SCRIPT)
+        except Exception:
+            after = None
+        if _took(text, strategy, field, after):
+            return strategy
+        if field["kind"] == "input":
+            await page.evaluate(RESTORE_VALUE_SCRIPT, field["value"])
+    if delay is None:
+        delay = options.delay_ms if mode == "type" else options.fallback_delay_ms
+    await page.keyboard.type(text, delay=delay)
+    return "type"
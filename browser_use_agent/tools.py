@@ -1,3 +1,4 @@
+import inspect
 from google.adk.tools import FunctionTool
 from playwright.sync_api import Page # Import Page for type hinting
 from pydantic import BaseModel, Field
@@ -5,70 +6,121 @@ from typing import List, Optional
 
 # Import the core action handler
 from .browser import handle_action
-from .schema import ClickArgs, TypeArgs, ScrollArgs, KeypressArgs, HumanInteractionInput
-# Access to the global browser controller
-from .globals import BROWSER_CONTROLLER
+from .schema import (ClickArgs, TypeArgs, ScrollArgs, KeypressArgs, ActionSequenceArgs, ActionStep,
+                     ElementClickArgs, ElementTypeArgs, HumanInteractionInput, ZoomArgs, OpenTabArgs, TabArgs,
+                     FanOutArgs)
+from .elements import format_elements
+from .tabs import MAX_FAN_OUT_TABS, format_fan_out, format_tabs
+from .trajectory import SENSITIVE_FIELD_SCRIPT, TYPING_METHODS
+# Per-session browser controller lookup
+from .globals import get_browser_controller, get_session_resource, resolve_session_id
+from .human_input import default_broker
+from .events import HumanInputRequested, emit_event
+from .logging_config import get_logger, redact
+
+logger = get_logger("tools")
+
+async def _resolve(result):
+    """Await the result when it comes from an AsyncBrowserController."""
+    if inspect.isawaitable(result):
+        return await result
+    return result
+
+async def _call_recorded(tool_context, browser_controller, method: str, **kwargs):
+    """Call a controller action and add it to the session's trajectory when one is being recorded."""
+    recorder = get_session_resource(tool_context, "trajectory_recorder")
+    # The fingerprint is taken before the action so replays can check they are on the same page
+    fingerprint = await _resolve(browser_controller.fingerprint()) if recorder is not None else None
+    success = await _resolve(getattr(browser_controller, method)(**kwargs))
+    if success and recorder is not None:
+        recorder.record(method, kwargs, fingerprint)
+        # Text typed into a password or similar field must not end up in the cache
+        if method in TYPING_METHODS and recorder.sensitive_reason is None:
+            try:
+                if await _resolve(browser_controller.page.evaluate(SENSITIVE_FIELD_SCRIPT)):
+                    recorder.mark_sensitive("typed into a sensitive field")
+            except Exception as e:
+                logger.warning("Could not check the focused field, not caching the trajectory: %s", e)
+                recorder.mark_sensitive("typed into a field that could not be checked")
+    return success
 
 # --- Tool Functions ---
-def click_element_wrapper(args: ClickArgs, tool_context=None):
+async def click_element_wrapper(args: ClickArgs, tool_context=None):
     """Tool for clicking elements on the webpage."""
-    from .globals import get_browser_controller, check_browser_controller
-    
-    # Diagnostic check
-    print("[CLICK_TOOL] Checking BROWSER_CONTROLLER in click_element_wrapper:")
-    has_controller = check_browser_controller()
-    
     # Get the browser controller using the getter function
-    browser_controller = get_browser_controller()
+    browser_controller = get_browser_controller(tool_context)
     
     if not browser_controller:
-        print("[ERROR] Browser controller not available for click operation")
+        logger.error("Browser controller not available for click operation")
         return "Error: Browser controller is not available."
     
     try:
-        print(f"[CLICK_TOOL] Using browser controller: {browser_controller}")
-        success = browser_controller.click(
+        logger.debug("Using browser controller %r", browser_controller)
+        success = await _call_recorded(tool_context, browser_controller, "click",
             x=args.points.x, 
             y=args.points.y,
-            label=args.label
+            label=args.label,
+            in_zoom=bool(args.in_zoom)
         )
         
-        return f"{'Clicked' if success else 'Failed to click'} at ({args.points.x}, {args.points.y})"
+        where = " in the zoom crop" if args.in_zoom else ""
+        return f"{'Clicked' if success else 'Failed to click'} at ({args.points.x}, {args.points.y}){where}"
     except Exception as e:
-        print(f"[ERROR] Click error: {e}")
+        logger.error("Click error: %s", e)
         return f"Error when clicking: {str(e)}"
 
-def type_text_wrapper(args: TypeArgs, tool_context=None):
+async def type_text_wrapper(args: TypeArgs, tool_context=None):
     """Tool for typing text into input fields on the webpage."""
-    from .globals import get_browser_controller
-    
     # Get the browser controller using the getter function
-    browser_controller = get_browser_controller()
+    browser_controller = get_browser_controller(tool_context)
     
     if not browser_controller:
-        print("[ERROR] Browser controller not available for type operation")
+        logger.error("Browser controller not available for type operation")
         return "Error: Browser controller is not available."
     
     try:
-        success = browser_controller.type_text(
+        success = await _call_recorded(tool_context, browser_controller, "type_text",
             text=args.text,
-            label=args.label
+            label=args.label,
+            mode=args.mode
         )
         
         return f"{'Typed' if success else 'Failed to type'} text: '{args.text}'"
     except Exception as e:
-        print(f"[ERROR] Type text error: {e}")
+        logger.error("Type text error: %s", e)
         return f"Error when typing text: {str(e)}"
 
-def scroll_page_wrapper(args: ScrollArgs, tool_context=None):
-    """Tool for scrolling the webpage."""
-    from .globals import get_browser_controller
+async def zoom_region_wrapper(args: ZoomArgs, tool_context=None):
+    """Tool capturing a region of the screen at full resolution for precise clicking."""
+    browser_controller = get_browser_controller(tool_context)
     
+    if not browser_controller:
+        logger.error("Browser controller not available for zoom operation")
+        return "Error: Browser controller is not available."
+    
+    try:
+        success = await _call_recorded(tool_context, browser_controller, "zoom",
+            x1=args.top_left.x,
+            y1=args.top_left.y,
+            x2=args.bottom_right.x,
+            y2=args.bottom_right.y
+        )
+        if not success:
+            return "Failed to zoom."
+        return ("Zoomed in. The full-resolution crop is attached to your next request. To click inside it, call "
+                "click_element_wrapper with in_zoom=true and points on a 0-1000 scale of the crop. The crop is "
+                "discarded after the next action.")
+    except Exception as e:
+        logger.error("Zoom error: %s", e)
+        return f"Error when zooming: {str(e)}"
+
+async def scroll_page_wrapper(args: ScrollArgs, tool_context=None):
+    """Tool for scrolling the webpage."""
     # Get the browser controller using the getter function
-    browser_controller = get_browser_controller()
+    browser_controller = get_browser_controller(tool_context)
     
     if not browser_controller:
-        print("[ERROR] Browser controller not available for scroll operation")
+        logger.error("Browser controller not available for scroll operation")
         return "Error: Browser controller is not available."
     
     # Extract coordinates if provided
@@ -79,7 +131,7 @@ def scroll_page_wrapper(args: ScrollArgs, tool_context=None):
         y = args.points.y
         
     try:
-        success = browser_controller.scroll(
+        success = await _call_recorded(tool_context, browser_controller, "scroll",
             direction=args.direction,
             amount=args.amount,
             x=x,
@@ -88,44 +140,243 @@ def scroll_page_wrapper(args: ScrollArgs, tool_context=None):
         
         return f"{'Scrolled' if success else 'Failed to scroll'} {args.direction} by {args.amount} pixels"
     except Exception as e:
-        print(f"[ERROR] Scroll error: {e}")
+        logger.error("Scroll error: %s", e)
         return f"Error when scrolling: {str(e)}"
 
-def press_keys_wrapper(args: KeypressArgs, tool_context=None):
+async def press_keys_wrapper(args: KeypressArgs, tool_context=None):
     """Tool for pressing keyboard keys."""
-    from .globals import get_browser_controller
-    
     # Get the browser controller using the getter function
-    browser_controller = get_browser_controller()
+    browser_controller = get_browser_controller(tool_context)
     
     if not browser_controller:
-        print("[ERROR] Browser controller not available for key press operation")
+        logger.error("Browser controller not available for key press operation")
         return "Error: Browser controller is not available."
     
     try:
-        success = browser_controller.press_keys(
+        success = await _call_recorded(tool_context, browser_controller, "press_keys",
             keys=args.keys
         )
         
         return f"{'Pressed' if success else 'Failed to press'} keys: {', '.join(args.keys)}"
     except Exception as e:
-        print(f"[ERROR] Key press error: {e}")
+        logger.error("Key press error: %s", e)
         return f"Error when pressing keys: {str(e)}"
 
-def get_user_input_wrapper(prompt: str, tool_context=None) -> str:
-    """Tool for getting input from the human user."""
-    print(f"[INFO] Requesting user input: {prompt}")
+async def list_elements_wrapper(tool_context=None):
+    """Tool listing the interactive elements visible on the page as '[id] role 'name' at (x,y)' lines."""
+    browser_controller = get_browser_controller(tool_context)
+    
+    if not browser_controller:
+        logger.error("Browser controller not available for element listing")
+        return "Error: Browser controller is not available."
+    
+    try:
+        elements = await _resolve(browser_controller.list_elements())
+        return format_elements(elements)
+    except Exception as e:
+        logger.error("Element listing error: %s", e)
+        return f"Error when listing elements: {str(e)}"
+
+async def list_tabs_wrapper(tool_context=None):
+    """Tool listing the open tabs as '[index] title - url' lines, the active one marked with '*'."""
+    browser_controller = get_browser_controller(tool_context)
+    
+    if not browser_controller:
+        logger.error("Browser controller not available for tab listing")
+        return "Error: Browser controller is not available."
+    
+    try:
+        return format_tabs(await _resolve(browser_controller.list_tabs()))
+    except Exception as e:
+        logger.error("Tab listing error: %s", e)
+        return f"Error when listing tabs: {str(e)}"
+
+async def open_tab_wrapper(args: OpenTabArgs, tool_context=None):
+    """Tool opening a new tab (optionally at a URL) and making it the active tab."""
+    browser_controller = get_browser_controller(tool_context)
+    
+    if not browser_controller:
+        logger.error("Browser controller not available for opening a tab")
+        return "Error: Browser controller is not available."
+    
+    try:
+        index = await _call_recorded(tool_context, browser_controller, "open_tab", url=args.url)
+        return f"Opened tab {index}{' at ' + args.url if args.url else ''}; it is now the active tab."
+    except Exception as e:
+        logger.error("Open tab error: %s", e)
+        return f"Error when opening a tab: {str(e)}"
+
+async def switch_tab_wrapper(args: TabArgs, tool_context=None):
+    """Tool making another open tab the active one."""
+    browser_controller = get_browser_controller(tool_context)
+    
+    if not browser_controller:
+        logger.error("Browser controller not available for switching tabs")
+        return "Error: Browser controller is not available."
+    if args.index is None:
+        return "Error: give the index of the tab to switch to (see list_tabs_wrapper)."
+    
+    try:
+        success = await _call_recorded(tool_context, browser_controller, "switch_tab", index=args.index)
+        return f"Switched to tab {args.index}." if success else f"Failed to switch: there is no tab {args.index}."
+    except Exception as e:
+        logger.error("Switch tab error: %s", e)
+        return f"Error when switching tabs: {str(e)}"
+
+async def close_tab_wrapper(args: TabArgs, tool_context=None):
+    """Tool closing a tab (the active one by default)."""
+    browser_controller = get_browser_controller(tool_context)
+    
+    if not browser_controller:
+        logger.error("Browser controller not available for closing a tab")
+        return "Error: Browser controller is not available."
+    
+    try:
+        success = await _call_recorded(tool_context, browser_controller, "close_tab", index=args.index)
+        if not success:
+            return "Failed to close the tab: it does not exist or is the last open tab."
+        return "Closed the tab. Open tabs:\n" + format_tabs(await _resolve(browser_controller.list_tabs()))
+    except Exception as e:
+        logger.error("Close tab error: %s", e)
+        return f"Error when closing the tab: {str(e)}"
+
+async def fan_out_wrapper(args: FanOutArgs, tool_context=None):
+    """Tool loading several URLs at once in parallel tabs and returning each page's text or screenshot."""
+    browser_controller = get_browser_controller(tool_context)
+    
+    if not browser_controller:
+        logger.error("Browser controller not available for fan-out")
+        return "Error: Browser controller is not available."
+    if not args.urls:
+        return "Error: give at least one URL."
+    
+    try:
+        kwargs = dict(urls=args.urls, extract=args.extract or "text", keep_open=bool(args.keep_open))
+        if kwargs["keep_open"]:
+            # Kept tabs change what later steps act on, so replays need them too
+            results = await _call_recorded(tool_context, browser_controller, "fan_out", **kwargs)
+        else:
+            results = await _resolve(browser_controller.fan_out(**kwargs))
+        note = f"Only the first {MAX_FAN_OUT_TABS} URLs were loaded.\n\n" if len(args.urls) > MAX_FAN_OUT_TABS else ""
+        if kwargs["extract"] == "screenshot":
+            note += "The screenshots are attached to your next request and discarded after the next action.\n\n"
+        return note + format_fan_out(results)
+    except Exception as e:
+        logger.error("Fan-out error: %s", e)
+        return f"Error when loading tabs: {str(e)}"
+
+async def click_element_id_wrapper(args: ElementClickArgs, tool_context=None):
+    """Tool for clicking an element by its id from list_elements."""
+    browser_controller = get_browser_controller(tool_context)
+    
+    if not browser_controller:
+        logger.error("Browser controller not available for click operation")
+        return "Error: Browser controller is not available."
+    
+    try:
+        success = await _call_recorded(tool_context, browser_controller, "click_element", element_id=args.element_id)
+        if not success:
+            return f"Failed to click element [{args.element_id}]. The element list may be stale - call list_elements_wrapper again."
+        return f"Clicked element [{args.element_id}]"
+    except Exception as e:
+        logger.error("Click element error: %s", e)
+        return f"Error when clicking element: {str(e)}"
+
+async def type_into_element_wrapper(args: ElementTypeArgs, tool_context=None):
+    """Tool for typing text into an element by its id from list_elements."""
+    browser_controller = get_browser_controller(tool_context)
+    
+    if not browser_controller:
+        logger.error("Browser controller not available for type operation")
+        return "Error: Browser controller is not available."
     
-    # Print a clear separator to make the prompt stand out
-    print("\n" + "="*50)
-    print("👤 HUMAN INPUT REQUIRED:")
-    print(prompt)
-    print("="*50)
+    try:
+        success = await _call_recorded(tool_context, browser_controller, "type_into", element_id=args.element_id, text=args.text,
+                                       mode=args.mode)
+        if not success:
+            return f"Failed to type into element [{args.element_id}]. The element list may be stale - call list_elements_wrapper again."
+        return f"Typed text into element [{args.element_id}]: '{args.text}'"
+    except Exception as e:
+        logger.error("Type into element error: %s", e)
+        return f"Error when typing into element: {str(e)}"
+
+async def _run_action_step(browser_controller, step: ActionStep, tool_context=None):
+    """Run one step of an action sequence. Returns (success, description)."""
+    if step.action == 'click' and step.click:
+        success = await _call_recorded(tool_context, browser_controller, "click",
+            x=step.click.points.x,
+            y=step.click.points.y,
+            label=step.click.label,
+            in_zoom=bool(step.click.in_zoom)
+        )
+        return success, f"click at ({step.click.points.x}, {step.click.points.y})"
+    if step.action == 'type_text' and step.type_text:
+        success = await _call_recorded(tool_context, browser_controller, "type_text",
+            text=step.type_text.text,
+            label=step.type_text.label,
+            mode=step.type_text.mode
+        )
+        return success, f"type text '{step.type_text.text}'"
+    if step.action == 'scroll' and step.scroll:
+        points = step.scroll.points
+        direction = step.scroll.direction or "down"
+        amount = step.scroll.amount or 500
+        success = await _call_recorded(tool_context, browser_controller, "scroll",
+            direction=direction,
+            amount=amount,
+            x=points.x if points else None,
+            y=points.y if points else None
+        )
+        return success, f"scroll {direction} by {amount} pixels"
+    if step.action == 'keypress' and step.keypress:
+        success = await _call_recorded(tool_context, browser_controller, "press_keys",
+            keys=step.keypress.keys
+        )
+        return success, f"press keys {', '.join(step.keypress.keys)}"
+    return False, f"{step.action} (missing '{step.action}' arguments)"
+
+async def perform_actions_wrapper(args: ActionSequenceArgs, tool_context=None):
+    """Tool for performing several browser actions back to back, stopping at the first failure."""
+    browser_controller = get_browser_controller(tool_context)
+    
+    if not browser_controller:
+        logger.error("Browser controller not available for action sequence")
+        return "Error: Browser controller is not available."
+    
+    # Each controller action waits for the page to settle before the next step runs
+    completed = []
+    for index, step in enumerate(args.actions, start=1):
+        try:
+            success, description = await _run_action_step(browser_controller, step, tool_context)
+        except Exception as e:
+            logger.error("Action sequence error at step %d: %s", index, e)
+            success, description = False, f"{step.action} (error: {e})"
+        if not success:
+            skipped = len(args.actions) - index
+            return (f"Completed {len(completed)} of {len(args.actions)} steps: {'; '.join(completed) or 'none'}. "
+                    f"Step {index} failed: {description}. {skipped} remaining steps were not run.")
+        completed.append(description)
+    
+    return f"Completed all {len(args.actions)} steps: {'; '.join(completed)}"
+
+async def get_user_input_wrapper(prompt: str, tool_context=None) -> str:
+    """Tool for getting input from the human user."""
+    logger.info("Requesting user input: %s", prompt)
     
-    # Get the user's input
-    user_response = input("Your response: ")
+    # The run's broker (or the shared console one) queues the question; awaiting the answer
+    # suspends only this run
+    broker = get_session_resource(tool_context, "human_input") or default_broker()
+    on_queued = lambda request: emit_event(tool_context, HumanInputRequested, request_id=request.request_id,
+                                           prompt=prompt, timeout_s=broker.timeout_s)
+    user_response = await broker.ask(prompt, session_id=resolve_session_id(tool_context), on_queued=on_queued)
     
-    print(f"[INFO] Received user input: {user_response[:20]}{'...' if len(user_response) > 20 else ''}")
+    if user_response is None:
+        logger.warning("No user input within %s s", broker.timeout_s)
+        return f"No answer from the user within {broker.timeout_s:.0f} seconds. Continue without this information or fail the task."
+    logger.info("Received user input %s", redact(user_response))
+    recorder = get_session_resource(tool_context, "trajectory_recorder")
+    if recorder is not None:
+        recorder.add_human_answer(user_response)
     return user_response
 
 # Create the FunctionTool instances with the proper wrapper functions
@@ -133,6 +384,16 @@ click_tool = FunctionTool(click_element_wrapper)
 type_tool = FunctionTool(type_text_wrapper)
 scroll_tool = FunctionTool(scroll_page_wrapper)
 keypress_tool = FunctionTool(press_keys_wrapper)
+action_sequence_tool = FunctionTool(perform_actions_wrapper)
+list_elements_tool = FunctionTool(list_elements_wrapper)
+click_element_id_tool = FunctionTool(click_element_id_wrapper)
+type_into_element_tool = FunctionTool(type_into_element_wrapper)
+zoom_tool = FunctionTool(zoom_region_wrapper)
+list_tabs_tool = FunctionTool(list_tabs_wrapper)
+open_tab_tool = FunctionTool(open_tab_wrapper)
+switch_tab_tool = FunctionTool(switch_tab_wrapper)
+close_tab_tool = FunctionTool(close_tab_wrapper)
+fan_out_tool = FunctionTool(fan_out_wrapper)
 get_user_input_tool = FunctionTool(get_user_input_wrapper)
 
 # Export the tools
@@ -141,5 +402,15 @@ __all__ = [
     'type_tool',
     'scroll_tool',
     'keypress_tool',
+    'action_sequence_tool',
+    'list_elements_tool',
+    'click_element_id_tool',
+    'type_into_element_tool',
+    'zoom_tool',
+    'list_tabs_tool',
+    'open_tab_tool',
+    'switch_tab_tool',
+    'close_tab_tool',
+    'fan_out_tool',
     'get_user_input_tool',
 ]
@@ -0,0 +1,233 @@
+"""Span-based latency tracing of loop iterations, model calls, tool calls and browser actions."""
+
+import contextvars
+import functools
+import inspect
+import json
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+# Span id of the innermost open `with tracer.span(...)` block in this thread/task
+_CURRENT_SPAN: contextvars.ContextVar = contextvars.ContextVar("orbit_current_span", default=None)
+
+class Span:
+    """One timed operation with free-form attributes (bytes, tokens, action type, ...)."""
+
+    __slots__ = ("name", "span_id", "parent_id", "trace_id", "start", "end", "attributes")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.name = name
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.trace_id = trace_id
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.attributes = attributes
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end if self.end is not None else time.perf_counter()
+        return (end - self.start) * 1000
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "duration_ms": self.duration_ms,
+            "attributes": self.attributes,
+        }
+
+class _NoopSpan:
+    """Shared stand-in returned when tracing is disabled; every operation does nothing."""
+
+    __slots__ = ()
+
+    def set(self, **attributes):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+NOOP_SPAN = _NoopSpan()
+
+class _ActiveSpan:
+    """Context manager that opens a span, makes it the parent of nested spans and closes it."""
+
+    __slots__ = ("tracer", "span", "token")
+
+    def __init__(self, tracer: "Tracer", span: Span):
+        self.tracer = tracer
+        self.span = span
+        self.token = None
+
+    def __enter__(self) -> Span:
+        self.token = _CURRENT_SPAN.set(self.span.span_id)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        _CURRENT_SPAN.reset(self.token)
+        if exc_type is not None:
+            self.span.attributes["error"] = repr(exc)
+        self.tracer.finish(self.span)
+        return False
+
+class Tracer:
+    """
+    Collects finished spans of one run in a bounded buffer.
+
+    A disabled tracer hands out NOOP_SPAN, so instrumented code only pays for an
+    attribute check. Spans opened with span() nest through a context variable;
+    start_span()/finish_pending() cover pairs of callbacks (before/after model, tool, loop
+    iteration) where no block can wrap the work.
+    """
+
+    def __init__(self, enabled: bool = True, trace_id: Optional[str] = None, max_spans: int = 50000):
+        """
+        Args:
+            enabled: False turns every span into a no-op
+            trace_id: Id shared by all spans of the run (defaults to a random id)
+            max_spans: Number of finished spans kept; the oldest are dropped beyond it
+        """
+        self.enabled = enabled
+        self.trace_id = trace_id or uuid.uuid4().hex
+        self.spans = deque(maxlen=max_spans)
+        self._pending: Dict[Any, Span] = {}
+        self._lock = threading.Lock()
+
+    def span(self, name: str, **attributes):
+        """Context manager timing the enclosed block."""
+        if not self.enabled:
+            return NOOP_SPAN
+        return _ActiveSpan(self, Span(name, self.trace_id, _CURRENT_SPAN.get(), attributes))
+
+    def start_span(self, key: Any, name: str, **attributes):
+        """Open a span that is closed later by finish_pending(key)."""
+        if not self.enabled:
+            return NOOP_SPAN
+        span = Span(name, self.trace_id, _CURRENT_SPAN.get(), attributes)
+        with self._lock:
+            self._pending[key] = span
+        return span
+
+    def finish_pending(self, key: Any, **attributes) -> Optional[Span]:
+        """Close the span opened by start_span(key), adding attributes."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            span = self._pending.pop(key, None)
+        if span is not None:
+            span.attributes.update(attributes)
+            self.finish(span)
+        return span
+
+    def finish(self, span: Span):
+        span.end = time.perf_counter()
+        self.spans.append(span)
+
+    # --- Export ---
+
+    def export_jsonl(self, path: str):
+        """Append every finished span to a JSON lines file."""
+        with open(path, "a", encoding="utf-8") as f:
+            for span in list(self.spans):
+                f.write(json.dumps(span.to_dict(), default=str) + "\n")
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Return count, total, mean, p50, p95 and max duration per span name, slowest total first."""
+        durations: Dict[str, List[float]] = {}
+        for span in list(self.spans):
+            durations.setdefault(span.name, []).append(span.duration_ms)
+        rows = []
+        for name, values in durations.items():
+            values.sort()
+            rows.append({
+                "name": name,
+                "count": len(values),
+                "total_ms": sum(values),
+                "mean_ms": sum(values) / len(values),
+                "p50_ms": values[int(0.5 * (len(values) - 1))],
+                "p95_ms": values[int(0.95 * (len(values) - 1))],
+                "max_ms": values[-1],
+            })
+        rows.sort(key=lambda row: row["total_ms"], reverse=True)
+        return rows
+
+    def format_summary(self) -> str:
+        """Render summary() as a fixed-width table."""
+        rows = self.summary()
+        if not rows:
+            return "No spans recorded."
+        width = max(len("span"), max(len(row["name"]) for row in rows))
+        lines = [f"{'span':<{width}} {'count':>6} {'total ms':>10} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}"]
+        for row in rows:
+            lines.append(
+                f"{row['name']:<{width}} {row['count']:>6} {row['total_ms']:>10.1f} {row['mean_ms']:>9.1f} "
+                f"{row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['max_ms']:>9.1f}"
+            )
+        return "\n".join(lines)
+
+# Default for controllers and runs without tracing
+NULL_TRACER = Tracer(enabled=False)
+
+def traced(name: str, attributes: Optional[Callable[[Any, Any], Dict[str, Any]]] = None):
+    """
+    Decorate a sync or async browser controller method so it runs in a span of
+    self.tracer. attributes(self, result) may add attributes once the call returned.
+    """
+    def decorator(method):
+        if inspect.iscoroutinefunction(method):
+            @functools.wraps(method)
+            async def async_wrapper(self, *args, **kwargs):
+                tracer = self.tracer
+                if not tracer.enabled:
+                    return await method(self, *args, **kwargs)
+                with tracer.span(name) as span:
+                    result = await method(self, *args, **kwargs)
+                    if attributes is not None:
+                        span.set(**(attributes(self, result) or {}))
+                    return result
+            return async_wrapper
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            tracer = self.tracer
+            if not tracer.enabled:
+                return method(self, *args, **kwargs)
+            with tracer.span(name) as span:
+                result = method(self, *args, **kwargs)
+                if attributes is not None:
+                    span.set(**(attributes(self, result) or {}))
+                return result
+        return wrapper
+    return decorator
+
+def action_attributes(controller, result) -> Dict[str, Any]:
+    return {"success": bool(result)}
+
+def typing_attributes(controller, result) -> Dict[str, Any]:
+    attributes = {"success": bool(result)}
+    if result and controller.typing_recorder.last:
+        attributes["strategy"] = controller.typing_recorder.last["used"]
+        attributes["chars"] = controller.typing_recorder.last["chars"]
+    return attributes
+
+def capture_attributes(controller, result) -> Dict[str, Any]:
+    return dict(controller.last_capture_stats or {})
+
+def fan_out_attributes(controller, result) -> Dict[str, Any]:
+    last = controller.fan_out_recorder.history[-1] if controller.fan_out_recorder.history else {}
+    return dict(last)
+
+def settle_attributes(controller, result) -> Dict[str, Any]:
+    return dict(controller.settle_recorder.last or {}) if controller.settle_options.enabled else {"fixed_sleep": True}
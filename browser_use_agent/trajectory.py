@@ -0,0 +1,240 @@
+"""Record successful runs and replay them for repeated goals."""
+
+import hashlib
+import inspect
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+from .logging_config import get_logger
+
+logger = get_logger("runner")
+
+class TrajectoryStep(BaseModel):
+    """One browser controller call and the page it was made on."""
+    method: str = Field(description="BrowserController method, e.g. 'click' or 'type_into'")
+    kwargs: Dict[str, Any] = Field(description="Keyword arguments of the call")
+    fingerprint: Dict[str, Any] = Field(description="Page fingerprint taken before the call")
+
+class Trajectory(BaseModel):
+    """The action trace of a successful run."""
+    goal: str
+    url: str
+    steps: List[TrajectoryStep]
+    final_fingerprint: Optional[Dict[str, Any]] = None
+    task_result: str = ""
+    task_completion_reason: str = ""
+    created_at: float = Field(default_factory=time.time)
+
+# Whether the focused field takes secrets: passwords, one-time codes and card details
+SENSITIVE_FIELD_SCRIPT = """
+() => {
+    const el = document.activeElement;
+    if (!el) return false;
+    const autocomplete = (el.getAttribute('autocomplete') || '').toLowerCase();
+    return (el.type || '').toLowerCase() === 'password' || /(password|one-time-code|cc-)/.test(autocomplete);
+}
+"""
+
+# Controller methods whose text argument is typed into the page
+TYPING_METHODS = ("type_text", "type_into")
+
+class TrajectoryRecorder:
+    """
+    Collects the successful controller calls of one run, registered per session.
+
+    Replaying needs the typed text verbatim, so a run that typed into a password,
+    one-time code or card field, or typed an answer the human gave, is marked
+    sensitive (sensitive_reason) and its trajectory is never cached.
+    """
+
+    def __init__(self):
+        self.steps: List[TrajectoryStep] = []
+        self.sensitive_reason: Optional[str] = None
+        self._human_answers: List[str] = []
+
+    def record(self, method: str, kwargs: Dict[str, Any], fingerprint: Dict[str, Any]):
+        self.steps.append(TrajectoryStep(method=method, kwargs=kwargs, fingerprint=fingerprint))
+        text = kwargs.get("text") if method in TYPING_METHODS else None
+        if text and any(answer in text for answer in self._human_answers):
+            self.mark_sensitive("typed a human answer")
+
+    def add_human_answer(self, answer: str):
+        """Remember an answer from get_user_input; typing it marks the run sensitive."""
+        if answer.strip():
+            self._human_answers.append(answer.strip())
+
+    def mark_sensitive(self, reason: str):
+        if self.sensitive_reason is None:
+            logger.info("Run %s, its trajectory will not be cached", reason)
+            self.sensitive_reason = reason
+
+def fingerprints_match(expected: Optional[Dict[str, Any]], actual: Optional[Dict[str, Any]], threshold: float = 0.8) -> bool:
+    """
+    Compare two page fingerprints: same URL (ignoring the fragment) and a Jaccard
+    similarity of the interactive element sets of at least threshold.
+    """
+    if not expected or not actual:
+        return False
+    if expected["url"].split("#")[0] != actual["url"].split("#")[0]:
+        return False
+    expected_elements = set(expected.get("elements", []))
+    actual_elements = set(actual.get("elements", []))
+    if not expected_elements and not actual_elements:
+        return True
+    overlap = len(expected_elements & actual_elements) / len(expected_elements | actual_elements)
+    return overlap >= threshold
+
+async def _resolve(result):
+    if inspect.isawaitable(result):
+        return await result
+    return result
+
+async def replay_trajectory(browser_controller, trajectory: Trajectory, recorder: Optional[TrajectoryRecorder] = None,
+                            threshold: float = 0.8) -> int:
+    """
+    Replay a trajectory on a sync or async controller until a step's fingerprint diverges
+    or a step fails.
+
+    Returns:
+        int: Number of steps replayed successfully
+    """
+    replayed = 0
+    for step in trajectory.steps:
+        fingerprint = await _resolve(browser_controller.fingerprint())
+        if not fingerprints_match(step.fingerprint, fingerprint, threshold):
+            logger.info("Trajectory diverged at step %s/%s (%s)", replayed + 1, len(trajectory.steps), step.method)
+            break
+        success = await _resolve(getattr(browser_controller, step.method)(**step.kwargs))
+        if not success:
+            logger.info("Trajectory step %s/%s (%s) failed during replay", replayed + 1, len(trajectory.steps), step.method)
+            break
+        if recorder is not None:
+            recorder.record(step.method, step.kwargs, fingerprint)
+        replayed += 1
+    return replayed
+
+def replay_trajectory_sync(browser_controller, trajectory: Trajectory, recorder: Optional[TrajectoryRecorder] = None,
+                           threshold: float = 0.8) -> int:
+    """Same as replay_trajectory for the sync BrowserController."""
+    replayed = 0
+    for step in trajectory.steps:
+        fingerprint = browser_controller.fingerprint()
+        if not fingerprints_match(step.fingerprint, fingerprint, threshold):
+            logger.info("Trajectory diverged at step %s/%s (%s)", replayed + 1, len(trajectory.steps), step.method)
+            break
+        if not getattr(browser_controller, step.method)(**step.kwargs):
+            logger.info("Trajectory step %s/%s (%s) failed during replay", replayed + 1, len(trajectory.steps), step.method)
+            break
+        if recorder is not None:
+            recorder.record(step.method, step.kwargs, fingerprint)
+        replayed += 1
+    return replayed
+
+class TrajectoryCache:
+    """
+    On-disk cache of trajectories keyed by goal and start URL.
+
+    Entries older than ttl_seconds are dropped on lookup, and the least recently used
+    entries are evicted once more than max_entries are stored.
+
+    Entries are plain JSON including the typed text, which replays need verbatim. Runs
+    whose TrajectoryRecorder is marked sensitive (secrets typed) are not saved but
+    counted under skipped_sensitive.
+    """
+
+    def __init__(self, directory: str, max_entries: int = 100, ttl_seconds: Optional[float] = 7 * 24 * 3600):
+        """
+        Args:
+            directory: Directory holding one JSON file per trajectory
+            max_entries: Number of trajectories kept before LRU eviction
+            ttl_seconds: Age after which a trajectory is no longer replayed (None = never)
+        """
+        self.directory = directory
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "evicted": 0, "saved": 0,
+                       "replayed_steps": 0, "full_replays": 0, "partial_replays": 0, "skipped_sensitive": 0}
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(goal: str, url: str) -> str:
+        return hashlib.sha256(f"{goal.strip()}\n{url.strip()}".encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, goal: str, url: str) -> Optional[Trajectory]:
+        """Return the cached trajectory for a goal and URL, or None."""
+        path = self._path(self.key(goal, url))
+        with self._lock:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    trajectory = Trajectory.model_validate_json(f.read())
+            except (OSError, ValueError):
+                self._stats["misses"] += 1
+                return None
+            if self.ttl_seconds is not None and time.time() - trajectory.created_at > self.ttl_seconds:
+                os.remove(path)
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return None
+            # The file's mtime tracks recency for LRU eviction
+            os.utime(path, None)
+            self._stats["hits"] += 1
+            return trajectory
+
+    def save(self, trajectory: Trajectory):
+        """Store a trajectory and evict the least recently used ones beyond max_entries."""
+        path = self._path(self.key(trajectory.goal, trajectory.url))
+        with self._lock:
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(trajectory.model_dump_json())
+            os.replace(tmp_path, path)
+            self._stats["saved"] += 1
+            self._evict()
+
+    def record_sensitive(self, recorder: TrajectoryRecorder):
+        """Count a successful run that is not saved because it typed secrets."""
+        logger.info("Not caching the trajectory: run %s", recorder.sensitive_reason)
+        with self._lock:
+            self._stats["skipped_sensitive"] += 1
+
+    def record_replay(self, replayed: int, completed: bool):
+        """
+        Count a replay of a cached trajectory.
+
+        Args:
+            replayed: Steps replayed before the replay stopped or ran out
+            completed: Whether the run finished from the replay alone; a replay of every step
+                that ends on a different page hands over to the LLM loop and counts as partial
+        """
+        with self._lock:
+            self._stats["replayed_steps"] += replayed
+            if completed:
+                self._stats["full_replays"] += 1
+            else:
+                self._stats["partial_replays"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counts, evictions and replay outcomes."""
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+    def _evict(self):
+        entries = [os.path.join(self.directory, name) for name in os.listdir(self.directory) if name.endswith(".json")]
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort(key=os.path.getmtime)
+        for path in entries[:len(entries) - self.max_entries]:
+            os.remove(path)
+            self._stats["evicted"] += 1
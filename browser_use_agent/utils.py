@@ -13,17 +13,41 @@ def extract_json_from_markdown(text):
     else:
         raise ValueError("Could not extract JSON from the markdown")
 
-def correct_coordinates(x, y):
-    
-    model_coord_range = 1000.0
+def correct_coordinates(x, y, viewport_width=1024, viewport_height=768, region=None):
+    """
+    Map model coordinates (0-1000 on both axes) to CSS pixels of the page.
+
+    Mouse events take CSS pixels whatever the device scale factor, and captures are
+    taken at CSS scale, so only the viewport size matters here.
 
-    # Calculate the scaling factor for each dimension
-    x_scale_factor = 1024 / model_coord_range
-    y_scale_factor = 768 / model_coord_range
+    Args:
+        x: X-coordinate in model scale (0-1000)
+        y: Y-coordinate in model scale (0-1000)
+        viewport_width: Width of the page viewport in CSS pixels
+        viewport_height: Height of the page viewport in CSS pixels
+        region: Optional (left, top, width, height) rectangle in CSS pixels, e.g. a zoom
+            crop, the coordinates are relative to instead of the whole viewport
+
+    Returns:
+        Tuple of the x and y page coordinates, clamped to the viewport
+    """
+    model_coord_range = 1000.0
+    left, top, width, height = region or (0, 0, viewport_width, viewport_height)
 
-    # Apply the scaling factors to the raw coordinates from the model
-    x_original = x * x_scale_factor
-    y_original = y * y_scale_factor
+    x_original = left + x * width / model_coord_range
+    y_original = top + y * height / model_coord_range
 
-    return x_original, y_original
+    return min(max(x_original, 0), viewport_width - 1), min(max(y_original, 0), viewport_height - 1)
 
+def zoom_rectangle(x1, y1, x2, y2, viewport_width, viewport_height, min_size=32):
+    """
+    Turn two corners in model scale (0-1000) into a (left, top, width, height) rectangle
+    in CSS pixels that lies inside the viewport and is at least min_size pixels on each side.
+    """
+    left, top = correct_coordinates(min(x1, x2), min(y1, y2), viewport_width, viewport_height)
+    right, bottom = correct_coordinates(max(x1, x2), max(y1, y2), viewport_width, viewport_height)
+    width = min(max(right - left, min_size), viewport_width)
+    height = min(max(bottom - top, min_size), viewport_height)
+    left = max(min(left, viewport_width - width), 0)
+    top = max(min(top, viewport_height - height), 0)
+    return left, top, width, height
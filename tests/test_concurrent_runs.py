@@ -0,0 +1,68 @@
+"""Concurrent runs in one process stay on their own browser, offline: scripted models and local fixtures."""
+
+import asyncio
+import os
+import time
+
+import pytest
+
+pytest.importorskip("playwright")
+pytest.importorskip("google.adk")
+
+from benchmarks.fake_llm import GoalScriptedLlm, ScriptedLlm, scripted_agents
+from benchmarks.scenarios import click_id, complete, list_elements, type_into
+from benchmarks.server import FixtureServer
+from browser_use_agent.runner import run_browser_agent_async, run_browser_agents_async
+
+def chromium_installed() -> bool:
+    from playwright.sync_api import sync_playwright
+    with sync_playwright() as playwright:
+        return os.path.exists(playwright.chromium.executable_path)
+
+pytestmark = pytest.mark.skipif(not chromium_installed(), reason="Playwright's Chromium is not installed")
+
+NAMES = ["Ada Lovelace", "Grace Hopper", "Alan Turing"]
+
+def sign_up_script(name):
+    return [list_elements(), type_into(0, name), list_elements(), click_id(3), complete(f"Signed up {name}")]
+
+def typed_texts(result):
+    """Text of the run's own type_into responses, from its ADK events."""
+    texts = []
+    for event in result["events"]:
+        for part in (event.content.parts if event.content else None) or []:
+            response = part.function_response
+            if response is not None and response.name == "type_into_element_wrapper":
+                texts.append(str(response.response))
+    return texts
+
+async def run_all(tasks, coordinator):
+    started = time.perf_counter()
+    sequential = [await run_browser_agent_async(**task) for task in tasks]
+    sequential_s = time.perf_counter() - started
+
+    coordinator.reset()
+    started = time.perf_counter()
+    concurrent = await run_browser_agents_async(tasks, max_concurrency=len(tasks))
+    return sequential, sequential_s, concurrent, time.perf_counter() - started
+
+def test_concurrent_runs_are_isolated_and_faster():
+    goals = {f"Sign up as {name}": name for name in NAMES}
+    # Simulated model latency is what concurrent runs overlap
+    coordinator = GoalScriptedLlm(scripts={goal: sign_up_script(name) for goal, name in goals.items()},
+                                  latency_ms=100)
+    with FixtureServer() as server, scripted_agents(coordinator, ScriptedLlm()):
+        tasks = [{"user_goal": goal, "initial_url": server.url("form.html"), "max_iterations": 6,
+                  "launch_profile": "headless"} for goal in goals]
+        sequential, sequential_s, concurrent, concurrent_s = asyncio.run(run_all(tasks, coordinator))
+
+    assert all(r["success"] and not r["error"] for r in sequential)
+    assert all(r["success"] and not r["error"] for r in concurrent)
+    assert len({r["session_id"] for r in concurrent}) == len(tasks)
+    # Each run only typed its own name
+    for task, result in zip(tasks, concurrent):
+        own = goals[task["user_goal"]]
+        texts = typed_texts(result)
+        assert texts and all(own in text for text in texts)
+        assert not any(other in text for text in texts for other in NAMES if other != own)
+    assert concurrent_s < sequential_s
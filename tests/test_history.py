@@ -0,0 +1,54 @@
+"""ScreenHistory keeps the coordinator prompt the same size however long the run gets."""
+
+import io
+
+import pytest
+
+pytest.importorskip("google.genai")
+Image = pytest.importorskip("PIL.Image")
+
+from google.genai import types
+
+from browser_use_agent.history import ScreenHistory
+
+def screen(shade: int) -> types.Blob:
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 48), (shade, shade, shade)).save(buffer, "PNG")
+    return types.Blob(mime_type="image/png", data=buffer.getvalue())
+
+def prompt_size(content: types.Content):
+    texts = [part.text for part in content.parts if part.text]
+    images = [part for part in content.parts if part.inline_data is not None]
+    return len(texts), len(images), sum(len(text) for text in texts)
+
+def test_prompt_stops_growing_once_frames_are_dropped(tmp_path):
+    history = ScreenHistory(max_inline=2, max_frames=4, blob_dir=str(tmp_path))
+    history.seed(screen(0))
+    sizes = []
+    for iteration in range(1, 31):
+        # Every third screen repeats the previous one
+        shade = (iteration - 1 if iteration % 3 == 0 else iteration) * 40 % 240
+        history.add(iteration, screen(shade))
+        sizes.append(prompt_size(history.to_content()))
+
+    # A summary line plus the last four frames: the same parts and text length for each
+    # position in the repeating pattern, however many iterations came before
+    assert len(history.frames) == 4
+    assert sizes[-1] == sizes[-4] == sizes[-7]
+    assert max(images for _, images, _ in sizes) == 2
+    summary = history.to_content().parts[0].text
+    assert summary.startswith("Screens after iterations 1-26 omitted")
+    assert str(tmp_path) in summary
+    metrics = history.metrics()
+    assert metrics["frames"] == 30
+    assert metrics["listed_frames"] == 4
+    assert metrics["dropped_frames"] == 26
+
+def test_short_runs_list_every_frame():
+    history = ScreenHistory(max_inline=2, max_frames=4)
+    history.seed(screen(0))
+    for iteration in range(1, 4):
+        history.add(iteration, screen(iteration * 60))
+    parts = history.to_content().parts
+    assert not parts[0].text.startswith("Screens after iterations")
+    assert history.metrics()["dropped_frames"] == 0
@@ -0,0 +1,83 @@
+"""HttpResponseCache never serves one identity's responses to another."""
+
+import pytest
+
+pytest.importorskip("pydantic")
+
+from browser_use_agent.http_cache import HttpResponseCache, request_credentials
+
+URL = "https://app.example.com/api/account"
+BODY = b'{"email": "ada@example.com"}'
+
+class FakeResponse:
+    def __init__(self, headers):
+        self.status = 200
+        self.headers = headers
+
+    def body(self):
+        return BODY
+
+class FakeRequest:
+    method = "GET"
+    resource_type = "fetch"
+
+    def __init__(self, url, headers):
+        self.url = url
+        self._headers = headers
+
+    def all_headers(self):
+        return self._headers
+
+class FakeRoute:
+    """Route of one request; fetch() answers with response_headers."""
+
+    def __init__(self, request_headers, response_headers):
+        self.request = FakeRequest(URL, request_headers)
+        self.response_headers = response_headers
+        self.fetched = False
+        self.fulfilled = None
+
+    def fetch(self):
+        self.fetched = True
+        return FakeResponse(self.response_headers)
+
+    def fulfill(self, **kwargs):
+        self.fulfilled = kwargs
+
+    def fallback(self):
+        pass
+
+    def abort(self, error_code=None):
+        pass
+
+def test_private_responses_are_not_stored(tmp_path):
+    cache = HttpResponseCache(str(tmp_path))
+    stored = cache.store(URL, "fetch", 200, {"Cache-Control": "private, max-age=600"}, BODY)
+    assert not stored
+    assert cache.lookup(URL) is None
+    # Not even offline mode, which ignores age, has it
+    assert HttpResponseCache(str(tmp_path), offline=True).lookup(URL) is None
+
+def test_credentialed_responses_are_only_served_to_the_same_credentials(tmp_path):
+    cache = HttpResponseCache(str(tmp_path))
+    public = {"cache-control": "max-age=600"}
+
+    first = FakeRoute({"cookie": "session=alice"}, public)
+    cache.handle(first)
+    assert first.fetched
+
+    # Another identity and an anonymous request go to the network
+    for headers in ({"cookie": "session=bob"}, {"authorization": "Bearer bob"}, {}):
+        other = FakeRoute(headers, public)
+        cache.handle(other)
+        assert other.fetched
+
+    again = FakeRoute({"cookie": "session=alice"}, public)
+    cache.handle(again)
+    assert not again.fetched
+    assert again.fulfilled["body"] == BODY
+
+    # Offline replay keeps the separation
+    offline = HttpResponseCache(str(tmp_path), offline=True)
+    assert offline.lookup(URL, request_credentials({"cookie": "session=bob"})) is not None
+    assert offline.lookup(URL, request_credentials({"Cookie": "session=carol"})) is None
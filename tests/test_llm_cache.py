@@ -0,0 +1,63 @@
+"""LlmResponseCache keeps responses that may carry secrets off its disk tier."""
+
+import os
+
+import pytest
+
+pytest.importorskip("google.adk")
+
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+
+from browser_use_agent.llm_cache import LlmResponseCache
+
+SECRET = "hunter2-correct-horse"
+
+def request(*parts: types.Part) -> LlmRequest:
+    return LlmRequest(model="gemini-test", contents=[
+        types.Content(role="user", parts=[types.Part(text="Log in to the account")]),
+        *[types.Content(role="user", parts=[part]) for part in parts],
+    ])
+
+def call_response(name: str, args: dict) -> LlmResponse:
+    return LlmResponse(content=types.Content(role="model", parts=[
+        types.Part(function_call=types.FunctionCall(name=name, args=args))
+    ]))
+
+def cached(cache: LlmResponseCache, llm_request: LlmRequest, llm_response: LlmResponse):
+    """Miss, then store the response as the model callbacks do."""
+    call_id = ("invocation", "BrowserActionExecutorAgent")
+    assert cache.lookup("run", call_id, llm_request) is None
+    cache.store(call_id, llm_response)
+
+def disk_contents(directory) -> str:
+    return "".join(open(os.path.join(directory, name), encoding="utf-8").read() for name in os.listdir(directory))
+
+def test_typed_secret_is_not_written(tmp_path):
+    cache = LlmResponseCache(directory=str(tmp_path))
+    llm_request = request()
+    cached(cache, llm_request, call_response("type_text_wrapper", {"args": {"text": SECRET, "label": "Password"}}))
+
+    assert SECRET not in disk_contents(tmp_path)
+    assert cache.stats()["kept_off_disk"] == 1
+    assert cache.stats()["disk_bytes"] == 0
+    # Still served from memory within the process
+    assert cache.lookup("run", ("next", "BrowserActionExecutorAgent"), llm_request) is not None
+
+def test_response_after_user_input_is_not_written(tmp_path):
+    cache = LlmResponseCache(directory=str(tmp_path))
+    answer = types.Part(function_response=types.FunctionResponse(name="get_user_input_wrapper",
+                                                                 response={"result": SECRET}))
+    cached(cache, request(answer), call_response("click_element_id_wrapper", {"args": {"element_id": 3}}))
+
+    assert os.listdir(tmp_path) == []
+    assert cache.stats()["kept_off_disk"] == 1
+
+def test_other_responses_are_written(tmp_path):
+    cache = LlmResponseCache(directory=str(tmp_path))
+    cached(cache, request(), call_response("click_element_id_wrapper", {"args": {"element_id": 3}}))
+
+    assert "click_element_id_wrapper" in disk_contents(tmp_path)
+    assert cache.stats()["kept_off_disk"] == 0
+    # A fresh cache on the same directory serves it from disk
+    assert LlmResponseCache(directory=str(tmp_path)).lookup("run", ("x", "y"), request()) is not None
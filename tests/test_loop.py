@@ -0,0 +1,64 @@
+"""The step callbacks run once per loop iteration and the loop stops on mark_task_complete, offline."""
+
+import asyncio
+import io
+
+import pytest
+
+pytest.importorskip("google.adk", minversion="2.12")
+Image = pytest.importorskip("PIL.Image")
+
+from google.genai import types
+
+from benchmarks.fake_llm import ScriptedLlm, scripted_agents
+from benchmarks.scenarios import complete, list_elements
+from browser_use_agent import runner as runner_module
+from browser_use_agent.async_browser import AsyncBrowserController
+
+def blank_png() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 48), "white").save(buffer, "PNG")
+    return buffer.getvalue()
+
+class FakePage:
+    url = "about:blank"
+
+class FakeController(AsyncBrowserController):
+    """AsyncBrowserController without a browser: a blank page that never changes."""
+
+    async def start(self):
+        self.page = FakePage()
+
+    async def navigate(self, url: str):
+        self.page.url = url
+
+    async def screenshot(self) -> types.Part:
+        data = blank_png()
+        self.last_capture_stats = {"format": "png", "bytes": len(data), "capture_ms": 0.0, "encode_ms": 0.0}
+        return types.Part(inline_data=types.Blob(mime_type="image/png", data=data))
+
+    async def list_elements(self):
+        return []
+
+    async def close(self):
+        pass
+
+def test_step_callbacks_run_every_iteration(monkeypatch):
+    monkeypatch.setattr(runner_module, "AsyncBrowserController", FakeController)
+    coordinator = ScriptedLlm(script=[list_elements(), list_elements(), complete("Listed twice")])
+    with scripted_agents(coordinator, ScriptedLlm()):
+        result = asyncio.run(runner_module.run_browser_agent_async(
+            user_goal="List the page's elements twice", initial_url="http://fixture.test/", max_iterations=6,
+        ))
+
+    assert result["success"] and not result["error"]
+    # One step per scripted call: mark_task_complete escalated, so the loop ended before max_iterations
+    assert result["metrics"]["models"]["steps"] == 3
+    # after_loop_iteration adds one frame per step; the seeded first screen is not a frame
+    screen_history = result["metrics"]["screen_history"]
+    assert screen_history["frames"] == 3
+    # The page never changes, so every frame after the first screen went out as a note, not an image
+    assert screen_history["inline_images"] == 0
+    # Stopped by the escalation itself, not by the exit_loop check at the start of a fourth step
+    texts = [part.text for event in result["events"] for part in (event.content.parts if event.content else None) or []]
+    assert "Browser task loop finished." not in texts
@@ -0,0 +1,66 @@
+"""The async controller captures the end-of-step frame once per tool call, not after every action."""
+
+import asyncio
+import io
+
+import pytest
+
+pytest.importorskip("playwright")
+pytest.importorskip("google.adk")
+Image = pytest.importorskip("PIL.Image")
+
+from browser_use_agent.async_browser import AsyncBrowserController
+from browser_use_agent.settle import SettleOptions
+
+def blank_png() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 48), "white").save(buffer, "PNG")
+    return buffer.getvalue()
+
+class FakePage:
+    def __init__(self):
+        self.captures = 0
+
+    async def screenshot(self, **kwargs):
+        self.captures += 1
+        return blank_png()
+
+    async def wait_for_timeout(self, ms):
+        pass
+
+def make_controller() -> AsyncBrowserController:
+    controller = AsyncBrowserController(settle_options=SettleOptions(enabled=False))
+    controller.page = FakePage()
+    return controller
+
+def test_action_sequence_captures_once_at_the_end():
+    async def scenario():
+        controller = make_controller()
+        # Three actions of one perform_actions call, then the after-tool callback
+        for action in ("click", "type_text", "press_keys"):
+            await controller._wait_after_action(action, 0)
+        controller.prefetch_frame()
+        # A second tool call that did not act does not capture again
+        controller.prefetch_frame()
+        part = await controller.screenshot()
+        return controller, part
+
+    controller, part = asyncio.run(scenario())
+    assert controller.page.captures == 1
+    assert controller.last_capture_stats["prefetched"]
+    assert controller.pipeline_metrics()["discarded_prefetches"] == 0
+
+def test_superseded_prefetch_is_counted():
+    async def scenario():
+        controller = make_controller()
+        await controller._wait_after_action("click", 0)
+        controller.prefetch_frame()
+        # The executor acted again in the same step
+        await controller._wait_after_action("click", 0)
+        controller.prefetch_frame()
+        await controller.screenshot()
+        return controller
+
+    controller = asyncio.run(scenario())
+    assert controller.pipeline_metrics()["discarded_prefetches"] == 1
+    assert controller.last_capture_stats["prefetched"]
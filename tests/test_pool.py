@@ -0,0 +1,176 @@
+"""BrowserPool and AsyncBrowserPool overflow policies and wait metrics, on fake browsers (no Chromium needed)."""
+
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip("playwright")
+pytest.importorskip("google.adk")
+
+from browser_use_agent import pool as pool_module
+from browser_use_agent.pool import AsyncBrowserPool, BrowserPool
+
+class FakeBrowser:
+    def __init__(self):
+        self.closed = False
+
+    def is_connected(self):
+        return not self.closed
+
+    def close(self):
+        self.closed = True
+
+class FakeChromium:
+    def __init__(self, launch_s=0.0):
+        self.launch_s = launch_s
+
+    def launch(self, **kwargs):
+        time.sleep(self.launch_s)
+        return FakeBrowser()
+
+class FakePlaywright:
+    def __init__(self, launch_s=0.0):
+        self.chromium = FakeChromium(launch_s)
+
+    def stop(self):
+        pass
+
+class FakeController:
+    def __init__(self, browser=None, **kwargs):
+        self.browser = browser
+
+    def close(self):
+        pass
+
+class AsyncFakeBrowser(FakeBrowser):
+    async def close(self):
+        self.closed = True
+
+class AsyncFakeChromium(FakeChromium):
+    async def launch(self, **kwargs):
+        await asyncio.sleep(self.launch_s)
+        return AsyncFakeBrowser()
+
+class AsyncFakePlaywright:
+    def __init__(self, launch_s=0.0):
+        self.chromium = AsyncFakeChromium(launch_s)
+
+    async def stop(self):
+        pass
+
+class AsyncFakeController(FakeController):
+    @classmethod
+    async def create(cls, **kwargs):
+        return cls(**kwargs)
+
+    async def close(self):
+        pass
+
+@pytest.fixture(autouse=True)
+def fake_controller(monkeypatch):
+    monkeypatch.setattr(pool_module, "BrowserController", FakeController)
+    monkeypatch.setattr(pool_module, "AsyncBrowserController", AsyncFakeController)
+
+def make_pool(launch_s=0.0, **kwargs):
+    pool = BrowserPool(size=1, max_contexts_per_browser=1, **kwargs)
+    # start() with a fake Playwright: launch the warm browsers on it
+    pool.playwright = FakePlaywright(launch_s)
+    pool._browsers.append(pool._launch())
+    return pool
+
+async def make_async_pool(launch_s=0.0, **kwargs):
+    pool = AsyncBrowserPool(size=1, max_contexts_per_browser=1, **kwargs)
+    pool.playwright = AsyncFakePlaywright(launch_s)
+    pool._browsers.append(await pool._launch())
+    return pool
+
+def test_share_policy_reuses_the_warm_browser():
+    pool = make_pool(overflow="share")
+    first = pool.acquire()
+    second = pool.acquire()
+    assert first.browser is second.browser
+    metrics = pool.metrics()
+    assert metrics["browsers"] == 1
+    assert metrics["launches"] == 1
+    assert metrics["shared"] == 1
+    assert metrics["overflow_launches"] == 0
+
+def test_launch_policy_closes_the_overflow_browser_on_release():
+    pool = make_pool(overflow="launch", max_overflow=1)
+    first = pool.acquire()
+    second = pool.acquire()
+    third = pool.acquire()
+    assert second.browser is not first.browser
+    # Past max_overflow the context is shared instead of launching again
+    assert third.browser is first.browser
+    assert pool.metrics()["overflow_launches"] == 1
+    assert pool.metrics()["shared"] == 1
+    pool.release(second)
+    assert second.browser.closed
+    assert pool.metrics()["browsers"] == 1
+
+def test_error_policy_raises_when_full():
+    pool = make_pool(overflow="error")
+    pool.acquire()
+    with pytest.raises(RuntimeError):
+        pool.acquire()
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        BrowserPool(overflow="wait")
+
+def test_sync_pool_reports_no_wait_time():
+    # Sync Playwright is single-threaded: acquire() never waits, so there is nothing to measure
+    pool = make_pool(overflow="share")
+    pool.acquire()
+    pool.acquire()
+    assert "avg_wait_ms" not in pool.metrics()
+
+def test_async_wait_policy_waits_for_a_release():
+    async def scenario():
+        pool = await make_async_pool(overflow="wait")
+        first = await pool.acquire()
+        waiting = asyncio.ensure_future(pool.acquire())
+        await asyncio.sleep(0.05)
+        # max_contexts_per_browser=1: the second run waits instead of sharing or launching
+        assert not waiting.done()
+        await pool.release(first)
+        second = await waiting
+        assert second.browser is first.browser
+        return pool.metrics()
+
+    metrics = asyncio.run(scenario())
+    assert metrics["launches"] == 1
+    assert metrics["waits"] == 1
+    assert metrics["max_wait_ms"] >= 50
+    assert metrics["active_contexts"] == 1
+
+def test_async_wait_excludes_overflow_launch_time():
+    async def scenario():
+        pool = await make_async_pool(launch_s=0.05, overflow="launch")
+        await pool.acquire()
+        await pool.acquire()
+        return pool.metrics()
+
+    metrics = asyncio.run(scenario())
+    assert metrics["overflow_launches"] == 1
+    assert metrics["avg_launch_ms"] >= 50
+    assert metrics["waits"] == 0
+    assert metrics["max_wait_ms"] == 0
+
+def test_run_browser_agents_async_leases_from_the_pool(monkeypatch):
+    from browser_use_agent import runner as runner_module
+    leased = []
+
+    async def fake_run(**task):
+        leased.append(task.get("pool"))
+        return {"success": True}
+
+    monkeypatch.setattr(runner_module, "run_browser_agent_async", fake_run)
+    pool = AsyncBrowserPool(size=1)
+    asyncio.run(runner_module.run_browser_agents_async(
+        [{"user_goal": "a", "initial_url": "about:blank"}, {"user_goal": "b", "initial_url": "about:blank"}],
+        pool=pool,
+    ))
+    assert leased == [pool, pool]
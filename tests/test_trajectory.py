@@ -0,0 +1,32 @@
+"""TrajectoryCache counts a full replay only when the run finished from the replay."""
+
+import pytest
+
+pytest.importorskip("google.adk")
+
+from browser_use_agent.runner import _replay_finished, _new_result
+from browser_use_agent.trajectory import Trajectory, TrajectoryCache, TrajectoryStep
+
+FINAL = {"url": "https://shop.example.com/done", "elements": ["button:Continue"]}
+
+def trajectory() -> Trajectory:
+    start = {"url": "https://shop.example.com/", "elements": ["button:Buy"]}
+    steps = [TrajectoryStep(method="click_element", kwargs={"element_id": 1}, fingerprint=start),
+             TrajectoryStep(method="click_element", kwargs={"element_id": 2}, fingerprint=start)]
+    return Trajectory(goal="Check out", url="https://shop.example.com/", steps=steps, final_fingerprint=FINAL,
+                      task_result="Ordered", task_completion_reason="Order placed")
+
+def test_every_step_replayed_on_the_wrong_page_is_partial(tmp_path):
+    cache = TrajectoryCache(str(tmp_path))
+    elsewhere = {"url": "https://shop.example.com/cart", "elements": ["button:Pay"]}
+    assert not _replay_finished(_new_result("s"), cache, trajectory(), 2, elsewhere)
+    stats = cache.stats()
+    assert stats["full_replays"] == 0
+    assert stats["partial_replays"] == 1
+
+def test_completed_replay_is_full(tmp_path):
+    cache = TrajectoryCache(str(tmp_path))
+    result = _new_result("s")
+    assert _replay_finished(result, cache, trajectory(), 2, FINAL)
+    assert result["success"]
+    assert cache.stats()["full_replays"] == 1